@@ -0,0 +1,4 @@
+# Load the Celery app with Django so shared tasks bind to it
+from EventX.celery import app as celery_app
+
+__all__ = ('celery_app',)
@@ -2,6 +2,8 @@
 ASGI config for EventX project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Served by gunicorn with uvicorn workers when SERVE_ASGI is set, see
+gunicorn_config.py.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
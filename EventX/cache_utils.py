@@ -1,10 +1,23 @@
 """
 Ultra-simple caching utilities for EventX application
+
+The a-prefixed helpers are their async counterparts for the async views.
+They talk to the same Redis through redis.asyncio and encode keys and
+values like django-redis, so sync and async views share cache entries.
 """
+import asyncio
+import weakref
 from hashlib import md5
 from django.conf import settings
 from django.core.cache import cache
+from django.http import JsonResponse
+from django_redis.cache import RedisCache
+from redis import asyncio as aioredis
 from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+# redis.asyncio clients are bound to the event loop they were created in
+_async_clients = weakref.WeakKeyDictionary()
 
 
 def get_cache_key(prefix: str, *args) -> str:
@@ -84,6 +97,90 @@ def cache_api_response(prefix: str, timeout: int = 300, vary_on_user: bool = Fal
     return decorator
 
 
+def get_async_redis():
+    """redis.asyncio client of the default cache for the running event loop"""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        config = settings.CACHES['default']
+        client = aioredis.from_url(
+            config['LOCATION'],
+            **config.get('OPTIONS', {}).get('CONNECTION_POOL_KWARGS', {})
+        )
+        _async_clients[loop] = client
+    return client
+
+
+def _is_redis_cache():
+    return isinstance(cache, RedisCache)
+
+
+async def aget_cached_data(cache_key: str):
+    """Get data from cache without blocking the event loop"""
+    if _is_redis_cache():
+        value = await get_async_redis().get(cache.make_key(cache_key))
+        cached_data = cache.client.decode(value) if value is not None else None
+    else:
+        cached_data = await cache.aget(cache_key)
+    if cached_data:
+        print(f"[✅ Cache-Hit] {cache_key}")
+    else:
+        print(f"[❌ Cache-Miss] {cache_key}")
+    return cached_data
+
+
+async def aset_cached_data(cache_key: str, data, timeout: int = 300):
+    """Set data in cache without blocking the event loop"""
+    if not getattr(settings, 'ENABLE_CACHING', True):
+        return
+
+    if _is_redis_cache():
+        await get_async_redis().set(cache.make_key(cache_key), cache.client.encode(data), ex=timeout)
+    else:
+        await cache.aset(cache_key, data, timeout)
+    print(f"[📅 Cache-Set] {cache_key} ({timeout}s)")
+
+
+def async_cache_api_response(prefix: str, timeout: int = 300, vary_on_user: bool = False):
+    """
+    cache_api_response for async views, with the same cache keys
+    """
+    def decorator(view_func):
+        async def wrapper(self, request, *args, **kwargs):
+            # Build cache key
+            key_parts = [prefix, request.path, request.method]
+
+            # Add query params
+            if request.GET:
+                params_str = str(sorted(request.GET.items()))
+                key_parts.append(md5(params_str.encode()).hexdigest()[:8])
+
+            # Add user if needed
+            if vary_on_user and hasattr(request, 'validated_user') and request.validated_user:
+                key_parts.append(str(request.validated_user.user_id))
+
+            cache_key = get_cache_key(*key_parts)
+
+            # Try cache first
+            cached_data = await aget_cached_data(cache_key)
+            if cached_data:
+                response = JsonResponse(cached_data, encoder=JSONEncoder)
+                response.data = cached_data
+                return response
+
+            # Execute view
+            response = await view_func(self, request, *args, **kwargs)
+
+            # Cache if successful
+            if hasattr(response, 'data') and response.data.get('success', False):
+                await aset_cached_data(cache_key, response.data, timeout)
+
+            return response
+
+        return wrapper
+    return decorator
+
+
 # Simple cache invalidation functions
 def invalidate_analytics_cache(event_id=None, venue_id=None):
     """Clear analytics cache"""
@@ -98,6 +195,8 @@ def invalidate_analytics_cache(event_id=None, venue_id=None):
 def invalidate_events_cache(event_id=None, venue_id=None):
     """Clear events cache"""
     if event_id:
+        delete_cache(get_cache_key('event_detail', event_id))
+        delete_cache(get_cache_key('availability_summary', event_id))
         pattern = f"events:*{event_id}*"
         _clear_cache_pattern(pattern)
     if venue_id:
@@ -107,21 +206,21 @@ def invalidate_events_cache(event_id=None, venue_id=None):
 
 def invalidate_bookings_cache(user_id=None, event_id=None):
     """Clear bookings cache"""
+    # Booking responses are cached under bookings_history, see bookings/views.py
     if user_id:
-        pattern = f"bookings:*{user_id}*"
+        pattern = f"bookings*:*{user_id}*"
         _clear_cache_pattern(pattern)
     if event_id:
-        pattern = f"bookings:*{event_id}*"
+        pattern = f"bookings*:*{event_id}*"
         _clear_cache_pattern(pattern)
 
 
 def _clear_cache_pattern(pattern: str):
     """Clear cache entries matching pattern"""
     try:
-        client = cache.client.get_client(write=True)
-        keys = list(client.scan_iter(pattern))
-        if keys:
-            client.delete(*keys)
-            print(f"[🗑️ Cache-Cleared] {len(keys)} keys matching {pattern}")
+        # delete_pattern applies the cache's KEY_PREFIX and version to the pattern
+        count = cache.delete_pattern(pattern)
+        if count:
+            print(f"[🗑️ Cache-Cleared] {count} keys matching {pattern}")
     except Exception as e:
         print(f"Cache clear error: {e}")
@@ -0,0 +1,12 @@
+"""
+Celery application for background work, configured from the CELERY_* settings.
+Start a worker with: celery -A EventX worker -Q analytics
+"""
+import os
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'EventX.settings')
+
+app = Celery('EventX')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
@@ -0,0 +1,187 @@
+"""
+Database connection reuse and its metrics.
+
+Two modes, chosen by settings.DB_POOL:
+
+- persistent connections: each worker thread keeps its connection for
+  DB_CONN_MAX_AGE seconds, health-checked before reuse. Every connect that
+  could not be avoided is counted in db_connections_opened.
+- a psycopg 3 pool per worker process and database, at most
+  DB_POOL_MAX_SIZE connections. A request waits up to DB_POOL_TIMEOUT
+  seconds for a free one, then fails instead of piling onto Postgres.
+
+psycopg_pool keeps its statistics in the worker process. The middleware
+pushes them to the Redis metrics every DB_POOL_STATS_INTERVAL seconds: the
+counters add up across workers, and the gauges (size, idle, waiting) are
+kept per worker so get_pool_metrics can sum the live ones.
+"""
+import os
+import socket
+import time
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from EventX.metrics_utils import get_counters, get_gauges, incr_counter, incr_counters, set_gauges
+
+# psycopg_pool statistics, reset by every pop_stats()
+POOL_COUNTERS = [
+    'requests_num',        # connections handed out
+    'requests_queued',     # of which had to wait for one
+    'requests_wait_ms',    # total time spent waiting
+    'requests_errors',     # requests that timed out waiting
+    'connections_num',     # connections opened
+    'connections_ms',      # total time spent opening them
+    'connections_errors',  # failed attempts to open one
+    'connections_lost',    # connections found broken by the health check
+    'returns_bad',         # connections returned in a bad state
+]
+POOL_GAUGES = ['pool_min', 'pool_max', 'pool_size', 'pool_available', 'requests_waiting']
+
+# Per process
+_publish_state = {'published_at': 0.0}
+
+
+def _get_pools():
+    """The pool of each database alias that uses one, by alias"""
+    pools = {}
+    for alias in settings.DATABASES:
+        pool = getattr(connections[alias], 'pool', None)
+        if pool is not None:
+            pools[alias] = pool
+    return pools
+
+
+def record_connection_opened(sender, connection, **kwargs):
+    # With a pool this fires on every checkout, its own stats count the connects
+    if getattr(connection, 'pool', None) is None:
+        incr_counter('db_connections_opened', connection.alias)
+
+
+connection_created.connect(record_connection_opened)
+
+
+def publish_pool_stats():
+    """Fold this worker's pool statistics into the Redis metrics"""
+    _publish_state['published_at'] = time.monotonic()
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    for alias, pool in _get_pools().items():
+        stats = pool.pop_stats()
+        counters = {name: int(stats[name]) for name in POOL_COUNTERS if stats.get(name)}
+        if counters:
+            incr_counters({f'db_pool_{name}': amount for name, amount in counters.items()}, alias)
+        set_gauges(
+            'db_pool_gauges', worker,
+            {name: stats.get(name, 0) for name in POOL_GAUGES},
+            alias,
+            ttl=int(settings.DB_POOL_STATS_INTERVAL * 3)
+        )
+
+
+def _is_publish_due():
+    return time.monotonic() - _publish_state['published_at'] >= settings.DB_POOL_STATS_INTERVAL
+
+
+class DatabasePoolMetricsMiddleware:
+    """
+    Publishes the pool statistics of this worker after a request, at most
+    every DB_POOL_STATS_INTERVAL seconds. Unused without DB_POOL.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.DB_POOL:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.get_response(request)
+        if _is_publish_due():
+            publish_pool_stats()
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        if _is_publish_due():
+            await sync_to_async(publish_pool_stats)()
+        return response
+
+
+def _ratio(numerator, denominator):
+    return round(numerator / denominator, 4) if denominator else 0
+
+
+def get_pool_metrics():
+    """
+    Connection metrics per database alias: wait time and saturation of the
+    pools across the live workers, or the connects of persistent connections
+    """
+    data = {
+        'mode': 'pool' if settings.DB_POOL else 'persistent',
+        'databases': {},
+    }
+    for alias in settings.DATABASES:
+        if not settings.DB_POOL:
+            data['databases'][alias] = {
+                'conn_max_age': settings.DATABASES[alias].get('CONN_MAX_AGE', 0),
+                'connections_opened': get_counters(['db_connections_opened'], alias)['db_connections_opened'],
+            }
+            continue
+
+        counters = get_counters([f'db_pool_{name}' for name in POOL_COUNTERS], alias)
+        counters = {name: counters[f'db_pool_{name}'] for name in POOL_COUNTERS}
+        workers = get_gauges('db_pool_gauges', alias, max_age=settings.DB_POOL_STATS_INTERVAL * 3)
+        totals = {name: sum(gauges.get(name, 0) for gauges in workers.values()) for name in POOL_GAUGES}
+        in_use = totals['pool_size'] - totals['pool_available']
+
+        data['databases'][alias] = {
+            'workers': len(workers),
+            'max_size': totals['pool_max'],
+            'size': totals['pool_size'],
+            'in_use': in_use,
+            'idle': totals['pool_available'],
+            'waiting': totals['requests_waiting'],
+            # Share of the workers' pool capacity in use right now
+            'saturation': _ratio(in_use, totals['pool_max']),
+            'checkouts': counters['requests_num'],
+            'queued': counters['requests_queued'],
+            'queued_ratio': _ratio(counters['requests_queued'], counters['requests_num']),
+            'avg_wait_ms': _ratio(counters['requests_wait_ms'], counters['requests_num']),
+            'avg_queued_wait_ms': _ratio(counters['requests_wait_ms'], counters['requests_queued']),
+            'timeouts': counters['requests_errors'],
+            'connections_opened': counters['connections_num'],
+            'avg_connect_ms': _ratio(counters['connections_ms'], counters['connections_num']),
+            'connect_errors': counters['connections_errors'],
+            'connections_lost': counters['connections_lost'],
+            'bad_returns': counters['returns_bad'],
+            'per_worker': workers,
+        }
+    return data
+
+
+def check_connection_budget(workers, threads, asgi=False):
+    """
+    Warning when the web workers can open more connections than
+    DB_MAX_CONNECTIONS allows, None otherwise
+    """
+    if settings.DB_POOL:
+        per_worker = settings.DB_POOL_MAX_SIZE
+    elif asgi:
+        return "Persistent connections are not reused under ASGI, set DB_POOL=true to bound them"
+    else:
+        # One persistent connection per thread
+        per_worker = threads
+
+    total = workers * per_worker
+    if total > settings.DB_MAX_CONNECTIONS:
+        return (
+            f"{workers} workers x {per_worker} connections = {total} per database, "
+            f"more than DB_MAX_CONNECTIONS={settings.DB_MAX_CONNECTIONS}"
+        )
+    return None
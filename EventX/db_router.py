@@ -0,0 +1,203 @@
+"""
+Read-replica routing.
+
+Views opt in with `use_replica = True`; ReplicaRoutingMiddleware then sends
+the ORM reads of their GET requests to the "replica" alias. Reads stay on
+the primary when:
+
+- no replica alias is configured,
+- the request already wrote, or runs inside a transaction on the primary,
+- the user wrote within the last DB_REPLICA_STICKY_SECONDS (read-your-writes),
+- the replica is more than DB_REPLICA_MAX_LAG_SECONDS behind or unreachable.
+
+The replica can be a streaming Postgres standby or, locally, any second
+alias such as a SQLite copy; lag is only measured on Postgres.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.urls import Resolver404, resolve
+from EventX.cache_utils import get_cache_key
+
+REPLICA_DB_ALIAS = 'replica'
+PRIMARY_STICKY_PREFIX = 'db_primary_sticky'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_replica_reads = ContextVar('replica_reads', default=False)
+_wrote_primary = ContextVar('wrote_primary', default=False)
+
+# Per process: (checked_at, is_fresh)
+_replica_state = {'checked_at': 0.0, 'is_fresh': False}
+
+LAG_QUERY = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+"""
+
+
+def has_replica():
+    return REPLICA_DB_ALIAS in settings.DATABASES
+
+
+def get_replica_lag():
+    """Seconds the replica is behind the primary, 0 when caught up"""
+    connection = connections[REPLICA_DB_ALIAS]
+    if connection.vendor != 'postgresql':
+        return 0.0
+    with connection.cursor() as cursor:
+        cursor.execute(LAG_QUERY)
+        lag = cursor.fetchone()[0]
+    return float(lag or 0)
+
+
+def is_replica_fresh():
+    """Whether the replica is within the lag budget, re-checked every DB_REPLICA_LAG_CHECK_INTERVAL"""
+    now = time.monotonic()
+    if now - _replica_state['checked_at'] < settings.DB_REPLICA_LAG_CHECK_INTERVAL:
+        return _replica_state['is_fresh']
+
+    try:
+        lag = get_replica_lag()
+        is_fresh = lag <= settings.DB_REPLICA_MAX_LAG_SECONDS
+        if not is_fresh:
+            print(f"[DB Router] Replica is {lag:.1f}s behind, reading from the primary")
+    except Exception as e:
+        print(f"[DB Router] Replica check failed, reading from the primary: {e}")
+        is_fresh = False
+
+    _replica_state.update(checked_at=now, is_fresh=is_fresh)
+    return is_fresh
+
+
+@contextmanager
+def replica_reads():
+    """Send the reads of the enclosed block to the replica when it is usable"""
+    replica_token = _replica_reads.set(True)
+    wrote_token = _wrote_primary.set(False)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(replica_token)
+        _wrote_primary.reset(wrote_token)
+
+
+@contextmanager
+def primary_reads():
+    """Keep the reads of the enclosed block on the primary, e.g. to fill a long-lived cache"""
+    token = _replica_reads.set(False)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+class ReplicaRouter:
+    """Route opted-in reads to the replica and everything else to the primary"""
+
+    def db_for_read(self, model, **hints):
+        if (
+            _replica_reads.get()
+            and not _wrote_primary.get()
+            and has_replica()
+            and not connections[DEFAULT_DB_ALIAS].in_atomic_block
+            and is_replica_fresh()
+        ):
+            return REPLICA_DB_ALIAS
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        # Later reads of this request must see the write
+        _wrote_primary.set(True)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return None
+
+
+def _get_sticky_key(user_id):
+    return get_cache_key(PRIMARY_STICKY_PREFIX, user_id)
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Enable replica reads for the safe requests of views with `use_replica`,
+    and pin a user to the primary for a short window after they write.
+    Must run after ValidateTokenMiddleware.
+
+    The view is resolved up front so replica_reads() can wrap the whole
+    response: an exception, or a hook running in another context, cannot
+    leave the flag set for the next request.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def _use_replica(self, request):
+        if request.method not in SAFE_METHODS or not has_replica():
+            return False
+        try:
+            match = resolve(request.path_info, getattr(request, 'urlconf', None))
+        except Resolver404:
+            return False
+        return getattr(getattr(match.func, 'view_class', None), 'use_replica', False)
+
+    def _is_sticky(self, user):
+        try:
+            return cache.get(_get_sticky_key(user.user_id))
+        except Exception as e:
+            # Without the window the user may have just written, stay on the primary
+            print(f"[DB Router] Sticky check failed, reading from the primary: {e}")
+            return True
+
+    async def _ais_sticky(self, user):
+        try:
+            return await cache.aget(_get_sticky_key(user.user_id))
+        except Exception as e:
+            print(f"[DB Router] Sticky check failed, reading from the primary: {e}")
+            return True
+
+    def _set_sticky(self, user):
+        try:
+            cache.set(_get_sticky_key(user.user_id), 1, settings.DB_REPLICA_STICKY_SECONDS)
+        except Exception as e:
+            print(f"Cache write error: {e}")
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        user = getattr(request, 'validated_user', None)
+        if self._use_replica(request) and not (user and self._is_sticky(user)):
+            with replica_reads():
+                return self.get_response(request)
+
+        response = self.get_response(request)
+        if request.method not in SAFE_METHODS and user and has_replica():
+            self._set_sticky(user)
+        return response
+
+    async def __acall__(self, request):
+        user = getattr(request, 'validated_user', None)
+        if self._use_replica(request) and not (user and await self._ais_sticky(user)):
+            # Set in this task's context, copied into the sync_to_async calls of the view
+            with replica_reads():
+                return await self.get_response(request)
+
+        response = await self.get_response(request)
+        if request.method not in SAFE_METHODS and user and has_replica():
+            await sync_to_async(self._set_sticky)(user)
+        return response
@@ -0,0 +1,81 @@
+"""
+Transaction helpers for the booking and hold flows
+"""
+import random
+import time
+from django.conf import settings
+from django.db import OperationalError, connection, transaction
+from EventX.metrics_utils import incr_counter, record_timing
+
+# Postgres error codes that are safe to retry from the top of the transaction
+RETRYABLE_ERRORS = {
+    '40P01': 'deadlock',
+    '40001': 'serialization_failure',
+    '55P03': 'lock_timeout',
+}
+
+
+class TransactionConflictError(Exception):
+    """Raised when a transaction still conflicts after all retries"""
+
+    def __init__(self, reason):
+        super().__init__(f"Transaction conflict: {reason}")
+        self.reason = reason
+
+
+def _get_retry_reason(exc):
+    # sqlstate on psycopg 3, pgcode on psycopg2
+    pgcode = getattr(exc.__cause__, 'sqlstate', None) or getattr(exc.__cause__, 'pgcode', None)
+    return RETRYABLE_ERRORS.get(pgcode)
+
+
+def _set_lock_timeout(lock_timeout_ms):
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        # is_local=true scopes the setting to the current transaction
+        cursor.execute("SELECT set_config('lock_timeout', %s, true)", [f'{lock_timeout_ms}ms'])
+
+
+def lock_rows(queryset, event_id=None):
+    """
+    Lock the rows of a queryset in primary key order and return them.
+    Taking locks in a global order prevents deadlocks between concurrent
+    multi-row requests. The time spent waiting is recorded per event once
+    the transaction commits, keeping the Redis round-trips out of the locks.
+    """
+    started = time.monotonic()
+    rows = list(queryset.select_for_update(of=('self',)).order_by('pk'))
+    wait_ms = (time.monotonic() - started) * 1000
+    transaction.on_commit(lambda: record_timing('lock_wait', wait_ms, event_id or 'all'))
+    return rows
+
+
+def run_in_transaction(func, event_id=None, lock_timeout_ms=None, max_attempts=None):
+    """
+    Run func inside a transaction with a per-transaction lock_timeout.
+    Deadlocks, serialization failures and lock timeouts are retried with
+    jittered exponential backoff; TransactionConflictError is raised once
+    the attempts are exhausted.
+    """
+    lock_timeout_ms = lock_timeout_ms or settings.DB_LOCK_TIMEOUT_MS
+    max_attempts = max_attempts or settings.DB_TRANSACTION_MAX_ATTEMPTS
+    base_delay = settings.DB_TRANSACTION_RETRY_BASE_DELAY
+
+    for attempt in range(1, max_attempts + 1):
+        try:
+            with transaction.atomic():
+                _set_lock_timeout(lock_timeout_ms)
+                return func()
+        except OperationalError as e:
+            reason = _get_retry_reason(e)
+            # Only the outermost transaction can be replayed
+            if reason is None or connection.in_atomic_block:
+                raise
+
+            incr_counter('transaction_conflicts', reason, event_id or 'all')
+            if attempt == max_attempts:
+                raise TransactionConflictError(reason) from e
+
+            # Full jitter spreads the retries of requests that collided together
+            time.sleep(random.uniform(0, base_delay * (2 ** (attempt - 1))))
@@ -1,14 +1,19 @@
 from pickle import NONE
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
 from rest_framework.views import APIView
 from rest_framework import status
 from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
 from traceback import print_exc
 
 
-class BaseAPIClass(APIView):
+class BaseResponseMixin:
     """
-    Base API class that provides common response handling methods
-    for all API endpoints in the application.
+    Response state and error handling shared by BaseAPIClass and
+    AsyncBaseAPIClass, so both return the same response body.
     """
 
     def __init__(self, **kwargs):
@@ -21,9 +26,9 @@ class BaseAPIClass(APIView):
         self.data = {}
         self.print_log = True
     
-    def get_response(self):
+    def get_response_data(self):
         """
-        Generate a standardized success response
+        Generate a standardized response body
         """
         to_return = {
             "success": self.success, 
@@ -37,7 +42,7 @@ class BaseAPIClass(APIView):
             print("Response Debug Info:: ",self.exceptionObj)
             print("Return Object:: ",to_return)
         
-        return Response(to_return, status=self.code,)
+        return to_return
     
     def error_occurred(self, e, custom_code=None, **kwargs):
         """
@@ -91,3 +96,47 @@ class BaseAPIClass(APIView):
         self.message = message
         self.code = status.HTTP_400_BAD_REQUEST
 
+
+class BaseAPIClass(BaseResponseMixin, APIView):
+    """
+    Base API class that provides common response handling methods
+    for all API endpoints in the application.
+    """
+
+    def get_response(self):
+        """
+        Generate a standardized success response
+        """
+        return Response(self.get_response_data(), status=self.code,)
+
+
+class AsyncBaseAPIClass(BaseResponseMixin, View):
+    """
+    Async counterpart of BaseAPIClass for the read paths served under ASGI
+    (SERVE_ASGI). Handlers are coroutines using the async ORM and cache, and
+    return the same body as a JsonResponse. DRF views cannot be async, so
+    methods without an async handler are passed to sync_view_class: a URL
+    keeps its sync writes when only its reads are async.
+    """
+    sync_view_class = None
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # Token authenticated, exempt from CSRF like the DRF views
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        method = request.method.lower()
+        if self.sync_view_class and method in self.http_method_names and not hasattr(self, method):
+            return await sync_to_async(self.sync_view_class.as_view())(request, *args, **kwargs)
+        return await super().dispatch(request, *args, **kwargs)
+
+    def get_response(self):
+        """
+        Generate a standardized success response
+        """
+        data = self.get_response_data()
+        response = JsonResponse(data, status=self.code, encoder=JSONEncoder)
+        # Kept like Response.data for the callers and caching decorators that read it
+        response.data = data
+        return response
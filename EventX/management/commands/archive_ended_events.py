@@ -0,0 +1,70 @@
+"""
+Archive the rows of events that ended more than ARCHIVE_RETENTION_DAYS ago:
+move their bookings and holds to the archive tables, then detach the
+booking_fact months that only hold archived events and the user_session_dump
+months older than SESSION_DUMP_RETENTION_DAYS
+"""
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+from bookings.archive import archive_event, get_archivable_event_ids, get_archive_cutoff
+from events.models import Events
+from EventX.partition_utils import detach_partition, get_month_bounds, get_partitions
+
+
+def _has_only_archivable_events(partition, cutoff):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT NOT EXISTS (SELECT 1 FROM {partition} fact "
+            "JOIN events ON events.events_id = fact.event_id_id "
+            "WHERE NOT (events.status = %s AND events.ends_at < %s))",
+            [Events.EVENT_STATUS.ENDED.value, cutoff]
+        )
+        return cursor.fetchone()[0]
+
+
+def get_detachable_partitions(cutoff):
+    """(table, partition) pairs whose month is past retention"""
+    detachable = []
+    for name, month in get_partitions('booking_fact'):
+        _, month_end = get_month_bounds(month)
+        if month_end <= cutoff and _has_only_archivable_events(name, cutoff):
+            detachable.append(('booking_fact', name))
+
+    session_cutoff = timezone.now() - timedelta(days=settings.SESSION_DUMP_RETENTION_DAYS)
+    for name, month in get_partitions('user_session_dump'):
+        _, month_end = get_month_bounds(month)
+        if month_end <= session_cutoff:
+            detachable.append(('user_session_dump', name))
+    return detachable
+
+
+class Command(BaseCommand):
+    help = "Move the bookings and holds of long-ended events to the archive tables and detach old partitions"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Only list what would be archived")
+        parser.add_argument('--limit', type=int, default=None, help="Archive at most this many events")
+        parser.add_argument('--drop', action='store_true', help="Drop detached partitions instead of keeping them as tables")
+
+    def handle(self, *args, **options):
+        cutoff = get_archive_cutoff()
+        event_ids = get_archivable_event_ids(cutoff)[:options['limit']]
+        self.stdout.write(f"{len(event_ids)} events ended before {cutoff:%Y-%m-%d} to archive")
+
+        if not options['dry_run']:
+            for event_id in event_ids:
+                moved = archive_event(event_id)
+                self.stdout.write(f"Archived {event_id}: " + ", ".join(
+                    f"{count} {table}" for table, count in moved.items()
+                ))
+
+        # Facts stay attached until every event in their month is archived
+        for table, name in get_detachable_partitions(cutoff):
+            if options['dry_run']:
+                self.stdout.write(f"Would detach {name}")
+                continue
+            detach_partition(table, name, drop=options['drop'])
+            self.stdout.write(f"{'Dropped' if options['drop'] else 'Detached'} {name}")
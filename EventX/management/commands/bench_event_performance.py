@@ -0,0 +1,166 @@
+"""
+Benchmark the event performance section: the previous per-event query loop
+against the grouped aggregates of analytics.reports
+"""
+import random
+import statistics
+import time
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from uuid import uuid4
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Sum
+from accounts.models import User
+from analytics.models import EventDailyRollup
+from analytics.reports import get_event_performance_report
+from bookings.models import Booking
+from events.models import Events, TicketType, Venue
+from inventory.models import EventInventory, Seat
+
+# Synthetic events start on this day, well away from real data
+BENCH_START = date(2001, 1, 1)
+BENCH_DAYS = 30
+BOOKINGS_PER_EVENT = 4
+SEATS_PER_EVENT = 20
+
+
+def per_event_loop_report(validated_data):
+    """The event performance section as it was: five queries per event"""
+    start_date = validated_data['start_date']
+    end_date = validated_data['end_date']
+    events_query = Events.objects.filter(
+        starts_at__date__range=[start_date, end_date]
+    ).select_related('venue_id')
+
+    event_performance = []
+    for event in events_query:
+        bookings = Booking.objects.filter(events_id=event)
+        booking_count = bookings.count()
+        confirmed_bookings = bookings.filter(status=Booking.BOOKING_STATUS.CONFIRMED).count()
+        total_revenue = bookings.filter(status=Booking.BOOKING_STATUS.CONFIRMED).aggregate(
+            total=Sum('total_price_cents')
+        )['total'] or 0
+
+        total_capacity = 0
+        if event.seat_mode == Events.SEAT_MODE.GENERAL_ADMISSION:
+            inventories = EventInventory.objects.filter(event_id=event)
+            total_capacity = sum(inv.initial_qty for inv in inventories)
+        elif event.seat_mode == Events.SEAT_MODE.RESERVED_SEATING:
+            total_capacity = event.seats.count()
+
+        event_performance.append({
+            'event_id': str(event.events_id),
+            'total_bookings': booking_count,
+            'confirmed_bookings': confirmed_bookings,
+            'total_revenue': total_revenue,
+            'total_capacity': total_capacity,
+        })
+    return event_performance
+
+
+class Command(BaseCommand):
+    help = "Compare the per-event query loop with the grouped event performance report"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0, help="Number of synthetic events to create first")
+        parser.add_argument('--runs', type=int, default=5)
+
+    def handle(self, *args, **options):
+        if options['seed']:
+            self._seed(options['seed'])
+
+        validated_data = {
+            'start_date': BENCH_START,
+            'end_date': BENCH_START + timedelta(days=BENCH_DAYS - 1),
+        }
+        event_count = Events.objects.filter(
+            starts_at__date__range=[validated_data['start_date'], validated_data['end_date']]
+        ).count()
+        self.stdout.write(f"Benchmark window: {event_count} events, {options['runs']} runs")
+
+        for name, func in (
+            ('per-event', per_event_loop_report),
+            ('grouped', get_event_performance_report),
+        ):
+            timings = []
+            for _ in range(options['runs']):
+                # Counted with a wrapper, the debug query log is capped at 9000 entries
+                queries = [0]
+
+                def count_query(execute, sql, params, many, context):
+                    queries[0] += 1
+                    return execute(sql, params, many, context)
+
+                with connection.execute_wrapper(count_query):
+                    started = time.perf_counter()
+                    func(validated_data)
+                    timings.append((time.perf_counter() - started) * 1000)
+            self.stdout.write(
+                f"{name:>10}: queries={queries[0]} "
+                f"p50={statistics.median(timings):.1f}ms max={max(timings):.1f}ms"
+            )
+
+    def _seed(self, count):
+        user, _ = User.objects.get_or_create(
+            email='bench-event-performance@example.com',
+            defaults={'name': 'Bench', 'password': '!'}
+        )
+        venues = Venue.objects.bulk_create([Venue(name=f"Bench Hall {index}") for index in range(50)])
+        base = datetime.combine(BENCH_START, datetime.min.time(), tzinfo=dt_timezone.utc)
+
+        for start in range(0, count, 1000):
+            events = Events.objects.bulk_create([
+                Events(
+                    venue_id=random.choice(venues),
+                    event_name=f"Bench Performance {index}",
+                    starts_at=base + timedelta(days=index % BENCH_DAYS, hours=18),
+                    ends_at=base + timedelta(days=index % BENCH_DAYS, hours=21),
+                    seat_mode=(
+                        Events.SEAT_MODE.RESERVED_SEATING if index % 2 else Events.SEAT_MODE.GENERAL_ADMISSION
+                    ),
+                )
+                for index in range(start, min(start + 1000, count))
+            ])
+            ticket_types = TicketType.objects.bulk_create([
+                TicketType(events_id=event, ticket_type_name='General', price=500) for event in events
+            ])
+
+            inventories, seats, bookings, rollups = [], [], [], []
+            for event, ticket_type in zip(events, ticket_types):
+                if event.seat_mode == Events.SEAT_MODE.RESERVED_SEATING:
+                    seats.extend(
+                        Seat(event_id=event, section='A', row_label='1', seat_number=str(number), ticket_type_id=ticket_type)
+                        for number in range(SEATS_PER_EVENT)
+                    )
+                else:
+                    inventories.append(EventInventory(event_id=event, ticket_type_id=ticket_type, initial_qty=200))
+
+                confirmed = random.randint(0, BOOKINGS_PER_EVENT)
+                for number in range(BOOKINGS_PER_EVENT):
+                    bookings.append(Booking(
+                        user_id=user,
+                        events_id=event,
+                        status=Booking.BOOKING_STATUS.CONFIRMED if number < confirmed else Booking.BOOKING_STATUS.PENDING,
+                        total_price_cents=1000,
+                        request_id=str(uuid4()),
+                    ))
+                rollups.append(EventDailyRollup(
+                    event_id=event,
+                    day=event.starts_at.date(),
+                    bookings=BOOKINGS_PER_EVENT,
+                    confirmations=confirmed,
+                    cancellations=0,
+                    tickets_sold=confirmed * 2,
+                    revenue=confirmed * 1000,
+                ))
+
+            EventInventory.objects.bulk_create(inventories)
+            Seat.objects.bulk_create(seats)
+            Booking.objects.bulk_create(bookings)
+            EventDailyRollup.objects.bulk_create(rollups)
+
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                for table in ('events', 'event_inventory', 'seat', 'booking', 'event_daily_rollup'):
+                    cursor.execute(f"ANALYZE {table}")
+        self.stdout.write(f"Seeded {count} events")
@@ -0,0 +1,99 @@
+"""
+Benchmark event search: ILIKE scans over events and venues against the
+tsvector index of the event listing
+"""
+import random
+import statistics
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+from events.listing import refresh_event_listing
+from events.models import EventListing, Events, Venue
+from events.search import search_events
+
+WORDS = [
+    'rock', 'jazz', 'comedy', 'festival', 'live', 'night', 'summer', 'tour', 'acoustic', 'symphony',
+    'indie', 'hiphop', 'electronic', 'classical', 'retro', 'unplugged', 'metal', 'folk', 'opera', 'standup',
+]
+CITIES = ['Mumbai', 'Delhi', 'Bengaluru', 'Pune', 'Chennai', 'Hyderabad', 'Kolkata', 'Jaipur', 'Goa', 'Kochi']
+
+
+class Command(BaseCommand):
+    help = "Compare icontains search with the full-text index on a synthetic catalog"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0, help="Number of synthetic events to create first")
+        parser.add_argument('--queries', type=int, default=50)
+        parser.add_argument('--rows-per-page', type=int, default=10)
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            self.stderr.write("The search benchmark needs PostgreSQL")
+            return
+
+        if options['seed']:
+            self._seed(options['seed'])
+
+        terms = [random.choice(WORDS + CITIES).lower()[:5] for _ in range(options['queries'])]
+        limit = options['rows_per_page']
+
+        def run_icontains(term):
+            events = Events.objects.filter(
+                Q(event_name__icontains=term)
+                | Q(venue_id__city__icontains=term)
+                | Q(venue_id__name__icontains=term)
+            ).select_related('venue_id')
+            events.count()
+            list(events[:limit])
+
+        def run_full_text(term):
+            events = search_events(EventListing.objects.all(), term)
+            events.count()
+            list(events[:limit])
+
+        self.stdout.write(f"Catalog size: {Events.objects.count()} events, {len(terms)} queries")
+        for name, func in (('icontains', run_icontains), ('full-text', run_full_text)):
+            timings = []
+            for term in terms:
+                started = time.perf_counter()
+                func(term)
+                timings.append((time.perf_counter() - started) * 1000)
+            timings.sort()
+            self.stdout.write(
+                f"{name:>10}: p50={statistics.median(timings):.1f}ms "
+                f"p95={timings[int(len(timings) * 0.95) - 1]:.1f}ms max={timings[-1]:.1f}ms"
+            )
+
+    def _seed(self, count):
+        now = timezone.now()
+        venues = Venue.objects.bulk_create([
+            Venue(name=f"Bench Arena {index}", city=random.choice(CITIES))
+            for index in range(200)
+        ])
+
+        batch = []
+        event_ids = []
+        for index in range(count):
+            starts_at = now + timedelta(days=random.randint(1, 365))
+            batch.append(Events(
+                venue_id=random.choice(venues),
+                event_name=' '.join(random.sample(WORDS, 3)).title() + f" {index}",
+                starts_at=starts_at,
+                ends_at=starts_at + timedelta(hours=3),
+            ))
+            if len(batch) == 10000:
+                event_ids.extend(event.events_id for event in Events.objects.bulk_create(batch))
+                batch = []
+        if batch:
+            event_ids.extend(event.events_id for event in Events.objects.bulk_create(batch))
+
+        for start in range(0, len(event_ids), 5000):
+            refresh_event_listing(event_ids[start:start + 5000])
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE events")
+            cursor.execute("ANALYZE venue")
+            cursor.execute("ANALYZE event_listing")
+        self.stdout.write(f"Seeded {count} events")
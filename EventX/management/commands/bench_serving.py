@@ -0,0 +1,236 @@
+"""
+Load benchmark of the two serving modes side by side: gunicorn gthread
+workers on EventX.wsgi against uvicorn workers on EventX.asgi, with the
+async read views (SERVE_ASGI). Each mode is started from gunicorn_config.py
+with the same number of workers and driven by keep-alive connections
+replaying the read paths for a fixed duration per concurrency level.
+
+Slow clients send their request a few bytes at a time: under gthread each
+one holds a worker thread while it trickles in, under uvicorn it only
+holds a socket.
+"""
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from EventX.utils import generate_jwt_token
+from accounts.models import User, UserActiveSession
+from events.models import Events
+
+MODES = {
+    'gthread': 'false',
+    'uvicorn': 'true',
+}
+
+
+def _get_free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _percentile(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(int(q * len(values)), len(values) - 1)]
+
+
+async def _read_response(reader):
+    """Read one HTTP/1.1 response. Returns its status code."""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("Connection closed")
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    if 'content-length' in headers:
+        await reader.readexactly(int(headers['content-length']))
+    elif headers.get('transfer-encoding') == 'chunked':
+        while True:
+            size = int((await reader.readline()).strip(), 16)
+            await reader.readexactly(size + 2)
+            if not size:
+                break
+    return int(status_line.split()[1])
+
+
+def _build_request(path, token):
+    return (
+        f"GET {path} HTTP/1.1\r\n"
+        f"Host: 127.0.0.1\r\n"
+        f"Authorization: Bearer {token}\r\n"
+        f"Connection: keep-alive\r\n\r\n"
+    ).encode()
+
+
+async def _client(port, requests, deadline, stats, slow_delay=None):
+    """Replay the requests on one keep-alive connection until the deadline"""
+    reader = writer = None
+    index = 0
+    while time.monotonic() < deadline:
+        request = requests[index % len(requests)]
+        index += 1
+        started = time.perf_counter()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            if slow_delay:
+                for offset in range(0, len(request), 16):
+                    writer.write(request[offset:offset + 16])
+                    await writer.drain()
+                    await asyncio.sleep(slow_delay)
+            else:
+                writer.write(request)
+                await writer.drain()
+            status = await _read_response(reader)
+        except (OSError, ConnectionError, asyncio.IncompleteReadError, ValueError):
+            stats['errors'] += 1
+            if writer is not None:
+                writer.close()
+            reader = writer = None
+            continue
+
+        if slow_delay:
+            continue
+        stats['latencies'].append(time.perf_counter() - started)
+        if status >= 400:
+            stats['errors'] += 1
+
+    if writer is not None:
+        writer.close()
+
+
+async def _run_load(port, requests, concurrency, duration, slow_clients, slow_delay):
+    stats = {'latencies': [], 'errors': 0}
+    # Slow clients only occupy the server, their timings are not reported
+    slow_stats = {'latencies': [], 'errors': 0}
+    deadline = time.monotonic() + duration
+    await asyncio.gather(
+        *[_client(port, requests, deadline, stats) for _ in range(concurrency)],
+        *[_client(port, requests, deadline, slow_stats, slow_delay) for _ in range(slow_clients)],
+    )
+    return stats
+
+
+class Command(BaseCommand):
+    help = "Benchmark the read paths under gunicorn gthread (WSGI) and uvicorn (ASGI) workers"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--paths', nargs='+', help="Paths to replay, defaults to the async read paths")
+        parser.add_argument('--concurrency', type=int, nargs='+', default=[16, 64, 256])
+        parser.add_argument('--duration', type=float, default=10.0, help="Seconds per concurrency level")
+        parser.add_argument('--workers', type=int, default=2)
+        parser.add_argument('--threads', type=int, default=2, help="gthread threads per worker")
+        parser.add_argument('--slow-clients', type=int, default=0, help="Extra connections that trickle their requests in")
+        parser.add_argument('--slow-delay', type=float, default=0.05, help="Seconds between the 16 byte writes of a slow client")
+        parser.add_argument('--email', help="User to authenticate as, defaults to the first user")
+        parser.add_argument('--modes', nargs='+', choices=list(MODES), default=list(MODES))
+
+    def get_token(self, email):
+        user = User.objects.filter(email=email).first() if email else User.objects.order_by('created_at').first()
+        if user is None:
+            raise CommandError("No user to authenticate as")
+        # Reuse the user's session so the benchmark does not log them out
+        session = UserActiveSession.objects.filter(user_id=user).first()
+        if session is None:
+            session = UserActiveSession.objects.create(
+                user_id=user,
+                access_token=generate_jwt_token(user.user_id, user.email, user.name)
+            )
+        return session.access_token
+
+    def get_paths(self):
+        paths = ['/events/', '/accounts/profile/']
+        event_id = Events.objects.filter(
+            status=Events.EVENT_STATUS.PUBLISHED
+        ).values_list('events_id', flat=True).first()
+        if event_id:
+            paths.append(f'/inventory/events/{event_id}/availability/')
+        return paths
+
+    def start_server(self, mode, port, options, log_file):
+        env = dict(os.environ, SERVE_ASGI=MODES[mode])
+        process = subprocess.Popen(
+            [
+                sys.executable, '-m', 'gunicorn', '-c', 'gunicorn_config.py',
+                '--bind', f'127.0.0.1:{port}',
+                '--workers', str(options['workers']),
+                '--threads', str(options['threads']),
+                '--pid', os.path.join(tempfile.gettempdir(), f'bench_serving_{mode}.pid'),
+                '--access-logfile', os.devnull,
+                '--error-logfile', log_file,
+            ],
+            cwd=settings.BASE_DIR,
+            env=env,
+            # The views print every response
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+
+        # Ready once it answers, /healthz/ is enough even unauthenticated
+        deadline = time.monotonic() + 60
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                break
+            try:
+                with socket.create_connection(('127.0.0.1', port), timeout=1) as sock:
+                    sock.sendall(b"GET /healthz/ HTTP/1.1\r\nHost: 127.0.0.1\r\nConnection: close\r\n\r\n")
+                    if sock.recv(16).startswith(b'HTTP/'):
+                        return process
+            except OSError:
+                time.sleep(0.2)
+
+        process.kill()
+        with open(log_file) as log:
+            raise CommandError(f"{mode} server did not start:\n{log.read()[-2000:]}")
+
+    def handle(self, *args, **options):
+        token = self.get_token(options['email'])
+        paths = options['paths'] or self.get_paths()
+        requests = [_build_request(path, token) for path in paths]
+        self.stdout.write(f"Paths: {', '.join(paths)}")
+        self.stdout.write(
+            f"{options['workers']} workers, {options['threads']} gthread threads, "
+            f"{options['slow_clients']} slow clients, {options['duration']:.0f}s per level"
+        )
+
+        for mode in options['modes']:
+            port = _get_free_port()
+            with tempfile.NamedTemporaryFile(suffix='.log', delete=False) as log:
+                log_file = log.name
+            process = self.start_server(mode, port, options, log_file)
+            try:
+                # Warm the caches and connections before measuring
+                asyncio.run(_run_load(port, requests, 4, 1.0, 0, None))
+                for concurrency in options['concurrency']:
+                    stats = asyncio.run(_run_load(
+                        port, requests, concurrency, options['duration'],
+                        options['slow_clients'], options['slow_delay']
+                    ))
+                    self.print_result(mode, concurrency, stats, options['duration'])
+            finally:
+                process.terminate()
+                process.wait(timeout=30)
+                os.unlink(log_file)
+
+    def print_result(self, mode, concurrency, stats, duration):
+        latencies = stats['latencies']
+        p50, p95, p99 = (
+            f"{value * 1000:8.1f}" if value is not None else "       -"
+            for value in (_percentile(latencies, q) for q in (0.5, 0.95, 0.99))
+        )
+        self.stdout.write(
+            f"{mode:8} c={concurrency:<5} {len(latencies) / duration:9.1f} req/s  "
+            f"p50 {p50} ms  p95 {p95} ms  p99 {p99} ms  errors {stats['errors']}"
+        )
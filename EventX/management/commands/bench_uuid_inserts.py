@@ -0,0 +1,97 @@
+"""
+Benchmark primary key inserts with random uuid4 keys against time-ordered
+uuid7 keys: insert throughput as the table grows and the final index size
+"""
+import time
+from uuid import uuid4
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from EventX.ids import uuid7
+
+GENERATORS = {
+    'uuid4': uuid4,
+    'uuid7': uuid7,
+}
+
+
+def _get_table(name):
+    return f"bench_uuid_{name}"
+
+
+class Command(BaseCommand):
+    help = "Compare insert throughput and primary key index size of uuid4 and uuid7 keys"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=2_000_000)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--keep', action='store_true', help="Keep the benchmark tables for inspection")
+
+    def insert_rows(self, table, generate, rows, batch_size):
+        """Insert rows in committed batches. Returns the seconds taken by each batch."""
+        timings = []
+        inserted = 0
+        with connection.cursor() as cursor:
+            while inserted < rows:
+                size = min(batch_size, rows - inserted)
+                params = []
+                for offset in range(size):
+                    params.extend((str(generate()), inserted + offset))
+                started = time.perf_counter()
+                cursor.execute(
+                    f"INSERT INTO {table} (id, seq) VALUES " + ", ".join(["(%s, %s)"] * size),
+                    params
+                )
+                timings.append(time.perf_counter() - started)
+                inserted += size
+        return timings
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError("The benchmark needs PostgreSQL")
+
+        rows = options['rows']
+        batch_size = options['batch_size']
+        results = {}
+        for name, generate in GENERATORS.items():
+            table = _get_table(name)
+            with connection.cursor() as cursor:
+                cursor.execute(f"DROP TABLE IF EXISTS {table}")
+                cursor.execute(
+                    f"CREATE TABLE {table} ("
+                    "id uuid PRIMARY KEY, seq bigint NOT NULL, created_at timestamptz NOT NULL DEFAULT now())"
+                )
+
+            self.stdout.write(f"Inserting {rows} {name} keys...")
+            timings = self.insert_rows(table, generate, rows, batch_size)
+
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT pg_relation_size(%s), pg_relation_size(%s)",
+                    [f"{table}_pkey", table]
+                )
+                index_size, table_size = cursor.fetchone()
+                if not options['keep']:
+                    cursor.execute(f"DROP TABLE {table}")
+
+            # Throughput of the last tenth shows how inserts slow down as the index grows
+            tail = timings[-max(len(timings) // 10, 1):]
+            tail_rows = min(len(tail) * batch_size, rows)
+            results[name] = {
+                'rows_per_second': rows / sum(timings),
+                'tail_rows_per_second': tail_rows / sum(tail),
+                'index_mb': index_size / 1024 / 1024,
+                'table_mb': table_size / 1024 / 1024,
+            }
+
+        self.stdout.write(
+            f"{'keys':<8}{'rows/s':>12}{'last 10% rows/s':>18}{'pkey MB':>10}{'table MB':>10}"
+        )
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:<8}{result['rows_per_second']:>12.0f}{result['tail_rows_per_second']:>18.0f}"
+                f"{result['index_mb']:>10.1f}{result['table_mb']:>10.1f}"
+            )
+        self.stdout.write(
+            f"uuid7: {results['uuid7']['rows_per_second'] / results['uuid4']['rows_per_second']:.2f}x throughput, "
+            f"{results['uuid7']['index_mb'] / results['uuid4']['index_mb']:.2f}x index size of uuid4"
+        )
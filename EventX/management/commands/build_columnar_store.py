@@ -0,0 +1,31 @@
+"""
+Worker that refreshes the columnar booking item snapshot behind the ad-hoc analytics queries
+"""
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from analytics.columnar import build_snapshot
+from EventX.db_router import replica_reads
+
+
+class Command(BaseCommand):
+    help = "Extract booking items into the memory-mapped columnar analytics store"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help="Keep refreshing the snapshot")
+        parser.add_argument(
+            '--interval', type=float, default=None,
+            help="Seconds between runs, defaults to ANALYTICS_COLUMNAR_REFRESH_SECONDS"
+        )
+
+    def handle(self, *args, **options):
+        interval = options['interval'] or settings.ANALYTICS_COLUMNAR_REFRESH_SECONDS
+        while True:
+            started = time.monotonic()
+            with replica_reads():
+                meta = build_snapshot()
+            self.stdout.write(f"Built snapshot of {meta['rows']} booking items in {time.monotonic() - started:.3f}s")
+
+            if not options['loop']:
+                break
+            time.sleep(interval)
@@ -0,0 +1,50 @@
+"""
+Worker that confirms paid bookings in batches
+"""
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, close_old_connections
+from EventX.db_utils import TransactionConflictError
+from bookings.confirmation import confirm_paid_bookings
+
+
+class Command(BaseCommand):
+    help = "Confirm paid bookings in batches, moving held inventory to sold"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=settings.BOOKING_CONFIRMATION_BATCH_SIZE)
+        parser.add_argument('--loop', action='store_true', help="Keep polling for paid bookings")
+        parser.add_argument('--interval', type=float, default=1.0, help="Seconds to sleep when the queue is drained")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        while True:
+            started = time.monotonic()
+            try:
+                result = confirm_paid_bookings(batch_size=batch_size)
+            except (TransactionConflictError, OperationalError) as e:
+                # The batch was rolled back, its bookings are picked up again next time
+                if not options['loop']:
+                    raise
+                self.stderr.write(f"Confirmation batch failed, retrying: {e}")
+                # Reconnect if the error left the connection unusable
+                close_old_connections()
+                time.sleep(options['interval'])
+                continue
+            processed = result['confirmed'] + result['expired']
+
+            if processed:
+                elapsed = time.monotonic() - started
+                self.stdout.write(
+                    f"Confirmed {result['confirmed']} bookings, expired {result['expired']} "
+                    f"in {elapsed:.3f}s ({processed / elapsed:.0f} bookings/s)"
+                )
+
+            if not options['loop']:
+                break
+
+            # A full batch means more work is queued, so go straight to the next one
+            if processed < batch_size:
+                time.sleep(options['interval'])
@@ -0,0 +1,18 @@
+"""
+Create the monthly partitions of booking_fact and user_session_dump ahead of time
+"""
+from django.core.management.base import BaseCommand
+from EventX.partition_utils import ensure_partitions
+
+
+class Command(BaseCommand):
+    help = "Create the coming monthly partitions, run at least monthly"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--months-ahead', type=int, default=None, help="Defaults to PARTITION_MONTHS_AHEAD")
+
+    def handle(self, *args, **options):
+        created = ensure_partitions(months_ahead=options['months_ahead'])
+        for name in created:
+            self.stdout.write(f"Created {name}")
+        self.stdout.write(f"{len(created)} partitions created")
@@ -0,0 +1,107 @@
+"""
+EXPLAIN the hot-path queries and check each one uses its index.
+
+Every query is built with the same ORM filters as the view it comes from,
+so a change to a filter or ordering that makes its index unusable fails
+this check. Sequential scans and explicit sorts are disabled for the
+EXPLAIN, because on a small database the planner rightly prefers them or a
+foreign key index: the check is whether the index can serve both the
+filter and the order of the query, not whether it is worth it on this data.
+"""
+from datetime import timedelta
+from uuid import uuid4
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from accounts.models import UserActiveSession
+from bookings.models import Booking
+from inventory.models import InventoryHold, Seat
+
+
+def get_hot_queries():
+    """(name, queryset, expected index) of each hot-path query"""
+    # Ids that match nothing still get the plan of a selective lookup
+    event_id = uuid4()
+    user_id = uuid4()
+    now = timezone.now()
+    window = {'gt': now - timedelta(minutes=1), 'lte': now}
+    queries = [
+        (
+            'session by access token',
+            UserActiveSession.objects.filter(access_token=uuid4().hex),
+            'user_session_token_idx',
+        ),
+        (
+            'active holds of an event',
+            InventoryHold.objects.filter(events_id=event_id, status=InventoryHold.HOLD_STATUS.ACTIVE),
+            'hold_event_active_idx',
+        ),
+        (
+            'expired active holds',
+            InventoryHold.objects.filter(status=InventoryHold.HOLD_STATUS.ACTIVE, expires_at__lt=timezone.now()),
+            'hold_active_expires_idx',
+        ),
+        (
+            'available seats of an event',
+            Seat.objects.filter(event_id=event_id, status=Seat.SEAT_STATUS.AVAILABLE).order_by(
+                'section', 'row_label', 'seat_number'
+            ),
+            'seat_event_available_idx',
+        ),
+        (
+            'booking history of a user',
+            Booking.objects.filter(user_id=user_id).order_by('-created_at'),
+            'booking_user_created_idx',
+        ),
+        (
+            'bookings of an event by status',
+            Booking.objects.filter(events_id=event_id, status=Booking.BOOKING_STATUS.CONFIRMED).order_by('created_at'),
+            'booking_event_status_idx',
+        ),
+        (
+            'funnel holds since the watermark',
+            InventoryHold.objects.filter(created_at__gt=window['gt'], created_at__lte=window['lte']),
+            'hold_created_idx',
+        ),
+    ]
+    # One window query per funnel stage timestamp, see analytics.funnel
+    for field, index_name in [
+        ('created_at', 'booking_created_idx'),
+        ('paid_at', 'booking_paid_idx'),
+        ('confirmed_at', 'booking_confirmed_idx'),
+        ('cancelled_at', 'booking_cancelled_idx'),
+    ]:
+        queries.append((
+            f'funnel bookings by {field} since the watermark',
+            Booking.objects.filter(**{f'{field}__{lookup}': value for lookup, value in window.items()}),
+            index_name,
+        ))
+    return queries
+
+
+class Command(BaseCommand):
+    help = "EXPLAIN the hot-path queries and fail when one no longer uses its index"
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError("The index checks need PostgreSQL")
+
+        regressions = []
+        for name, queryset, index_name in get_hot_queries():
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    cursor.execute("SET LOCAL enable_seqscan = off")
+                    cursor.execute("SET LOCAL enable_sort = off")
+                plan = queryset.explain()
+
+            if index_name in plan:
+                self.stdout.write(f"OK    {name}: {index_name}")
+            else:
+                regressions.append(name)
+                self.stdout.write(f"FAIL  {name}: expected {index_name}")
+            if options['verbosity'] > 1 or index_name not in plan:
+                self.stdout.write(plan)
+
+        if regressions:
+            raise CommandError(f"{len(regressions)} hot queries no longer use their index: {', '.join(regressions)}")
+        self.stdout.write(self.style.SUCCESS("All hot queries use their index"))
@@ -0,0 +1,25 @@
+"""
+Rebuild the event_listing read model from events, ticket types and inventory
+"""
+from django.core.management.base import BaseCommand
+from events.listing import refresh_event_listing
+from events.models import Events
+
+
+class Command(BaseCommand):
+    help = "Recompute every event_listing row, e.g. after a bulk import or to repair drift"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--event-id', action='append', help="Only rebuild these events")
+
+    def handle(self, *args, **options):
+        if options['event_id']:
+            event_ids = options['event_id']
+        else:
+            event_ids = list(Events.objects.order_by('pk').values_list('events_id', flat=True))
+
+        batch_size = options['batch_size']
+        for start in range(0, len(event_ids), batch_size):
+            refresh_event_listing(event_ids[start:start + batch_size])
+            self.stdout.write(f"Refreshed {min(start + batch_size, len(event_ids))}/{len(event_ids)} listings")
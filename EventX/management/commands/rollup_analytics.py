@@ -0,0 +1,36 @@
+"""
+Worker that rolls the booking fact log and the booking funnel up into the daily analytics tables
+"""
+import time
+from django.core.management.base import BaseCommand
+from analytics.funnel import run_funnel_rollup
+from analytics.rollups import run_event_daily_rollup
+
+
+class Command(BaseCommand):
+    help = "Incrementally maintain EventDailyRollup from BookingFact and EventFunnelDaily from holds and bookings using watermarks"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lag', type=int, default=None, help="Seconds to stay behind now, defaults to ANALYTICS_ROLLUP_LAG_SECONDS")
+        parser.add_argument('--loop', action='store_true', help="Keep rolling up new facts")
+        parser.add_argument('--interval', type=float, default=60.0, help="Seconds between runs")
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.monotonic()
+            touched = run_event_daily_rollup(lag_seconds=options['lag'])
+            if touched:
+                self.stdout.write(
+                    f"Recomputed {len(touched)} event days in {time.monotonic() - started:.3f}s"
+                )
+
+            started = time.monotonic()
+            funnel_touched = run_funnel_rollup(lag_seconds=options['lag'])
+            if funnel_touched:
+                self.stdout.write(
+                    f"Recomputed {len(funnel_touched)} funnel days in {time.monotonic() - started:.3f}s"
+                )
+
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
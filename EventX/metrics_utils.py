@@ -0,0 +1,136 @@
+"""
+Simple Redis-backed metrics for EventX application
+"""
+import json
+import time
+from django.core.cache import cache
+from EventX.cache_utils import get_cache_key
+
+METRICS_PREFIX = 'eventx:metrics'
+METRICS_TTL = 7 * 24 * 3600  # keep a week of metrics
+
+
+def _get_client():
+    return cache.client.get_client(write=True)
+
+
+def incr_counter(name: str, *labels, amount: int = 1):
+    """Increment a counter"""
+    key = get_cache_key(METRICS_PREFIX, name, *labels)
+    try:
+        client = _get_client()
+        pipe = client.pipeline(transaction=False)
+        pipe.incrby(key, amount)
+        pipe.expire(key, METRICS_TTL)
+        pipe.execute()
+    except Exception as e:
+        print(f"Metrics error: {e}")
+
+
+def incr_counters(counters: dict, *labels):
+    """Increment several counters in one round-trip"""
+    try:
+        pipe = _get_client().pipeline(transaction=False)
+        for name, amount in counters.items():
+            key = get_cache_key(METRICS_PREFIX, name, *labels)
+            pipe.incrby(key, amount)
+            pipe.expire(key, METRICS_TTL)
+        pipe.execute()
+    except Exception as e:
+        print(f"Metrics error: {e}")
+
+
+def set_gauges(name: str, source: str, values: dict, *labels, ttl: int = METRICS_TTL):
+    """Store the current gauge values reported by one source, e.g. a worker process"""
+    key = get_cache_key(METRICS_PREFIX, name, *labels)
+    try:
+        pipe = _get_client().pipeline(transaction=False)
+        pipe.hset(key, source, json.dumps({**values, 'reported_at': time.time()}))
+        pipe.expire(key, ttl)
+        pipe.execute()
+    except Exception as e:
+        print(f"Metrics error: {e}")
+
+
+def record_timing(name: str, value_ms: float, *labels):
+    """Accumulate the count, total and max of a timing in milliseconds"""
+    key = get_cache_key(METRICS_PREFIX, name, *labels)
+    try:
+        client = _get_client()
+        pipe = client.pipeline(transaction=False)
+        pipe.hincrby(key, 'count', 1)
+        pipe.hincrbyfloat(key, 'sum_ms', value_ms)
+        pipe.hget(key, 'max_ms')
+        pipe.expire(key, METRICS_TTL)
+        _, _, max_ms, _ = pipe.execute()
+        if max_ms is None or float(max_ms) < value_ms:
+            client.hset(key, 'max_ms', value_ms)
+    except Exception as e:
+        print(f"Metrics error: {e}")
+
+
+def get_counter(name: str, *labels) -> int:
+    """Read a counter"""
+    key = get_cache_key(METRICS_PREFIX, name, *labels)
+    try:
+        return int(_get_client().get(key) or 0)
+    except Exception as e:
+        print(f"Metrics error: {e}")
+        return 0
+
+
+def get_timing(name: str, *labels) -> dict:
+    """Read a timing as count, average and max in milliseconds"""
+    key = get_cache_key(METRICS_PREFIX, name, *labels)
+    try:
+        values = _get_client().hgetall(key)
+    except Exception as e:
+        print(f"Metrics error: {e}")
+        values = {}
+
+    count = int(values.get(b'count', 0))
+    total = float(values.get(b'sum_ms', 0))
+    return {
+        'count': count,
+        'avg_ms': round(total / count, 2) if count else 0,
+        'max_ms': round(float(values.get(b'max_ms', 0)), 2)
+    }
+
+
+def get_counters(names, *labels) -> dict:
+    """Read several counters in one round-trip"""
+    keys = [get_cache_key(METRICS_PREFIX, name, *labels) for name in names]
+    try:
+        values = _get_client().mget(keys)
+    except Exception as e:
+        print(f"Metrics error: {e}")
+        values = [None] * len(keys)
+    return {name: int(value or 0) for name, value in zip(names, values)}
+
+
+def get_gauges(name: str, *labels, max_age: float) -> dict:
+    """
+    Gauge values per source, dropping the sources that have not reported
+    for max_age seconds, e.g. workers that exited
+    """
+    key = get_cache_key(METRICS_PREFIX, name, *labels)
+    try:
+        client = _get_client()
+        values = client.hgetall(key)
+    except Exception as e:
+        print(f"Metrics error: {e}")
+        return {}
+
+    gauges, stale = {}, []
+    for source, value in values.items():
+        value = json.loads(value)
+        if time.time() - value.pop('reported_at', 0) > max_age:
+            stale.append(source)
+        else:
+            gauges[source.decode()] = value
+    if stale:
+        try:
+            client.hdel(key, *stale)
+        except Exception as e:
+            print(f"Metrics error: {e}")
+    return gauges
@@ -6,84 +6,111 @@ from accounts.models import UserActiveSession, User
 
 class ValidateTokenMiddleware(MiddlewareMixin):
     """
-    Middleware that blocks requests if JWT access token is not validated
+    Middleware that blocks requests if JWT access token is not validated.
+    Under ASGI it authenticates with the async ORM instead of holding a
+    thread for the two lookups of every request.
     """
-    
-    def process_request(self, request):
+
+    # Skip authentication for certain paths
+    skip_paths = [
+        '/accounts/signup/',
+        '/accounts/login/',
+    ]
+
+    def _error(self, message):
+        return JsonResponse({
+            'success': False,
+            'message': message,
+            'status_code': 401
+        }, status=401)
+
+    def _get_token(self, request):
         """
-        Block request if JWT token is not valid
+        (token, JWT payload, error response) of a request, all None when the
+        path skips authentication
         """
-        # Skip authentication for certain paths
-        skip_paths = [
-            '/accounts/signup/',
-            '/accounts/login/',
-        ]
-        
         # Check if current path should skip authentication
-        for skip_path in skip_paths:
+        for skip_path in self.skip_paths:
             if request.path.startswith(skip_path):
-                return None
-        
+                return None, None, None
+
         # Get token from Authorization header
         auth_header = request.headers.get('Authorization', '')
-        
+
         if not auth_header.startswith('Bearer '):
-            return JsonResponse({
-                'success': False,
-                'message': 'Authorization header required',
-                'status_code': 401
-            }, status=401)
-        
+            return None, None, self._error('Authorization header required')
+
         token = auth_header.replace('Bearer ', '')
-        
+
         if not token:
-            return JsonResponse({
-                'success': False,
-                'message': 'Access token required',
-                'status_code': 401
-            }, status=401)
-        
+            return None, None, self._error('Access token required')
+
+        # Verify JWT token
+        payload = verify_jwt_token(token)
+        if not payload:
+            return None, None, self._error('Invalid access token')
+        return token, payload, None
+
+    def process_request(self, request):
+        """
+        Block request if JWT token is not valid
+        """
         try:
-            # Verify JWT token
-            payload = verify_jwt_token(token)
-            if not payload:
-                return JsonResponse({
-                    'success': False,
-                    'message': 'Invalid access token',
-                    'status_code': 401
-                }, status=401)
-            
+            token, payload, error = self._get_token(request)
+            if not token:
+                return error
+
             # Check if token exists in active sessions
             try:
                 session = UserActiveSession.objects.get(access_token=token)
                 # Update last access time
                 session.save()
-                
+
                 # Fetch the user and add to request
                 user_id = payload['user_id']
                 user = User.objects.get(user_id=user_id)
                 request.validated_user = user
                 request.user_payload = payload
-                
+
             except UserActiveSession.DoesNotExist:
-                return JsonResponse({
-                    'success': False,
-                    'message': 'Token not found in active sessions',
-                    'status_code': 401
-                }, status=401)
+                return self._error('Token not found in active sessions')
             except User.DoesNotExist:
-                return JsonResponse({
-                    'success': False,
-                    'message': 'User not found',
-                    'status_code': 401
-                }, status=401)
+                return self._error('User not found')
             print("Auth Completed")
-                
+
         except Exception as e:
-            return JsonResponse({
-                'success': False,
-                'message': f'Authentication error: {str(e)}',
-                'status_code': 401
-            }, status=401)
-        
+            return self._error(f'Authentication error: {str(e)}')
+
+        return None
+
+    async def aprocess_request(self, request):
+        """
+        Async process_request, the same checks on the async ORM
+        """
+        try:
+            token, payload, error = self._get_token(request)
+            if not token:
+                return error
+
+            try:
+                session = await UserActiveSession.objects.aget(access_token=token)
+                await session.asave()
+
+                request.validated_user = await User.objects.aget(user_id=payload['user_id'])
+                request.user_payload = payload
+
+            except UserActiveSession.DoesNotExist:
+                return self._error('Token not found in active sessions')
+            except User.DoesNotExist:
+                return self._error('User not found')
+            print("Auth Completed")
+
+        except Exception as e:
+            return self._error(f'Authentication error: {str(e)}')
+
         return None
+
+    async def __acall__(self, request):
+        # MiddlewareMixin would run process_request in the shared sync thread
+        response = await self.aprocess_request(request)
+        return response or await self.get_response(request)
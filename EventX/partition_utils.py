@@ -0,0 +1,192 @@
+"""
+Monthly range partitions for the append-only tables
+
+booking_fact is partitioned on occurred_at and user_session_dump on
+logout_datetime, one partition per calendar month named <table>_pYYYY_MM,
+plus a <table>_default partition that catches rows outside every month so
+an insert never fails for want of a partition. Queries that bound the
+partition column only scan the months they cover, and old months leave
+the table with a DETACH instead of a long DELETE and vacuum.
+
+ensure_partitions creates the coming months ahead of time. When the
+default partition already holds rows of a new month they are moved into
+it as the month is created.
+"""
+import re
+from datetime import date, datetime, time
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+# table: (primary key column, partition column)
+PARTITIONED_TABLES = {
+    'booking_fact': ('booking_fact_id', 'occurred_at'),
+    'user_session_dump': ('user_session_dump_id', 'logout_datetime'),
+}
+
+PARTITION_NAME_PATTERN = re.compile(r'_p(\d{4})_(\d{2})$')
+
+
+def get_month_start(value):
+    return date(value.year, value.month, 1)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def get_month_bounds(month):
+    """Half-open [start, end) datetimes of a month in the current timezone"""
+    start = timezone.make_aware(datetime.combine(month, time.min))
+    end = timezone.make_aware(datetime.combine(add_months(month, 1), time.min))
+    return start, end
+
+
+def get_partition_name(table, month):
+    return f"{table}_p{month:%Y_%m}"
+
+
+def get_default_partition_name(table):
+    return f"{table}_default"
+
+
+def get_partitions(table):
+    """The attached monthly partitions of a table: [(name, month)], oldest first"""
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            SELECT child.relname FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = %s
+        """, [table])
+        names = [row[0] for row in cursor.fetchall()]
+
+    partitions = []
+    for name in names:
+        match = PARTITION_NAME_PATTERN.search(name)
+        if match:
+            partitions.append((name, date(int(match.group(1)), int(match.group(2)), 1)))
+    return sorted(partitions, key=lambda partition: partition[1])
+
+
+def create_partition(cursor, table, month):
+    """
+    Create the partition of a month unless it exists. Rows of that month in
+    the default partition are moved into it, as Postgres refuses to create
+    a partition whose rows sit in the default one.
+    """
+    _, column = PARTITIONED_TABLES[table]
+    name = get_partition_name(table, month)
+    default_name = get_default_partition_name(table)
+    start, end = get_month_bounds(month)
+
+    cursor.execute("SELECT to_regclass(%s) IS NOT NULL", [name])
+    if cursor.fetchone()[0]:
+        return False
+
+    cursor.execute(
+        f"SELECT EXISTS (SELECT 1 FROM {default_name} WHERE {column} >= %s AND {column} < %s)",
+        [start, end]
+    )
+    if cursor.fetchone()[0]:
+        cursor.execute(f"ALTER TABLE {table} DETACH PARTITION {default_name}")
+        cursor.execute(f"CREATE TABLE {name} PARTITION OF {table} FOR VALUES FROM (%s) TO (%s)", [start, end])
+        cursor.execute(
+            f"WITH moved AS (DELETE FROM {default_name} WHERE {column} >= %s AND {column} < %s RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved",
+            [start, end]
+        )
+        cursor.execute(f"ALTER TABLE {table} ATTACH PARTITION {default_name} DEFAULT")
+    else:
+        cursor.execute(f"CREATE TABLE {name} PARTITION OF {table} FOR VALUES FROM (%s) TO (%s)", [start, end])
+    return True
+
+
+def ensure_partitions(months_ahead=None, tables=None):
+    """
+    Create the partitions from the current month to months_ahead months
+    from now. Returns the names of the partitions created.
+    """
+    months_ahead = settings.PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+    current = get_month_start(timezone.localdate())
+    created = []
+    for table in tables or PARTITIONED_TABLES:
+        for offset in range(months_ahead + 1):
+            month = add_months(current, offset)
+            with transaction.atomic(), connection.cursor() as cursor:
+                if create_partition(cursor, table, month):
+                    created.append(get_partition_name(table, month))
+    return created
+
+
+def detach_partition(table, name, drop=False):
+    """Detach a partition, leaving it as a standalone table unless drop is set"""
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"ALTER TABLE {table} DETACH PARTITION {name}")
+        if drop:
+            cursor.execute(f"DROP TABLE {name}")
+
+
+def _get_table_definitions(cursor, table):
+    """Foreign keys and secondary indexes of a table, to recreate them on its replacement"""
+    cursor.execute(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'f'",
+        [table]
+    )
+    foreign_keys = cursor.fetchall()
+    cursor.execute(
+        "SELECT indexdef FROM pg_indexes WHERE tablename = %s AND indexname <> %s",
+        [table, f"{table}_pkey"]
+    )
+    indexes = [row[0] for row in cursor.fetchall()]
+    return foreign_keys, indexes
+
+
+def _replace_table(cursor, table, partitioned):
+    """
+    Rebuild a table as a partitioned or a plain table with the same columns,
+    rows, foreign keys and index names. Locks the table while it copies.
+    """
+    primary_key, column = PARTITIONED_TABLES[table]
+    old_table = f"{table}_old"
+    foreign_keys, indexes = _get_table_definitions(cursor, table)
+
+    cursor.execute(f"ALTER TABLE {table} RENAME TO {old_table}")
+    if partitioned:
+        cursor.execute(
+            f"CREATE TABLE {table} (LIKE {old_table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+            f"PARTITION BY RANGE ({column})"
+        )
+        cursor.execute(f"CREATE TABLE {get_default_partition_name(table)} PARTITION OF {table} DEFAULT")
+        cursor.execute(
+            f"SELECT DISTINCT date_trunc('month', {column} AT TIME ZONE %s)::date FROM {old_table}",
+            [timezone.get_current_timezone_name()]
+        )
+        current = get_month_start(timezone.localdate())
+        months = {row[0] for row in cursor.fetchall()}
+        months.update(add_months(current, offset) for offset in range(settings.PARTITION_MONTHS_AHEAD + 1))
+        for month in sorted(months):
+            create_partition(cursor, table, month)
+        key_columns = f"{primary_key}, {column}"
+    else:
+        cursor.execute(f"CREATE TABLE {table} (LIKE {old_table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+        key_columns = primary_key
+
+    cursor.execute(f"INSERT INTO {table} SELECT * FROM {old_table}")
+    cursor.execute(f"DROP TABLE {old_table}")
+
+    # Primary keys of partitioned tables must include the partition column
+    cursor.execute(f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY ({key_columns})")
+    for name, definition in foreign_keys:
+        cursor.execute(f"ALTER TABLE {table} ADD CONSTRAINT {name} {definition}")
+    for definition in indexes:
+        cursor.execute(definition)
+
+
+def partition_table(cursor, table):
+    _replace_table(cursor, table, partitioned=True)
+
+
+def unpartition_table(cursor, table):
+    _replace_table(cursor, table, partitioned=False)
@@ -0,0 +1,89 @@
+"""
+Sparse fieldsets for list endpoints.
+
+A Projection maps the public field names of a listing to ORM lookups, so a
+`?fields=` selection can be pushed down into `.values()` and rows serialized
+from plain dicts without instantiating models. Dotted public names such as
+`venue.city` are nested in the output and can be selected as a group
+(`fields=venue`).
+"""
+from rest_framework import serializers
+
+
+class Projection:
+    """Public fields of a listing and the ORM lookups that back them"""
+
+    def __init__(self, fields, required=()):
+        """
+        fields: {public name: lookup} or {public name: (lookup, transform)}
+        required: lookups every query must select (e.g. the pagination keys)
+        """
+        self.fields = {}
+        for name, spec in fields.items():
+            lookup, transform = spec if isinstance(spec, tuple) else (spec, None)
+            self.fields[name] = (lookup, transform)
+        self.required = tuple(required)
+
+    def parse(self, value):
+        """
+        Resolve a comma separated `fields` parameter into public field names,
+        raising ValueError on unknown names. An empty value selects everything.
+        """
+        if not value:
+            return list(self.fields)
+
+        selected = []
+        unknown = []
+        for name in (part.strip() for part in value.split(',')):
+            if not name:
+                continue
+            matches = [field for field in self.fields if field == name or field.startswith(f'{name}.')]
+            if not matches:
+                unknown.append(name)
+            selected.extend(field for field in matches if field not in selected)
+
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        return selected
+
+    def get_lookups(self, selected, *extra):
+        """ORM lookups to select for the given public field names"""
+        lookups = list(self.required) + [lookup for lookup in extra if lookup not in self.required]
+        for name in selected:
+            lookup = self.fields[name][0]
+            if lookup not in lookups:
+                lookups.append(lookup)
+        return lookups
+
+    def values(self, queryset, selected, *extra):
+        """
+        Restrict a queryset to the lookups needed for the selected fields,
+        plus any extra lookups the caller reads (ordering keys, grouping)
+        """
+        return queryset.values(*self.get_lookups(selected, *extra))
+
+    def serialize(self, rows, selected):
+        """Build the response dicts from `.values()` rows"""
+        fields = [(name.split('.'), *self.fields[name]) for name in selected]
+        data = []
+        for row in rows:
+            item = {}
+            for path, lookup, transform in fields:
+                value = row[lookup]
+                if transform is not None:
+                    value = transform(value)
+                target = item
+                for key in path[:-1]:
+                    target = target.setdefault(key, {})
+                target[path[-1]] = value
+            data.append(item)
+        return data
+
+
+def validate_fields_param(projection, value):
+    """Serializer helper: validate a `fields` parameter against a projection"""
+    try:
+        projection.parse(value)
+    except ValueError as e:
+        raise serializers.ValidationError(str(e))
+    return value
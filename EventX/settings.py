@@ -41,6 +41,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'corsheaders',
     'EventX', 
     'accounts',
@@ -62,6 +63,8 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     # Custom Authentication Middleware
     'EventX.middleware.ValidateTokenMiddleware',
+    'EventX.db_router.ReplicaRoutingMiddleware',
+    'EventX.db_pool.DatabasePoolMetricsMiddleware',
 ]
 
 ROOT_URLCONF = 'EventX.urls'
@@ -82,6 +85,11 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'EventX.wsgi.application'
+ASGI_APPLICATION = 'EventX.asgi.application'
+
+# Serve EventX.asgi with uvicorn workers (see gunicorn_config.py), and route the
+# events list, availability and profile reads to their async views
+SERVE_ASGI = os.getenv('SERVE_ASGI', 'False').lower() == 'true'
 
 
 # Database
@@ -94,9 +102,52 @@ DATABASES = {
         'PASSWORD': os.getenv('DB_PASSWORD'),
         'HOST': os.getenv('DB_HOST'),
         'PORT': os.getenv('DB_PORT'),
+        # Ping a reused connection before the first query of a request
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# Connection reuse, see EventX/db_pool.py. DB_POOL=true gives each worker process a
+# psycopg 3 pool of at most DB_POOL_MAX_SIZE connections; otherwise every thread keeps
+# its connection for DB_CONN_MAX_AGE seconds. Under ASGI each request runs in its own
+# thread, so only the pool reuses connections there.
+DB_POOL = os.getenv('DB_POOL', str(SERVE_ASGI)).lower() == 'true'
+DB_CONN_MAX_AGE = int(os.getenv('DB_CONN_MAX_AGE', '60'))
+DB_POOL_MIN_SIZE = int(os.getenv('DB_POOL_MIN_SIZE', '1'))
+DB_POOL_MAX_SIZE = int(os.getenv('DB_POOL_MAX_SIZE', '4'))  # per worker process and database
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '10'))  # seconds a request waits for a connection
+DB_POOL_MAX_IDLE = float(os.getenv('DB_POOL_MAX_IDLE', '300'))  # seconds before an idle connection above min_size is closed
+DB_POOL_STATS_INTERVAL = float(os.getenv('DB_POOL_STATS_INTERVAL', '10'))  # seconds between pushes of a worker's pool stats
+DB_MAX_CONNECTIONS = int(os.getenv('DB_MAX_CONNECTIONS', '100'))  # server max_connections the workers must fit in
+
+if DB_POOL:
+    DATABASES['default']['CONN_MAX_AGE'] = 0  # connections go back to the pool instead
+    DATABASES['default']['OPTIONS'] = {
+        'pool': {
+            'min_size': DB_POOL_MIN_SIZE,
+            'max_size': DB_POOL_MAX_SIZE,
+            'timeout': DB_POOL_TIMEOUT,
+            'max_idle': DB_POOL_MAX_IDLE,
+        }
+    }
+else:
+    DATABASES['default']['CONN_MAX_AGE'] = DB_CONN_MAX_AGE
+
+# Optional read replica, used by views with use_replica = True (see EventX/db_router.py)
+if os.getenv('DB_REPLICA_HOST'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': os.getenv('DB_REPLICA_NAME', DATABASES['default']['NAME']),
+        'HOST': os.getenv('DB_REPLICA_HOST'),
+        'PORT': os.getenv('DB_REPLICA_PORT', DATABASES['default']['PORT']),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['EventX.db_router.ReplicaRouter']
+DB_REPLICA_MAX_LAG_SECONDS = float(os.getenv('DB_REPLICA_MAX_LAG_SECONDS', '5'))  # fall back to the primary beyond this
+DB_REPLICA_LAG_CHECK_INTERVAL = float(os.getenv('DB_REPLICA_LAG_CHECK_INTERVAL', '5'))  # seconds between lag checks per process
+DB_REPLICA_STICKY_SECONDS = int(os.getenv('DB_REPLICA_STICKY_SECONDS', '10'))  # a user reads from the primary this long after a write
+
 # Redis Cache Configuration
 REDIS_PASSWORD = os.getenv('REDIS_PASSWORD', 'R3dis_pass_2025')
 REDIS_CACHE_URL = os.getenv('REDIS_CACHE_URL', 'redis://redis:6379/1')
@@ -198,6 +249,45 @@ JWT_ACCESS_TOKEN_LIFETIME = 24
 ENABLE_CACHING = os.getenv('ENABLE_CACHING', 'True').lower() == 'true'
 CACHE_TIMEOUT = int(os.getenv('CACHE_TIMEOUT', '300'))  # 5 minutes default
 
+# Transaction Settings
+DB_LOCK_TIMEOUT_MS = int(os.getenv('DB_LOCK_TIMEOUT_MS', '2000'))
+DB_TRANSACTION_MAX_ATTEMPTS = int(os.getenv('DB_TRANSACTION_MAX_ATTEMPTS', '3'))
+DB_TRANSACTION_RETRY_BASE_DELAY = float(os.getenv('DB_TRANSACTION_RETRY_BASE_DELAY', '0.05'))  # seconds
+
+# Event Listing Settings
+EVENT_LISTING_SELLING_FAST_RATIO = float(os.getenv('EVENT_LISTING_SELLING_FAST_RATIO', '0.1'))  # share of capacity left
+
+# Booking Confirmation Settings
+BOOKING_CONFIRMATION_BATCH_SIZE = int(os.getenv('BOOKING_CONFIRMATION_BATCH_SIZE', '500'))
+
+# Booking Export Settings
+BOOKING_EXPORT_CHUNK_SIZE = int(os.getenv('BOOKING_EXPORT_CHUNK_SIZE', '2000'))  # rows fetched from the server-side cursor per round-trip
+
+# Partitioning and Archival Settings
+PARTITION_MONTHS_AHEAD = int(os.getenv('PARTITION_MONTHS_AHEAD', '3'))  # monthly partitions created ahead of time
+ARCHIVE_RETENTION_DAYS = int(os.getenv('ARCHIVE_RETENTION_DAYS', '365'))  # days after an ENDED event before its rows are archived
+SESSION_DUMP_RETENTION_DAYS = int(os.getenv('SESSION_DUMP_RETENTION_DAYS', '180'))  # months of session dumps older than this are detached
+
+# Analytics Rollup Settings
+ANALYTICS_ROLLUP_LAG_SECONDS = int(os.getenv('ANALYTICS_ROLLUP_LAG_SECONDS', '300'))  # leave time for in-flight transactions to commit
+ANALYTICS_ROLLUP_BATCH_SIZE = int(os.getenv('ANALYTICS_ROLLUP_BATCH_SIZE', '500'))  # (event, day) pairs recomputed per statement
+ANALYTICS_SEGMENT_CLOSED_TTL = int(os.getenv('ANALYTICS_SEGMENT_CLOSED_TTL', str(7 * 86400)))  # past days, invalidated by the rollup job
+ANALYTICS_SEGMENT_OPEN_TTL = int(os.getenv('ANALYTICS_SEGMENT_OPEN_TTL', '60'))  # today
+
+# Analytics Columnar Store Settings
+ANALYTICS_COLUMNAR_DIR = os.getenv('ANALYTICS_COLUMNAR_DIR', os.path.join(BASE_DIR, 'var', 'columnar'))  # shared by the builder and the web workers
+ANALYTICS_COLUMNAR_REFRESH_SECONDS = int(os.getenv('ANALYTICS_COLUMNAR_REFRESH_SECONDS', '300'))
+ANALYTICS_COLUMNAR_CHUNK_SIZE = int(os.getenv('ANALYTICS_COLUMNAR_CHUNK_SIZE', '10000'))  # rows fetched from the server-side cursor per round-trip
+ANALYTICS_COLUMNAR_KEEP_SNAPSHOTS = int(os.getenv('ANALYTICS_COLUMNAR_KEEP_SNAPSHOTS', '2'))  # previous snapshots kept for readers still mapping them
+
+# Analytics Report Job Settings
+ANALYTICS_REPORT_JOB_TIMEOUT = int(os.getenv('ANALYTICS_REPORT_JOB_TIMEOUT', '1800'))  # seconds before a running job is considered lost
+ANALYTICS_REPORT_RESULT_TTL = int(os.getenv('ANALYTICS_REPORT_RESULT_TTL', '3600'))  # seconds a completed report is reused
+
+# Real-time Sales Counter Settings
+SALES_COUNTER_RETENTION_MINUTES = int(os.getenv('SALES_COUNTER_RETENTION_MINUTES', '180'))  # minute buckets kept in Redis
+UNIQUE_COUNTER_RETENTION_DAYS = int(os.getenv('UNIQUE_COUNTER_RETENTION_DAYS', '400'))  # daily unique buyer/viewer HyperLogLogs kept
+
 # Celery Configuration
 CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL', f'redis://:{REDIS_PASSWORD}@redis:6379/2')
 CELERY_RESULT_BACKEND = os.getenv('CELERY_RESULT_BACKEND', f'redis://:{REDIS_PASSWORD}@redis:6379/3')
@@ -206,6 +296,9 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
 CELERY_BEAT_SCHEDULER = 'django_celery_beat.schedulers:DatabaseScheduler'
+CELERY_TASK_ROUTES = {
+    'analytics.tasks.*': {'queue': 'analytics'},
+}
 
 # Debug Toolbar Configuration (only in development)
 if DEBUG:
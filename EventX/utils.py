@@ -1,8 +1,15 @@
 from django.http import HttpResponse
 import jwt
+import json
+import base64
 import hashlib
 from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import Q
 from datetime import datetime, timedelta
+from math import ceil
+from asgiref.sync import sync_to_async
 from accounts.models import UserActiveSession
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
 from rest_framework import serializers
@@ -88,6 +95,126 @@ def paginate_queryset(queryset, page, rows_per_page):
     
     return recs, paginator.count
 
+
+async def apaginate_queryset(queryset, page, rows_per_page):
+    """paginate_queryset on the async ORM, out of range pages give the last page"""
+    count = await queryset.acount()
+    num_pages = max(ceil(count / rows_per_page), 1)
+    bottom = (min(page, num_pages) - 1) * rows_per_page
+    records = [record async for record in queryset[bottom:bottom + rows_per_page]]
+    return records, count
+
+class _CursorEncoder(DjangoJSONEncoder):
+    """DjangoJSONEncoder rounds datetimes to milliseconds, which breaks seeking on them"""
+
+    def default(self, o):
+        if isinstance(o, datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def encode_cursor(values):
+    """Encode the ordering values of the last row into an opaque cursor"""
+    return base64.urlsafe_b64encode(json.dumps(values, cls=_CursorEncoder).encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Decode a cursor produced by encode_cursor, raising ValueError if it is malformed"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def _get_ordering_value(record, field):
+    if isinstance(record, dict):
+        return record[field]
+    return getattr(record, field)
+
+
+def _seek_cursor(queryset, ordering, cursor):
+    """Order a queryset and seek past the row the cursor points at"""
+    fields = [field.lstrip('-') for field in ordering]
+
+    if cursor:
+        values = decode_cursor(cursor)
+        if len(values) != len(fields):
+            raise ValueError("Invalid cursor")
+
+        # (a, b) > (x, y)  <=>  a > x OR (a = x AND b > y), honouring each field's direction
+        seek = Q()
+        for index, field in enumerate(ordering):
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            cond = Q(**{f'{fields[index]}__{lookup}': values[index]})
+            for previous in range(index):
+                cond &= Q(**{fields[previous]: values[previous]})
+            seek |= cond
+        queryset = queryset.filter(seek)
+
+    return queryset.order_by(*ordering)
+
+
+def _get_cursor_page(records, ordering, rows_per_page):
+    next_cursor = None
+    if len(records) > rows_per_page:
+        records = records[:rows_per_page]
+        next_cursor = encode_cursor([_get_ordering_value(records[-1], field.lstrip('-')) for field in ordering])
+
+    return records, next_cursor
+
+
+def paginate_queryset_by_cursor(queryset, ordering, cursor, rows_per_page):
+    """
+    Keyset pagination: seek past the row the cursor points at instead of
+    using OFFSET, so every page costs the same however deep it is.
+    `ordering` must end with a unique field, e.g. ('-created_at', 'pk').
+    Returns the page of records and the cursor of the next page (or None).
+    """
+    records = list(_seek_cursor(queryset, ordering, cursor)[:rows_per_page + 1])
+    return _get_cursor_page(records, ordering, rows_per_page)
+
+
+async def apaginate_queryset_by_cursor(queryset, ordering, cursor, rows_per_page):
+    """paginate_queryset_by_cursor on the async ORM"""
+    records = [record async for record in _seek_cursor(queryset, ordering, cursor)[:rows_per_page + 1]]
+    return _get_cursor_page(records, ordering, rows_per_page)
+
+
+def estimate_count(queryset):
+    """Estimate the number of rows from the planner instead of running COUNT(*)"""
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return queryset.count()
+
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def get_total_count(queryset, mode):
+    """Total count for a listing: 'exact', 'estimated' or 'none'"""
+    if mode == 'exact':
+        return queryset.count()
+    if mode == 'estimated':
+        return estimate_count(queryset)
+    return None
+
+
+async def aget_total_count(queryset, mode):
+    """get_total_count on the async ORM"""
+    if mode == 'exact':
+        return await queryset.acount()
+    if mode == 'estimated':
+        return await sync_to_async(estimate_count)(queryset)
+    return None
+
 def validate_enum_str(value, enum_class):
     try:
         # Return the enum value (integer) instead of the enum instance
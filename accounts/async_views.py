@@ -0,0 +1,30 @@
+"""
+Async profile view, served in place of ProfileView under ASGI (SERVE_ASGI)
+"""
+from EventX.helper import AsyncBaseAPIClass
+
+
+class AsyncProfileView(AsyncBaseAPIClass):
+    async def get(self, request):
+        """
+        Get user profile, loaded by ValidateTokenMiddleware
+        """
+        try:
+            # Get validated user from middleware
+            user = request.validated_user
+            
+            self.data = {
+                'user_id': str(user.user_id),
+                'email': user.email,
+                'name': user.name,
+                'user_type': user.user_type,
+                'created_at': user.created_at.isoformat(),
+                'updated_at': user.updated_at.isoformat(),
+                'status': user.status
+            }
+            self.message = "Profile retrieved successfully"
+            
+        except Exception as e:
+            self.message = "Failed to retrieve profile"
+            self.error_occurred(e, custom_code=1110)
+        return self.get_response()
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.6 on 2026-10-19 10:55
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction, and does not lock writes
+    atomic = False
+
+    dependencies = [
+        ('accounts', '0002_alter_user_status'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='useractivesession',
+            index=models.Index(fields=['access_token'], name='user_session_token_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.6 on 2026-10-19 10:57
+
+import EventX.ids
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='usersessiondump',
+            name='user_session_dump_id',
+            field=models.UUIDField(default=EventX.ids.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+    ]
@@ -0,0 +1,28 @@
+from django.db import migrations
+from EventX.partition_utils import partition_table, unpartition_table
+
+
+def partition_user_session_dump(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        partition_table(cursor, 'user_session_dump')
+
+
+def unpartition_user_session_dump(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        unpartition_table(cursor, 'user_session_dump')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_uuid7_primary_keys'),
+    ]
+
+    # Monthly partitions on the insert time, the model itself is unchanged
+    operations = [
+        migrations.RunPython(partition_user_session_dump, unpartition_user_session_dump),
+    ]
@@ -2,6 +2,7 @@ from uuid import uuid4
 from django.db import models
 from django_enumfield import enum
 from django.contrib.auth.hashers import make_password, check_password
+from EventX.ids import uuid7
 
 class User(models.Model):
     class Meta:
@@ -38,6 +39,10 @@ class User(models.Model):
 class UserActiveSession(models.Model):
     class Meta:
         db_table = "user_active_session"
+        indexes = [
+            # Every authenticated request looks its session up by token
+            models.Index(fields=['access_token'], name='user_session_token_idx'),
+        ]
 
     user_active_session_id = models.UUIDField(primary_key=True, default=uuid4, editable=False)
     user_id = models.ForeignKey(User, on_delete=models.CASCADE, related_name="active_sessions")
@@ -49,7 +54,7 @@ class UserSessionDump(models.Model):
     class Meta:
         db_table = "user_session_dump"
 
-    user_session_dump_id = models.UUIDField(primary_key=True, default=uuid4, editable=False)
+    user_session_dump_id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     user_id = models.ForeignKey(User, on_delete=models.CASCADE, related_name="session_dumps")
     access_token = models.CharField(max_length=300)
     login_datetime = models.DateTimeField()
@@ -1,8 +1,10 @@
+from django.conf import settings
 from django.urls import path
+from accounts.async_views import AsyncProfileView
 from accounts.views import SignUpView, LoginView, ProfileView
 
 urlpatterns = [
     path('signup/', SignUpView.as_view(), name='signup'),
     path('login/', LoginView.as_view(), name='login'),
-    path('profile/', ProfileView.as_view(), name='profile'),
+    path('profile/', (AsyncProfileView if settings.SERVE_ASGI else ProfileView).as_view(), name='profile'),
 ]
\ No newline at end of file
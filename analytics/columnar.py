@@ -0,0 +1,387 @@
+"""
+Columnar snapshot of the booking items for ad-hoc analytics.
+
+build_snapshot extracts one row per booking item, joined with its booking,
+into NumPy arrays saved as .npy files under ANALYTICS_COLUMNAR_DIR. Ids
+are replaced by integer codes into dictionaries kept in meta.json, so
+every column is a fixed-width array. A new snapshot is written to its own
+directory and published by atomically replacing the CURRENT file, so a
+reader never sees a half-written snapshot.
+
+run_query memory-maps the current snapshot once per process and answers
+filters, group-bys and metrics with vectorized NumPy operations, without
+touching Postgres. Answers are as fresh as the last snapshot, which
+build_columnar_store refreshes every ANALYTICS_COLUMNAR_REFRESH_SECONDS.
+"""
+import calendar
+import json
+import os
+import shutil
+import time
+from datetime import date, timedelta
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+from bookings.models import Booking, BookingItem
+from events.models import Events, TicketType, Venue
+
+CURRENT_FILE = 'CURRENT'
+META_FILE = 'meta.json'
+
+# Item columns and their dtypes. Times are Unix seconds, -1 when unset;
+# created_local is the local wall clock time used for calendar dimensions.
+ITEM_COLUMNS = {
+    'booking': np.int32,
+    'user': np.int32,
+    'event': np.int32,
+    'ticket_type': np.int32,
+    'status': np.int8,
+    'created_at': np.int64,
+    'created_local': np.int64,
+    'cancelled_at': np.int64,
+    'tickets': np.int32,
+    'amount_cents': np.int64,
+}
+
+# Per event code
+EVENT_COLUMNS = {
+    'venue': np.int32,
+    'starts_local': np.int64,
+}
+
+DIMENSIONS = ('event', 'venue', 'ticket_type', 'status', 'day', 'month', 'weekday', 'hour', 'event_weekday')
+METRICS = (
+    'items', 'bookings', 'buyers', 'tickets', 'amount_cents',
+    'cancellation_lag_hours', 'cancellation_lag_median_hours',
+)
+STATUSES = [status.name for status in Booking.BOOKING_STATUS]
+
+
+class ColumnarStoreMissing(Exception):
+    """Raised when no snapshot has been built yet"""
+
+
+def _get_root():
+    return settings.ANALYTICS_COLUMNAR_DIR
+
+
+def _to_seconds(value):
+    return int(value.timestamp()) if value else -1
+
+
+def _to_local_seconds(value):
+    # Wall clock seconds, so // 86400 gives the local day
+    return calendar.timegm(timezone.localtime(value).timetuple())
+
+
+class _Codes(dict):
+    """Dense integer codes for ids, in first-seen order"""
+
+    def code(self, value):
+        if value is None:
+            return -1
+        return self.setdefault(value, len(self))
+
+    def ids(self):
+        return [str(value) for value in self]
+
+
+def _extract():
+    """Read the booking items and their dimensions. Returns (item columns, event columns, meta)."""
+    bookings, users, events, venues, ticket_types = _Codes(), _Codes(), _Codes(), _Codes(), _Codes()
+    columns = {name: [] for name in ITEM_COLUMNS}
+
+    event_rows = Events.objects.values_list('events_id', 'event_name', 'venue_id', 'starts_at').order_by('pk')
+    event_names, event_columns = [], {name: [] for name in EVENT_COLUMNS}
+    for event_id, event_name, venue_id, starts_at in event_rows:
+        events.code(event_id)
+        event_names.append(event_name)
+        event_columns['venue'].append(venues.code(venue_id))
+        event_columns['starts_local'].append(_to_local_seconds(starts_at))
+
+    rows = BookingItem.objects.values_list(
+        'booking_id', 'booking_id__user_id', 'booking_id__events_id', 'ticket_type_id',
+        'booking_id__status', 'booking_id__created_at', 'booking_id__cancelled_at',
+        'quantity', 'price_cents'
+    ).order_by().iterator(chunk_size=settings.ANALYTICS_COLUMNAR_CHUNK_SIZE)
+
+    for booking_id, user_id, event_id, ticket_type_id, status, created_at, cancelled_at, quantity, price in rows:
+        columns['booking'].append(bookings.code(booking_id))
+        columns['user'].append(users.code(user_id))
+        columns['event'].append(events.code(event_id))
+        columns['ticket_type'].append(ticket_types.code(ticket_type_id))
+        columns['status'].append(int(status))
+        columns['created_at'].append(_to_seconds(created_at))
+        columns['created_local'].append(_to_local_seconds(created_at))
+        columns['cancelled_at'].append(_to_seconds(cancelled_at))
+        columns['tickets'].append(quantity)
+        columns['amount_cents'].append(price * quantity)
+
+    venue_names = dict(Venue.objects.filter(pk__in=list(venues)).values_list('venue_id', 'name'))
+    ticket_type_names = dict(TicketType.objects.filter(pk__in=list(ticket_types)).values_list(
+        'ticket_type_id', 'ticket_type_name'
+    ))
+    meta = {
+        'built_at': timezone.now().isoformat(),
+        'rows': len(columns['booking']),
+        'bookings': len(bookings),
+        'users': len(users),
+        'events': {'ids': events.ids(), 'names': event_names},
+        'venues': {'ids': venues.ids(), 'names': [venue_names.get(venue_id) for venue_id in venues]},
+        'ticket_types': {
+            'ids': ticket_types.ids(),
+            'names': [ticket_type_names.get(ticket_type_id) for ticket_type_id in ticket_types],
+        },
+    }
+    return columns, event_columns, meta
+
+
+def build_snapshot():
+    """Extract a new snapshot and publish it as the current one. Returns its meta."""
+    root = _get_root()
+    os.makedirs(root, exist_ok=True)
+    columns, event_columns, meta = _extract()
+
+    name = f"{timezone.now():%Y%m%dT%H%M%S}-{os.getpid()}"
+    path = os.path.join(root, name)
+    os.makedirs(path)
+    for column, dtype in ITEM_COLUMNS.items():
+        np.save(os.path.join(path, f"{column}.npy"), np.asarray(columns[column], dtype=dtype))
+    for column, dtype in EVENT_COLUMNS.items():
+        np.save(os.path.join(path, f"event_{column}.npy"), np.asarray(event_columns[column], dtype=dtype))
+    with open(os.path.join(path, META_FILE), 'w') as meta_file:
+        json.dump(meta, meta_file)
+
+    current_tmp = os.path.join(root, f"{CURRENT_FILE}.{os.getpid()}")
+    with open(current_tmp, 'w') as current_file:
+        current_file.write(name)
+    os.replace(current_tmp, os.path.join(root, CURRENT_FILE))
+
+    _remove_old_snapshots(root, name)
+    return meta
+
+
+def _remove_old_snapshots(root, current):
+    # Keep a few previous snapshots for readers that still have them mapped
+    snapshots = sorted(
+        entry for entry in os.listdir(root)
+        if entry != current and os.path.isdir(os.path.join(root, entry))
+    )
+    for entry in snapshots[:max(len(snapshots) - settings.ANALYTICS_COLUMNAR_KEEP_SNAPSHOTS, 0)]:
+        shutil.rmtree(os.path.join(root, entry), ignore_errors=True)
+
+
+# Per process: the memory-mapped current snapshot
+_snapshot = {'name': None, 'columns': None, 'event_columns': None, 'meta': None}
+
+
+def get_snapshot():
+    """The current snapshot, memory-mapped on first use and after each refresh"""
+    root = _get_root()
+    try:
+        with open(os.path.join(root, CURRENT_FILE)) as current_file:
+            name = current_file.read().strip()
+    except FileNotFoundError:
+        raise ColumnarStoreMissing("The analytics store has not been built yet") from None
+
+    if name != _snapshot['name']:
+        path = os.path.join(root, name)
+        with open(os.path.join(path, META_FILE)) as meta_file:
+            meta = json.load(meta_file)
+        _snapshot.update(
+            name=name,
+            meta=meta,
+            columns={
+                column: np.load(os.path.join(path, f"{column}.npy"), mmap_mode='r')
+                for column in ITEM_COLUMNS
+            },
+            event_columns={
+                column: np.load(os.path.join(path, f"event_{column}.npy"), mmap_mode='r')
+                for column in EVENT_COLUMNS
+            },
+        )
+    return _snapshot
+
+
+def _local_day_seconds(day):
+    return calendar.timegm(day.timetuple())
+
+
+def _get_code(ids, value):
+    # -2 matches no row, unlike -1 which marks a missing id
+    value = str(value)
+    return ids.index(value) if value in ids else -2
+
+
+def _get_mask(snapshot, filters):
+    columns, event_columns, meta = snapshot['columns'], snapshot['event_columns'], snapshot['meta']
+    mask = np.ones(meta['rows'], dtype=bool)
+    if filters.get('start_date'):
+        mask &= columns['created_local'] >= _local_day_seconds(filters['start_date'])
+    if filters.get('end_date'):
+        mask &= columns['created_local'] < _local_day_seconds(filters['end_date'] + timedelta(days=1))
+    if filters.get('event_id'):
+        mask &= columns['event'] == _get_code(meta['events']['ids'], filters['event_id'])
+    if filters.get('venue_id'):
+        venue_code = _get_code(meta['venues']['ids'], filters['venue_id'])
+        mask &= np.asarray(event_columns['venue'])[columns['event']] == venue_code
+    if filters.get('ticket_type_id'):
+        mask &= columns['ticket_type'] == _get_code(meta['ticket_types']['ids'], filters['ticket_type_id'])
+    if filters.get('status'):
+        codes = [Booking.BOOKING_STATUS.get(name).value for name in filters['status']]
+        mask &= np.isin(columns['status'], codes)
+    return mask
+
+
+def _get_labelled_ids(meta, key, id_field, name_field):
+    """Label of a dimension whose code 0 stands for a missing id"""
+    ids, names = meta[key]['ids'], meta[key]['names']
+
+    def label(code):
+        if not code:
+            return {id_field: None, name_field: None}
+        return {id_field: ids[code - 1], name_field: names[code - 1]}
+    return label, len(ids) + 1
+
+
+def _get_dimension(snapshot, dimension, selected):
+    """(integer codes of the selected rows, number of codes, label of a code)"""
+    event_columns, meta = snapshot['event_columns'], snapshot['meta']
+
+    if dimension == 'event':
+        label, size = _get_labelled_ids(meta, 'events', 'event_id', 'event_name')
+        return selected['event'] + 1, size, label
+    if dimension == 'venue':
+        label, size = _get_labelled_ids(meta, 'venues', 'venue_id', 'venue_name')
+        return np.asarray(event_columns['venue'])[selected['event']] + 1, size, label
+    if dimension == 'ticket_type':
+        label, size = _get_labelled_ids(meta, 'ticket_types', 'ticket_type_id', 'ticket_type_name')
+        return selected['ticket_type'] + 1, size, label
+    if dimension == 'status':
+        size = max(status.value for status in Booking.BOOKING_STATUS) + 1
+        return selected['status'].astype(np.int64), size, Booking.BOOKING_STATUS.get_name
+
+    if dimension == 'event_weekday':
+        local = np.asarray(event_columns['starts_local'])[selected['event']]
+    else:
+        local = selected['created_local']
+    days = local // 86400
+    if dimension in ('weekday', 'event_weekday'):
+        # 1970-01-01 was a Thursday, Monday is 0
+        return (days + 3) % 7, 7, lambda code: calendar.day_name[code]
+    if dimension == 'hour':
+        return (local % 86400) // 3600, 24, int
+    if dimension == 'day':
+        first = int(days.min())
+        return days - first, int(days.max()) - first + 1, lambda code: (
+            date(1970, 1, 1) + timedelta(days=first + code)
+        ).isoformat()
+
+    months = days.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+    first = int(months.min())
+    return months - first, int(months.max()) - first + 1, lambda code: (
+        f"{1970 + (first + code) // 12}-{(first + code) % 12 + 1:02d}"
+    )
+
+
+def _count_distinct(groups, values, value_count, group_count):
+    pairs = np.unique(groups * value_count + values)
+    return np.bincount(pairs // value_count, minlength=group_count)
+
+
+def _cancellation_lags(selected, groups, meta, group_count):
+    """Mean and median hours from booking to cancellation per group, once per booking"""
+    cancelled = selected['cancelled_at'] >= 0
+    pairs, first = np.unique(
+        groups[cancelled] * meta['bookings'] + selected['booking'][cancelled],
+        return_index=True
+    )
+    lag_groups = pairs // meta['bookings']
+    lags = (selected['cancelled_at'][cancelled][first] - selected['created_at'][cancelled][first]) / 3600
+
+    counts = np.bincount(lag_groups, minlength=group_count)
+    sums = np.bincount(lag_groups, weights=lags, minlength=group_count)
+    means = np.divide(sums, counts, out=np.full(group_count, np.nan), where=counts > 0)
+
+    medians = np.full(group_count, np.nan)
+    order = np.lexsort((lags, lag_groups))
+    starts = np.searchsorted(lag_groups[order], np.arange(group_count))
+    for group in np.flatnonzero(counts):
+        group_lags = lags[order][starts[group]:starts[group] + counts[group]]
+        medians[group] = np.median(group_lags)
+    return means, medians
+
+
+def run_query(params):
+    """
+    Filter the current snapshot, group it by params['group_by'] and compute
+    params['metrics'] per group. Returns the rows sorted by order_by.
+    """
+    started = time.perf_counter()
+    snapshot = get_snapshot()
+    columns, meta = snapshot['columns'], snapshot['meta']
+
+    mask = _get_mask(snapshot, params)
+    row_count = int(mask.sum())
+    result = {
+        'snapshot_built_at': meta['built_at'],
+        'matched_items': row_count,
+        'total_groups': 0,
+        'rows': [],
+    }
+    if not row_count:
+        result['query_ms'] = round((time.perf_counter() - started) * 1000, 2)
+        return result
+    selected = {column: np.asarray(values)[mask] for column, values in columns.items()}
+
+    dimensions = [_get_dimension(snapshot, dimension, selected) for dimension in params['group_by']]
+    if dimensions:
+        keys = np.ravel_multi_index(
+            [codes for codes, _, _ in dimensions],
+            [size for _, size, _ in dimensions]
+        )
+        group_keys, groups = np.unique(keys, return_inverse=True)
+    else:
+        group_keys, groups = np.zeros(1, dtype=np.int64), np.zeros(row_count, dtype=np.int64)
+    group_count = len(group_keys)
+
+    values = {}
+    metrics = params['metrics']
+    if 'items' in metrics:
+        values['items'] = np.bincount(groups, minlength=group_count)
+    if 'tickets' in metrics:
+        values['tickets'] = np.bincount(groups, weights=selected['tickets'], minlength=group_count)
+    if 'amount_cents' in metrics:
+        values['amount_cents'] = np.bincount(groups, weights=selected['amount_cents'], minlength=group_count)
+    if 'bookings' in metrics:
+        values['bookings'] = _count_distinct(groups, selected['booking'], meta['bookings'], group_count)
+    if 'buyers' in metrics:
+        values['buyers'] = _count_distinct(groups, selected['user'], meta['users'], group_count)
+    if 'cancellation_lag_hours' in metrics or 'cancellation_lag_median_hours' in metrics:
+        means, medians = _cancellation_lags(selected, groups, meta, group_count)
+        values['cancellation_lag_hours'] = means
+        values['cancellation_lag_median_hours'] = medians
+
+    order_by = params.get('order_by') or metrics[0]
+    order = np.argsort(-np.nan_to_num(values[order_by], nan=-np.inf), kind='stable')[:params['limit']]
+
+    codes = np.unravel_index(group_keys, [size for _, size, _ in dimensions]) if dimensions else []
+    rows = []
+    for group in order:
+        row = {}
+        for dimension, (_, _, label), dimension_codes in zip(params['group_by'], dimensions, codes):
+            row[dimension] = label(int(dimension_codes[group]))
+        for metric in metrics:
+            value = values[metric][group]
+            if metric.startswith('cancellation_lag'):
+                row[metric] = None if np.isnan(value) else round(float(value), 2)
+            else:
+                row[metric] = int(value)
+        rows.append(row)
+
+    result.update(
+        total_groups=group_count,
+        rows=rows,
+        query_ms=round((time.perf_counter() - started) * 1000, 2)
+    )
+    return result
@@ -0,0 +1,162 @@
+"""
+Real-time sales counters per event and minute, kept in Redis.
+
+Each (event, minute) bucket is one hash holding the event totals under
+"<field>" and the per ticket type counts under "<field>:<ticket_type_id>".
+Writes are a single pipeline of HINCRBY and EXPIRE, so buckets age out
+after SALES_COUNTER_RETENTION_MINUTES. A read of the last N minutes is one
+pipelined round-trip. Counter errors are printed and never fail a booking.
+
+Unique buyers and viewers are HyperLogLogs per event and day, plus one per
+day across all events. PFCOUNT over several days merges them, so a distinct
+count over any date range costs one command and about 12KB per key,
+with a standard error of 0.81%.
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from EventX.cache_utils import get_async_redis, get_cache_key
+
+SALES_COUNTER_PREFIX = 'eventx:sales'
+UNIQUE_COUNTER_PREFIX = 'eventx:unique'
+UNIQUE_BUYERS = 'buyers'
+UNIQUE_VIEWERS = 'viewers'
+ALL_EVENTS = 'all'
+
+# Ticket counts except revenue and refunds, which are in cents
+SALES_COUNTER_FIELDS = ('holds', 'booked', 'sold', 'cancelled', 'revenue', 'refunds')
+
+
+def _get_client():
+    return cache.client.get_client(write=True)
+
+
+def _get_minute(moment):
+    return int(moment.timestamp()) // 60
+
+
+def _get_bucket_key(event_id, minute):
+    return get_cache_key(SALES_COUNTER_PREFIX, event_id, minute)
+
+
+def incr_sales_counters(lines, occurred_at=None):
+    """
+    Add (event_id, ticket_type_id, {field: amount}) lines to the current
+    minute buckets. ticket_type_id may be None to count the event only.
+    """
+    minute = _get_minute(occurred_at or timezone.now())
+    ttl = (settings.SALES_COUNTER_RETENTION_MINUTES + 1) * 60
+    try:
+        pipe = _get_client().pipeline(transaction=False)
+        keys = set()
+        for event_id, ticket_type_id, amounts in lines:
+            key = _get_bucket_key(event_id, minute)
+            keys.add(key)
+            for field, amount in amounts.items():
+                if not amount:
+                    continue
+                pipe.hincrby(key, field, amount)
+                if ticket_type_id:
+                    pipe.hincrby(key, f'{field}:{ticket_type_id}', amount)
+        if not keys:
+            return
+        for key in keys:
+            pipe.expire(key, ttl)
+        pipe.execute()
+    except Exception as e:
+        print(f"Sales counter error: {e}")
+
+
+def get_sales_counters(event_id, minutes):
+    """
+    The last `minutes` buckets of an event, oldest first, with totals over
+    the window for the event and each ticket type.
+    """
+    current = _get_minute(timezone.now())
+    minute_range = range(current - minutes + 1, current + 1)
+    try:
+        pipe = _get_client().pipeline(transaction=False)
+        for minute in minute_range:
+            pipe.hgetall(_get_bucket_key(event_id, minute))
+        buckets = pipe.execute()
+    except Exception as e:
+        print(f"Sales counter error: {e}")
+        buckets = [{} for _ in minute_range]
+
+    totals = dict.fromkeys(SALES_COUNTER_FIELDS, 0)
+    ticket_types = defaultdict(lambda: dict.fromkeys(SALES_COUNTER_FIELDS, 0))
+    series = []
+    for minute, bucket in zip(minute_range, buckets):
+        counts = dict.fromkeys(SALES_COUNTER_FIELDS, 0)
+        for name, value in bucket.items():
+            field, _, ticket_type_id = name.decode().partition(':')
+            if field not in counts:
+                continue
+            if ticket_type_id:
+                ticket_types[ticket_type_id][field] += int(value)
+            else:
+                counts[field] = int(value)
+                totals[field] += int(value)
+        series.append({
+            'minute': datetime.fromtimestamp(minute * 60, tz=dt_timezone.utc),
+            **counts,
+        })
+
+    return {
+        'event_id': str(event_id),
+        'minutes': minutes,
+        'buckets': series,
+        'totals': totals,
+        'ticket_types': dict(ticket_types),
+    }
+
+
+def _get_unique_key(kind, event_id, day):
+    return get_cache_key(UNIQUE_COUNTER_PREFIX, kind, event_id, day.isoformat())
+
+
+def add_unique_user(kind, event_id, user_id):
+    """Add a user to today's buyers or viewers of an event and of all events"""
+    day = timezone.localdate()
+    ttl = settings.UNIQUE_COUNTER_RETENTION_DAYS * 86400
+    try:
+        pipe = _get_client().pipeline(transaction=False)
+        for key in (_get_unique_key(kind, event_id, day), _get_unique_key(kind, ALL_EVENTS, day)):
+            pipe.pfadd(key, str(user_id))
+            pipe.expire(key, ttl)
+        pipe.execute()
+    except Exception as e:
+        print(f"Unique counter error: {e}")
+
+
+async def aadd_unique_user(kind, event_id, user_id):
+    """add_unique_user for the async views, on the redis.asyncio client"""
+    day = timezone.localdate()
+    ttl = settings.UNIQUE_COUNTER_RETENTION_DAYS * 86400
+    try:
+        pipe = get_async_redis().pipeline(transaction=False)
+        for key in (_get_unique_key(kind, event_id, day), _get_unique_key(kind, ALL_EVENTS, day)):
+            pipe.pfadd(key, str(user_id))
+            pipe.expire(key, ttl)
+        await pipe.execute()
+    except Exception as e:
+        print(f"Unique counter error: {e}")
+
+
+def count_unique_users(kind, start_date, end_date, event_id=None):
+    """Approximate distinct buyers or viewers over the days of a range, one PFCOUNT"""
+    oldest = timezone.localdate() - timedelta(days=settings.UNIQUE_COUNTER_RETENTION_DAYS - 1)
+    day = max(start_date, oldest)
+    keys = []
+    while day <= end_date:
+        keys.append(_get_unique_key(kind, event_id or ALL_EVENTS, day))
+        day += timedelta(days=1)
+    if not keys:
+        return 0
+    try:
+        return _get_client().pfcount(*keys)
+    except Exception as e:
+        print(f"Unique counter error: {e}")
+        return 0
@@ -0,0 +1,59 @@
+"""
+Append booking lifecycle facts for the analytics rollups.
+
+Facts are written in the same transaction as the booking state change, one
+row per booking and ticket type, so the rollup job never reads Booking.
+The same lines feed the real-time sales counters once the transaction
+commits.
+"""
+from django.db import transaction
+from django.db.models import F, Sum
+from analytics.counters import incr_sales_counters
+from analytics.models import BookingFact
+from bookings.models import BookingItem
+
+
+def _get_counter_amounts(action, tickets, amount_cents):
+    if action == BookingFact.ACTION.BOOKING_CREATED:
+        return {'booked': tickets}
+    if action == BookingFact.ACTION.BOOKING_CONFIRMED:
+        return {'sold': tickets, 'revenue': amount_cents}
+    return {'cancelled': tickets, 'refunds': amount_cents}
+
+
+def record_booking_facts(bookings, action, occurred_at, refund=True):
+    """
+    Append one fact per booking and ticket type for the given bookings.
+    For BOOKING_CANCELLED, tickets and amount_cents are the sold tickets
+    and the refunded amount, so pass refund=False when the booking was never
+    confirmed: the fact then only counts the cancellation.
+    """
+    event_by_booking = {booking.booking_id: booking.events_id_id for booking in bookings}
+    if not event_by_booking:
+        return
+
+    lines = BookingItem.objects.filter(
+        booking_id__in=list(event_by_booking)
+    ).values('booking_id', 'ticket_type_id').annotate(
+        tickets=Sum('quantity'),
+        amount_cents=Sum(F('price_cents') * F('quantity'))
+    ).order_by()
+
+    facts = BookingFact.objects.bulk_create([
+        BookingFact(
+            event_id_id=event_by_booking[line['booking_id']],
+            ticket_type_id_id=line['ticket_type_id'],
+            booking_id=line['booking_id'],
+            occurred_at=occurred_at,
+            action=action,
+            tickets=(line['tickets'] or 0) if refund else 0,
+            amount_cents=(line['amount_cents'] or 0) if refund else 0,
+        )
+        for line in lines
+    ])
+
+    counter_lines = [
+        (fact.event_id_id, fact.ticket_type_id_id, _get_counter_amounts(action, fact.tickets, fact.amount_cents))
+        for fact in facts
+    ]
+    transaction.on_commit(lambda: incr_sales_counters(counter_lines, occurred_at))
@@ -0,0 +1,168 @@
+"""
+Incremental conversion funnel of the booking flow.
+
+A booking started through the booking API takes an inventory hold, is
+created with it, is paid and is then confirmed by the confirmation worker.
+Every stage is counted on the (event, day) of its own timestamp, and the
+bookings confirmed on a day add their latencies to that day's sketches:
+
+    hold_to_paid     hold created -> payment recorded
+    paid_to_confirm  payment recorded -> booking confirmed
+    total            hold created -> booking confirmed
+
+Like analytics.rollups, a watermark bounds each run to the stage timestamps
+between the last run and `now - lag`. The (event, day) pairs they touch are
+recomputed from the holds and bookings of those days, so a run is
+idempotent and reads only recent rows, never the whole bookings table.
+Reports merge the daily sketches of a range, see get_funnel_report.
+"""
+from collections import defaultdict
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from analytics.models import AnalyticsWatermark, EventFunnelDaily
+from analytics.sketches import QuantileSketch
+from bookings.models import Booking
+from inventory.models import InventoryHold
+
+EVENT_FUNNEL_WATERMARK = 'event_funnel'
+
+STAGES = ['holds', 'bookings', 'paid', 'confirmed', 'cancelled']
+LATENCIES = ['hold_to_paid', 'paid_to_confirm', 'total']
+
+# Booking timestamp of each stage, all indexed for the watermark window
+BOOKING_STAGE_FIELDS = {
+    'bookings': 'created_at',
+    'paid': 'paid_at',
+    'confirmed': 'confirmed_at',
+    'cancelled': 'cancelled_at',
+}
+
+
+def _get_touched(since, until):
+    """(event_id, day) pairs with a stage timestamp in (since, until]"""
+    touched = set()
+    holds = InventoryHold.objects.filter(created_at__gt=since, created_at__lte=until)
+    for event_id, created_at in holds.values_list('events_id', 'created_at'):
+        touched.add((event_id, timezone.localdate(created_at)))
+
+    # One range scan per timestamp index rather than an OR across all of them
+    for field in BOOKING_STAGE_FIELDS.values():
+        bookings = Booking.objects.filter(**{f'{field}__gt': since, f'{field}__lte': until})
+        for event_id, value in bookings.values_list('events_id', field):
+            touched.add((event_id, timezone.localdate(value)))
+    return touched
+
+
+def _seconds(start, end):
+    if start is None or end is None:
+        return None
+    return max((end - start).total_seconds(), 0)
+
+
+def _recompute_event_days(pairs):
+    """Recompute the funnel rows of the given (event_id, day) pairs"""
+    event_ids = {event_id for event_id, _ in pairs}
+    days = {day for _, day in pairs}
+    range_start = timezone.make_aware(datetime.combine(min(days), time.min))
+    range_end = timezone.make_aware(datetime.combine(max(days) + timedelta(days=1), time.min))
+    rows = defaultdict(lambda: {
+        'counts': dict.fromkeys(STAGES, 0),
+        'sketches': {name: QuantileSketch() for name in LATENCIES},
+    })
+
+    holds = InventoryHold.objects.filter(
+        events_id__in=event_ids,
+        created_at__gte=range_start,
+        created_at__lt=range_end
+    )
+    for event_id, created_at in holds.values_list('events_id', 'created_at'):
+        rows[(event_id, timezone.localdate(created_at))]['counts']['holds'] += 1
+
+    in_range = Q()
+    for field in BOOKING_STAGE_FIELDS.values():
+        in_range |= Q(**{f'{field}__gte': range_start, f'{field}__lt': range_end})
+    bookings = Booking.objects.filter(in_range, events_id__in=event_ids).values_list(
+        'events_id', 'hold_id__created_at', *BOOKING_STAGE_FIELDS.values()
+    )
+
+    for event_id, hold_created_at, *timestamps in bookings:
+        stamps = dict(zip(BOOKING_STAGE_FIELDS, timestamps))
+        for stage, value in stamps.items():
+            if value is not None and range_start <= value < range_end:
+                rows[(event_id, timezone.localdate(value))]['counts'][stage] += 1
+
+        confirmed_at = stamps['confirmed']
+        if confirmed_at is None or not range_start <= confirmed_at < range_end:
+            continue
+        # Bookings without a hold start the funnel at their creation
+        started_at = hold_created_at or stamps['bookings']
+        latencies = {
+            'hold_to_paid': _seconds(started_at, stamps['paid']),
+            'paid_to_confirm': _seconds(stamps['paid'], confirmed_at),
+            'total': _seconds(started_at, confirmed_at),
+        }
+        sketches = rows[(event_id, timezone.localdate(confirmed_at))]['sketches']
+        for name, value in latencies.items():
+            if value is not None:
+                sketches[name].add(value)
+
+    # Only the touched pairs are written, those left without rows as zero
+    funnel_days = []
+    for event_id, day in pairs:
+        row = rows[(event_id, day)]
+        funnel_days.append(EventFunnelDaily(
+            event_id_id=event_id,
+            day=day,
+            sketches={name: sketch.to_dict() for name, sketch in row['sketches'].items() if sketch.count},
+            **row['counts']
+        ))
+
+    EventFunnelDaily.objects.bulk_create(
+        funnel_days,
+        update_conflicts=True,
+        unique_fields=['event_id', 'day'],
+        update_fields=[*STAGES, 'sketches']
+    )
+
+
+def run_funnel_rollup(lag_seconds=None, batch_size=None):
+    """
+    Fold the stage timestamps between the watermark and now - lag into the
+    daily funnel rows. Returns the (event_id, day) pairs that were recomputed.
+    """
+    lag_seconds = settings.ANALYTICS_ROLLUP_LAG_SECONDS if lag_seconds is None else lag_seconds
+    batch_size = batch_size or settings.ANALYTICS_ROLLUP_BATCH_SIZE
+
+    with transaction.atomic():
+        # The row lock keeps concurrent runs from consuming the same window
+        watermark, _ = AnalyticsWatermark.objects.select_for_update().get_or_create(
+            name=EVENT_FUNNEL_WATERMARK,
+            defaults={'value': datetime(1970, 1, 1, tzinfo=dt_timezone.utc)}
+        )
+        cutoff = timezone.now() - timedelta(seconds=lag_seconds)
+        if cutoff <= watermark.value:
+            return []
+
+        touched = sorted(_get_touched(watermark.value, cutoff), key=lambda pair: (pair[1], str(pair[0])))
+        for start in range(0, len(touched), batch_size):
+            _recompute_event_days(touched[start:start + batch_size])
+
+        watermark.value = cutoff
+        watermark.save(update_fields=['value', 'updated_at'])
+    return touched
+
+
+def merge_funnel_days(rows):
+    """Stage counts and merged latency sketches of EventFunnelDaily rows"""
+    counts = dict.fromkeys(STAGES, 0)
+    sketches = {name: QuantileSketch() for name in LATENCIES}
+    for row in rows:
+        for stage in STAGES:
+            counts[stage] += row[stage]
+        for name, data in row['sketches'].items():
+            if name in sketches:
+                sketches[name].merge(QuantileSketch.from_dict(data))
+    return counts, sketches
@@ -0,0 +1,153 @@
+"""
+Asynchronous analytics report jobs.
+
+A request creates a job keyed by the hash of its normalized parameters and
+the Celery worker computes it with analytics.reports. Identical requests
+share the pending or running job, and reuse a completed result until it
+expires, so a wide date range is computed once however often it is asked for.
+"""
+import hashlib
+import json
+from datetime import timedelta
+from traceback import print_exc
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from analytics.models import AnalyticsReportJob
+from analytics.reports import build_report, get_date_range
+from analytics.serializers import AnalyticsSerializer
+from EventX.db_router import replica_reads
+
+JOB_STATUS = AnalyticsReportJob.JOB_STATUS
+
+
+def get_report_params(validated_data):
+    """
+    Normalized JSON parameters of a report: defaults resolved, sections
+    deduplicated and sorted, so equivalent requests hash the same.
+    """
+    start_date, end_date = get_date_range(validated_data)
+    params = {
+        'analytics_type': sorted(set(validated_data['analytics_type'])),
+        'start_date': start_date.isoformat(),
+        'end_date': end_date.isoformat(),
+        'group_by': validated_data.get('group_by', 'day'),
+    }
+    for key in ('event_id', 'venue_id'):
+        if validated_data.get(key):
+            params[key] = str(validated_data[key])
+    return params
+
+
+def get_params_hash(params):
+    return hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()
+
+
+def _get_reusable_job(params_hash):
+    """The active job for these parameters, or a completed one that has not expired"""
+    now = timezone.now()
+    job = AnalyticsReportJob.objects.filter(params_hash=params_hash).filter(
+        Q(status__in=[JOB_STATUS.PENDING, JOB_STATUS.RUNNING])
+        | Q(status=JOB_STATUS.COMPLETED, expires_at__gt=now)
+    ).order_by('-created_at').first()
+
+    # A job the worker lost would block its parameters forever, fail it instead
+    if (
+        job and job.status != JOB_STATUS.COMPLETED
+        and job.created_at < now - timedelta(seconds=settings.ANALYTICS_REPORT_JOB_TIMEOUT)
+    ):
+        _fail_job(job.pk, "Report job timed out")
+        return None
+    return job
+
+
+def _fail_job(job_id, error):
+    AnalyticsReportJob.objects.filter(
+        pk=job_id,
+        status__in=[JOB_STATUS.PENDING, JOB_STATUS.RUNNING]
+    ).update(status=JOB_STATUS.FAILED, error=error, completed_at=timezone.now())
+
+
+def _enqueue_job(job_id):
+    from analytics.tasks import run_analytics_report_job
+
+    try:
+        run_analytics_report_job.delay(str(job_id))
+    except Exception as e:
+        print(f"Analytics report enqueue error: {e}")
+        _fail_job(job_id, "Report job could not be queued")
+
+
+def submit_report_job(validated_data, user=None):
+    """
+    Get or create the report job for the given analytics parameters.
+    Returns (job, created); a new job is queued once the transaction commits.
+    """
+    params = get_report_params(validated_data)
+    params_hash = get_params_hash(params)
+
+    job = _get_reusable_job(params_hash)
+    if job:
+        return job, False
+
+    try:
+        with transaction.atomic():
+            job = AnalyticsReportJob.objects.create(
+                params_hash=params_hash,
+                params=params,
+                requested_by=user
+            )
+    except IntegrityError:
+        # A concurrent identical request created the active job first
+        return _get_reusable_job(params_hash), False
+
+    transaction.on_commit(lambda: _enqueue_job(job.pk))
+    return job, True
+
+
+def run_report_job(job_id):
+    """Compute a pending report job and store its result. Runs in the Celery worker."""
+    claimed = AnalyticsReportJob.objects.filter(
+        pk=job_id,
+        status=JOB_STATUS.PENDING
+    ).update(status=JOB_STATUS.RUNNING, started_at=timezone.now())
+    if not claimed:
+        print(f"[Analytics] Report job {job_id} is not pending, skipping")
+        return
+
+    job = AnalyticsReportJob.objects.get(pk=job_id)
+    try:
+        serializer = AnalyticsSerializer(data=job.params)
+        serializer.is_valid(raise_exception=True)
+        with replica_reads():
+            result = build_report(serializer.validated_data)
+    except Exception as e:
+        print_exc()
+        _fail_job(job_id, str(e))
+        return
+
+    completed_at = timezone.now()
+    AnalyticsReportJob.objects.filter(pk=job_id).update(
+        status=JOB_STATUS.COMPLETED,
+        result=result,
+        completed_at=completed_at,
+        expires_at=completed_at + timedelta(seconds=settings.ANALYTICS_REPORT_RESULT_TTL)
+    )
+    print(f"[Analytics] Report job {job_id} completed in {(completed_at - job.started_at).total_seconds():.3f}s")
+
+
+def serialize_report_job(job, include_result=False):
+    data = {
+        'job_id': job.report_job_id,
+        'status': job.status,
+        'params': job.params,
+        'error': job.error,
+        'created_at': job.created_at,
+        'started_at': job.started_at,
+        'completed_at': job.completed_at,
+        'expires_at': job.expires_at,
+    }
+    if include_result and job.status == JOB_STATUS.COMPLETED:
+        data['result'] = job.result
+    return data
@@ -0,0 +1,101 @@
+# Generated by Django 5.2.6 on 2026-10-19 10:39
+
+import analytics.models
+import django.db.models.deletion
+import django_enumfield.db.fields
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0001_initial'),
+        ('events', '0004_event_listing'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnalyticsWatermark',
+            fields=[
+                ('name', models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ('value', models.DateTimeField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'analytics_watermark',
+            },
+        ),
+        migrations.CreateModel(
+            name='TicketTypeDailyRollup',
+            fields=[
+                ('ticket_type_daily_rollup_id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('day', models.DateField()),
+                ('tickets_sold', models.PositiveIntegerField(default=0)),
+                ('tickets_cancelled', models.PositiveIntegerField(default=0)),
+                ('revenue', models.PositiveIntegerField(default=0)),
+                ('refunds', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'ticket_type_daily_rollup',
+            },
+        ),
+        migrations.AddField(
+            model_name='bookingfact',
+            name='ticket_type_id',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='booking_facts', to='events.tickettype'),
+        ),
+        migrations.AddField(
+            model_name='eventdailyrollup',
+            name='confirmations',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='eventdailyrollup',
+            name='refunds',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='eventdailyrollup',
+            name='tickets_cancelled',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        # booking_fact was never written and bigint has no cast to uuid, so recreate the column
+        migrations.RemoveField(
+            model_name='bookingfact',
+            name='booking_id',
+        ),
+        migrations.AddField(
+            model_name='bookingfact',
+            name='booking_id',
+            field=models.UUIDField(default=uuid.uuid4),
+            preserve_default=False,
+        ),
+        migrations.AlterField(
+            model_name='bookingfact',
+            name='action',
+            field=django_enumfield.db.fields.EnumField(enum=analytics.models.BookingFact.ACTION),
+        ),
+        migrations.AddIndex(
+            model_name='bookingfact',
+            index=models.Index(fields=['occurred_at'], name='booking_fact_occurred_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bookingfact',
+            index=models.Index(fields=['event_id', 'occurred_at'], name='booking_fact_event_idx'),
+        ),
+        migrations.AddField(
+            model_name='tickettypedailyrollup',
+            name='event_id',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ticket_type_daily_rollups', to='events.events'),
+        ),
+        migrations.AddField(
+            model_name='tickettypedailyrollup',
+            name='ticket_type_id',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_rollups', to='events.tickettype'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='tickettypedailyrollup',
+            unique_together={('ticket_type_id', 'day')},
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.6 on 2026-10-19 10:45
+
+import analytics.models
+import django.core.serializers.json
+import django.db.models.deletion
+import django_enumfield.db.fields
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_alter_user_status'),
+        ('analytics', '0002_booking_fact_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnalyticsReportJob',
+            fields=[
+                ('report_job_id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('params_hash', models.CharField(max_length=64)),
+                ('params', models.JSONField()),
+                ('status', django_enumfield.db.fields.EnumField(default=1, enum=analytics.models.AnalyticsReportJob.JOB_STATUS)),
+                ('result', models.JSONField(blank=True, encoder=django.core.serializers.json.DjangoJSONEncoder, null=True)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('expires_at', models.DateTimeField(blank=True, null=True)),
+                ('requested_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='analytics_report_jobs', to='accounts.user')),
+            ],
+            options={
+                'db_table': 'analytics_report_job',
+                'indexes': [models.Index(fields=['params_hash', 'created_at'], name='report_job_params_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('status__in', [1, 2])), fields=('params_hash',), name='report_job_active_unique')],
+            },
+        ),
+    ]
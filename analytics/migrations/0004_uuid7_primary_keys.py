@@ -0,0 +1,19 @@
+# Generated by Django 5.2.6 on 2026-10-19 10:57
+
+import EventX.ids
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0003_report_jobs'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='bookingfact',
+            name='booking_fact_id',
+            field=models.UUIDField(default=EventX.ids.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+    ]
@@ -0,0 +1,28 @@
+from django.db import migrations
+from EventX.partition_utils import partition_table, unpartition_table
+
+
+def partition_booking_fact(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        partition_table(cursor, 'booking_fact')
+
+
+def unpartition_booking_fact(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        unpartition_table(cursor, 'booking_fact')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0004_uuid7_primary_keys'),
+    ]
+
+    # Monthly partitions on the insert time, the model itself is unchanged
+    operations = [
+        migrations.RunPython(partition_booking_fact, unpartition_booking_fact),
+    ]
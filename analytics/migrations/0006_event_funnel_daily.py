@@ -0,0 +1,34 @@
+# Generated by Django 5.2.6 on 2026-10-19 11:07
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0005_partition_booking_fact'),
+        ('events', '0004_event_listing'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventFunnelDaily',
+            fields=[
+                ('event_funnel_daily_id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('day', models.DateField()),
+                ('holds', models.PositiveIntegerField(default=0)),
+                ('bookings', models.PositiveIntegerField(default=0)),
+                ('paid', models.PositiveIntegerField(default=0)),
+                ('confirmed', models.PositiveIntegerField(default=0)),
+                ('cancelled', models.PositiveIntegerField(default=0)),
+                ('sketches', models.JSONField(default=dict)),
+                ('event_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='funnel_days', to='events.events')),
+            ],
+            options={
+                'db_table': 'event_funnel_daily',
+                'unique_together': {('event_id', 'day')},
+            },
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.6 on 2026-10-19 11:10
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+VENUE_COUNTS = [
+    'bookings', 'confirmations', 'cancellations', 'tickets_sold',
+    'tickets_cancelled', 'revenue', 'refunds'
+]
+
+
+def backfill_venue_rollups(apps, schema_editor):
+    """Sum the existing event rollups, later days are kept up to date by the rollup job"""
+    EventDailyRollup = apps.get_model('analytics', 'EventDailyRollup')
+    VenueDailyRollup = apps.get_model('analytics', 'VenueDailyRollup')
+    rows = EventDailyRollup.objects.values('event_id__venue_id', 'day').annotate(
+        events=Count('event_id'),
+        **{name: Sum(name) for name in VENUE_COUNTS}
+    ).order_by()
+    VenueDailyRollup.objects.bulk_create(
+        [VenueDailyRollup(venue_id_id=row.pop('event_id__venue_id'), **row) for row in rows.iterator()],
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0006_event_funnel_daily'),
+        ('events', '0004_event_listing'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VenueDailyRollup',
+            fields=[
+                ('venue_daily_rollup_id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('day', models.DateField()),
+                ('events', models.PositiveIntegerField(default=0)),
+                ('bookings', models.PositiveIntegerField(default=0)),
+                ('confirmations', models.PositiveIntegerField(default=0)),
+                ('cancellations', models.PositiveIntegerField(default=0)),
+                ('tickets_sold', models.PositiveIntegerField(default=0)),
+                ('tickets_cancelled', models.PositiveIntegerField(default=0)),
+                ('revenue', models.PositiveIntegerField(default=0)),
+                ('refunds', models.PositiveIntegerField(default=0)),
+                ('venue_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_rollups', to='events.venue')),
+            ],
+            options={
+                'db_table': 'venue_daily_rollup',
+                'unique_together': {('venue_id', 'day')},
+            },
+        ),
+        migrations.RunPython(backfill_venue_rollups, migrations.RunPython.noop),
+    ]
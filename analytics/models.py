@@ -1,24 +1,37 @@
 from uuid import uuid4
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 from django_enumfield import enum
-from events.models import Events
+from accounts.models import User
+from events.models import Events, TicketType, Venue
+from EventX.ids import uuid7
 
 class BookingFact(models.Model):
+    """
+    Append-only log of the booking lifecycle, one row per booking and ticket type.
+    Written by analytics.facts, rolled up by analytics.rollups.
+    """
     
     class ACTION(enum.Enum):
         BOOKING_CONFIRMED = 1
         BOOKING_CANCELLED = 2
+        BOOKING_CREATED = 3
 
-    booking_fact_id = models.UUIDField(primary_key=True, default=uuid4, editable=False)
+    booking_fact_id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     event_id = models.ForeignKey(Events, on_delete=models.CASCADE, related_name="booking_facts")
-    booking_id = models.BigIntegerField()
+    ticket_type_id = models.ForeignKey(TicketType, on_delete=models.SET_NULL, null=True, blank=True, related_name="booking_facts")
+    booking_id = models.UUIDField()
     occurred_at = models.DateTimeField()
-    action = enum.EnumField(ACTION, default=ACTION.BOOKING_CANCELLED)  # BOOKING_CONFIRMED | BOOKING_CANCELLED
-    tickets = models.PositiveIntegerField()
-    amount_cents = models.PositiveIntegerField()
+    action = enum.EnumField(ACTION)  # BOOKING_CREATED | BOOKING_CONFIRMED | BOOKING_CANCELLED
+    tickets = models.PositiveIntegerField()  # for BOOKING_CANCELLED, 0 unless the booking was confirmed
+    amount_cents = models.PositiveIntegerField()  # refunded amount for BOOKING_CANCELLED
 
     class Meta:
         db_table = "booking_fact"
+        indexes = [
+            models.Index(fields=['occurred_at'], name='booking_fact_occurred_at_idx'),
+            models.Index(fields=['event_id', 'occurred_at'], name='booking_fact_event_idx'),
+        ]
 
 
 class EventDailyRollup(models.Model):
@@ -27,10 +40,123 @@ class EventDailyRollup(models.Model):
     event_id = models.ForeignKey(Events, on_delete=models.CASCADE, related_name="event_daily_rollups")
     day = models.DateField()
     bookings = models.PositiveIntegerField()
+    confirmations = models.PositiveIntegerField(default=0)
     cancellations = models.PositiveIntegerField()
     tickets_sold = models.PositiveIntegerField()
+    tickets_cancelled = models.PositiveIntegerField(default=0)
     revenue = models.PositiveIntegerField()
+    refunds = models.PositiveIntegerField(default=0)
 
     class Meta:
         db_table = "event_daily_rollup"
         unique_together = ("event_id", "day")
+
+
+class VenueDailyRollup(models.Model):
+    """The EventDailyRollup rows of a venue's events summed per day, maintained with them"""
+
+    venue_daily_rollup_id = models.UUIDField(primary_key=True, default=uuid4, editable=False)
+    venue_id = models.ForeignKey(Venue, on_delete=models.CASCADE, related_name="daily_rollups")
+    day = models.DateField()
+    events = models.PositiveIntegerField(default=0)  # events with activity that day
+    bookings = models.PositiveIntegerField(default=0)
+    confirmations = models.PositiveIntegerField(default=0)
+    cancellations = models.PositiveIntegerField(default=0)
+    tickets_sold = models.PositiveIntegerField(default=0)
+    tickets_cancelled = models.PositiveIntegerField(default=0)
+    revenue = models.PositiveIntegerField(default=0)
+    refunds = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = "venue_daily_rollup"
+        unique_together = ("venue_id", "day")
+
+
+class TicketTypeDailyRollup(models.Model):
+
+    ticket_type_daily_rollup_id = models.UUIDField(primary_key=True, default=uuid4, editable=False)
+    event_id = models.ForeignKey(Events, on_delete=models.CASCADE, related_name="ticket_type_daily_rollups")
+    ticket_type_id = models.ForeignKey(TicketType, on_delete=models.CASCADE, related_name="daily_rollups")
+    day = models.DateField()
+    tickets_sold = models.PositiveIntegerField(default=0)
+    tickets_cancelled = models.PositiveIntegerField(default=0)
+    revenue = models.PositiveIntegerField(default=0)
+    refunds = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = "ticket_type_daily_rollup"
+        unique_together = ("ticket_type_id", "day")
+
+
+class EventFunnelDaily(models.Model):
+    """
+    Hold -> booking -> paid -> confirmed funnel of an event, each stage counted
+    on the day it happened. The sketches hold the conversion latencies of the
+    bookings confirmed that day as analytics.sketches.QuantileSketch dicts.
+    Maintained by analytics.funnel.
+    """
+
+    event_funnel_daily_id = models.UUIDField(primary_key=True, default=uuid4, editable=False)
+    event_id = models.ForeignKey(Events, on_delete=models.CASCADE, related_name="funnel_days")
+    day = models.DateField()
+    holds = models.PositiveIntegerField(default=0)
+    bookings = models.PositiveIntegerField(default=0)
+    paid = models.PositiveIntegerField(default=0)
+    confirmed = models.PositiveIntegerField(default=0)
+    cancelled = models.PositiveIntegerField(default=0)
+    sketches = models.JSONField(default=dict)  # latency name: sketch dict, in seconds
+
+    class Meta:
+        db_table = "event_funnel_daily"
+        unique_together = ("event_id", "day")
+
+
+class AnalyticsWatermark(models.Model):
+    """How far a rollup job has consumed the fact log"""
+
+    name = models.CharField(max_length=100, primary_key=True)
+    value = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "analytics_watermark"
+
+
+class AnalyticsReportJob(models.Model):
+    """
+    An analytics report computed by the Celery worker. Requests with the same
+    parameters share one job while it is active and reuse its result until
+    expires_at.
+    """
+
+    class JOB_STATUS(enum.Enum):
+        PENDING = 1
+        RUNNING = 2
+        COMPLETED = 3
+        FAILED = 4
+
+    report_job_id = models.UUIDField(primary_key=True, default=uuid4, editable=False)
+    params_hash = models.CharField(max_length=64)
+    params = models.JSONField()
+    status = enum.EnumField(JOB_STATUS, default=JOB_STATUS.PENDING)
+    result = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    error = models.TextField(blank=True)
+    requested_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name="analytics_report_jobs")
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    expires_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "analytics_report_job"
+        indexes = [
+            models.Index(fields=['params_hash', 'created_at'], name='report_job_params_idx'),
+        ]
+        constraints = [
+            # At most one pending or running job per parameter set
+            models.UniqueConstraint(
+                fields=['params_hash'],
+                condition=models.Q(status__in=[1, 2]),
+                name='report_job_active_unique'
+            ),
+        ]
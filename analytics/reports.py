@@ -0,0 +1,515 @@
+"""
+Analytics dashboard sections.
+
+Every section reads the daily rollups maintained by analytics.rollups, so
+its cost depends on days x events rather than on the number of bookings.
+Overview and revenue are assembled from the day segments of
+analytics.segments, so overlapping ranges reuse the days they share. The
+funnel merges the daily quantile sketches of analytics.funnel, and the
+venue section reads the venue rollups. venue_id scopes event performance,
+funnel and venue.
+"""
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from uuid import UUID
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+from analytics.counters import UNIQUE_BUYERS, UNIQUE_VIEWERS, count_unique_users
+from analytics.funnel import STAGES, merge_funnel_days
+from analytics.models import EventDailyRollup, EventFunnelDaily, VenueDailyRollup
+from analytics.rollups import VENUE_COUNTS
+from analytics.segments import EVENT_COUNTS, get_segments, merge_event_counts, merge_ticket_type_counts
+from bookings.models import Booking
+from events.models import Events, TicketType, Venue
+from inventory.models import EventInventory, Seat
+
+
+def get_date_range(validated_data):
+    """Requested date range, defaulting to the last 30 days"""
+    start_date = validated_data.get('start_date')
+    end_date = validated_data.get('end_date')
+    if not start_date:
+        start_date = timezone.now().date() - timedelta(days=30)
+    if not end_date:
+        end_date = timezone.now().date()
+    return start_date, end_date
+
+
+def _net_revenue():
+    return Sum('revenue', default=0) - Sum('refunds', default=0)
+
+
+def _get_event_names(event_ids):
+    return {
+        str(events_id): (event_name, venue_name)
+        for events_id, event_name, venue_name in Events.objects.filter(
+            events_id__in=list(event_ids)
+        ).values_list('events_id', 'event_name', 'venue_id__name')
+    }
+
+
+def _get_period(day, group_by):
+    if group_by == 'week':
+        return day - timedelta(days=day.weekday())
+    if group_by == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def get_overview_report(validated_data):
+    """Get overview analytics"""
+    start_date, end_date = get_date_range(validated_data)
+    event_id = validated_data.get('event_id')
+    
+    segments = get_segments(start_date, end_date, event_id)
+    event_counts = merge_event_counts(segments)
+    events_query = Events.objects.all()
+    if event_id:
+        events_query = events_query.filter(events_id=event_id)
+    
+    # Calculate overview metrics
+    booking_stats = dict.fromkeys(EVENT_COUNTS, 0)
+    for counts in event_counts.values():
+        for name, value in counts.items():
+            booking_stats[name] += value
+    
+    total_bookings = booking_stats['bookings']
+    confirmed_bookings = booking_stats['confirmations']
+    cancelled_bookings = booking_stats['cancellations']
+    total_revenue = booking_stats['revenue'] - booking_stats['refunds']
+    avg_booking_value = booking_stats['revenue'] / confirmed_bookings if confirmed_bookings else 0
+    
+    # Get event statistics
+    event_stats = events_query.aggregate(
+        total_events=Count('events_id'),
+        active_events=Count('events_id', filter=Q(status=Events.EVENT_STATUS.PUBLISHED))
+    )
+    
+    # Get top performing events
+    top_event_ids = sorted(
+        event_counts,
+        key=lambda key: event_counts[key]['revenue'] - event_counts[key]['refunds'],
+        reverse=True
+    )[:5]
+    event_names = _get_event_names(top_event_ids)
+    top_events = [
+        {
+            'event_id__event_name': event_names.get(key, (None, None))[0],
+            'event_id__venue_id__name': event_names.get(key, (None, None))[1],
+            'booking_count': event_counts[key]['confirmations'],
+            'total_revenue': event_counts[key]['revenue'] - event_counts[key]['refunds'],
+        }
+        for key in top_event_ids
+    ]
+    
+    # Get recent bookings, a bounded index range instead of a date cast per row
+    range_start = timezone.make_aware(datetime.combine(start_date, time.min))
+    range_end = timezone.make_aware(datetime.combine(end_date + timedelta(days=1), time.min))
+    recent_bookings = Booking.objects.filter(
+        created_at__gte=range_start,
+        created_at__lt=range_end
+    ).select_related('events_id', 'events_id__venue_id', 'user_id')
+    if event_id:
+        recent_bookings = recent_bookings.filter(events_id=event_id)
+    recent_bookings = recent_bookings.order_by('-created_at')[:10]
+    
+    # Calculate rates
+    conversion_rate = (confirmed_bookings / total_bookings * 100) if total_bookings > 0 else 0
+    cancellation_rate = (cancelled_bookings / total_bookings * 100) if total_bookings > 0 else 0
+    
+    return {
+        'summary': {
+            'total_bookings': total_bookings,
+            'confirmed_bookings': confirmed_bookings,
+            'cancelled_bookings': cancelled_bookings,
+            'total_revenue': total_revenue,
+            # Approximate distinct users from the daily HyperLogLogs
+            'unique_buyers': count_unique_users(UNIQUE_BUYERS, start_date, end_date, event_id),
+            'unique_viewers': count_unique_users(UNIQUE_VIEWERS, start_date, end_date, event_id),
+            'avg_booking_value': round(avg_booking_value, 2),
+            'conversion_rate': round(conversion_rate, 2),
+            'cancellation_rate': round(cancellation_rate, 2),
+            'total_events': event_stats['total_events'],
+            'active_events': event_stats['active_events'],
+            'date_range': {
+                'start_date': start_date,
+                'end_date': end_date
+            }
+        },
+        'top_events': top_events,
+        'recent_bookings': [
+            {
+                'booking_id': str(booking.booking_id),
+                'event_name': booking.events_id.event_name,
+                'venue_name': booking.events_id.venue_id.name,
+                'user_email': booking.user_id.email,
+                'total_amount': booking.total_price_cents,
+                'status': booking.status,
+                'created_at': booking.created_at
+            }
+            for booking in recent_bookings
+        ]
+    }
+
+
+def get_revenue_report(validated_data):
+    """Get revenue analytics"""
+    start_date, end_date = get_date_range(validated_data)
+    event_id = validated_data.get('event_id')
+    group_by = validated_data.get('group_by', 'day')
+    
+    segments = get_segments(start_date, end_date, event_id)
+    event_counts = merge_event_counts(segments)
+    
+    total_revenue = sum(counts['revenue'] - counts['refunds'] for counts in event_counts.values())
+    total_bookings = sum(counts['confirmations'] for counts in event_counts.values())
+    
+    # Revenue by event, grouped by name as before
+    event_names = _get_event_names(event_counts)
+    revenue_by_event = defaultdict(lambda: {'revenue': 0, 'booking_count': 0})
+    for key, counts in event_counts.items():
+        row = revenue_by_event[event_names.get(key, (None, None))[0]]
+        row['revenue'] += counts['revenue'] - counts['refunds']
+        row['booking_count'] += counts['confirmations']
+    
+    # Revenue by ticket type, grouped by name
+    ticket_type_counts = merge_ticket_type_counts(segments)
+    ticket_type_names = dict(
+        TicketType.objects.filter(
+            ticket_type_id__in=list(ticket_type_counts)
+        ).values_list('ticket_type_id', 'ticket_type_name')
+    )
+    revenue_by_ticket_type = defaultdict(lambda: {'revenue': 0, 'quantity': 0})
+    for key, (revenue, quantity) in ticket_type_counts.items():
+        row = revenue_by_ticket_type[ticket_type_names.get(UUID(key))]
+        row['revenue'] += revenue
+        row['quantity'] += quantity
+    
+    # Revenue trends by time period, only periods with rollups
+    revenue_trends = {}
+    for day, segment in segments:
+        if not segment['events']:
+            continue
+        row = revenue_trends.setdefault(_get_period(day, group_by), {'revenue': 0, 'booking_count': 0})
+        for counts in segment['events'].values():
+            counts = dict(zip(EVENT_COUNTS, counts))
+            row['revenue'] += counts['revenue'] - counts['refunds']
+            row['booking_count'] += counts['confirmations']
+    
+    return {
+        'summary': {
+            'total_revenue': total_revenue,
+            'total_bookings': total_bookings,
+            'average_booking_value': total_revenue / total_bookings if total_bookings > 0 else 0,
+            'date_range': {
+                'start_date': start_date,
+                'end_date': end_date
+            },
+            'group_by': group_by
+        },
+        'revenue_by_event': sorted(
+            [{'event_id__event_name': name, **row} for name, row in revenue_by_event.items()],
+            key=lambda row: row['revenue'], reverse=True
+        ),
+        'revenue_by_ticket_type': sorted(
+            [{'ticket_type_id__ticket_type_name': name, **row} for name, row in revenue_by_ticket_type.items()],
+            key=lambda row: row['revenue'], reverse=True
+        ),
+        'revenue_trends': [
+            {'period': period, **row} for period, row in sorted(revenue_trends.items())
+        ]
+    }
+
+
+def _get_capacity(event_ids):
+    """Capacity of GA events from their inventory and of reserved seating from their seats"""
+    inventory_capacity = dict(
+        EventInventory.objects.filter(event_id__in=event_ids).values('event_id').annotate(
+            capacity=Sum('initial_qty')
+        ).values_list('event_id', 'capacity').order_by()
+    )
+    seat_capacity = dict(
+        Seat.objects.filter(event_id__in=event_ids).values('event_id').annotate(
+            capacity=Count('pk')
+        ).values_list('event_id', 'capacity').order_by()
+    )
+    return inventory_capacity, seat_capacity
+
+
+def get_event_performance_report(validated_data):
+    """
+    Get event performance analytics for the events starting in the date range.
+    Runs a constant four queries however many events match: the events, their
+    lifetime rollups, GA inventory capacity and seat capacity, grouped per
+    event and joined in memory.
+    """
+    start_date, end_date = get_date_range(validated_data)
+    event_id = validated_data.get('event_id')
+    
+    range_start = timezone.make_aware(datetime.combine(start_date, time.min))
+    range_end = timezone.make_aware(datetime.combine(end_date + timedelta(days=1), time.min))
+    events_query = Events.objects.filter(starts_at__gte=range_start, starts_at__lt=range_end)
+    if event_id:
+        events_query = events_query.filter(events_id=event_id)
+    if validated_data.get('venue_id'):
+        events_query = events_query.filter(venue_id=validated_data['venue_id'])
+    
+    events = list(events_query.values_list(
+        'events_id', 'event_name', 'starts_at', 'venue_id__name', 'seat_mode', 'status'
+    ))
+    event_ids = events_query.values('events_id')
+    
+    booking_stats = {
+        row['event_id']: row for row in EventDailyRollup.objects.filter(
+            event_id__in=event_ids
+        ).values('event_id').annotate(
+            total_bookings=Sum('bookings'),
+            confirmed_bookings=Sum('confirmations'),
+            total_revenue=_net_revenue(),
+            tickets_sold=Sum('tickets_sold') - Sum('tickets_cancelled')
+        ).order_by()
+    }
+    
+    inventory_capacity, seat_capacity = _get_capacity(event_ids)
+    
+    event_performance = []
+    for events_id, event_name, starts_at, venue_name, seat_mode, status in events:
+        stats = booking_stats.get(events_id, {})
+        booking_count = stats.get('total_bookings') or 0
+        confirmed_bookings = stats.get('confirmed_bookings') or 0
+        total_revenue = stats.get('total_revenue') or 0
+        tickets_sold = stats.get('tickets_sold') or 0
+        
+        if seat_mode == Events.SEAT_MODE.RESERVED_SEATING:
+            total_capacity = seat_capacity.get(events_id, 0)
+        else:
+            total_capacity = inventory_capacity.get(events_id, 0)
+        
+        utilization_rate = (tickets_sold / total_capacity * 100) if total_capacity > 0 else 0
+        
+        # Calculate conversion rate for this event
+        conversion_rate = (confirmed_bookings / booking_count * 100) if booking_count > 0 else 0
+        
+        event_performance.append({
+            'event_id': str(events_id),
+            'event_name': event_name,
+            'event_date': starts_at,
+            'venue_name': venue_name,
+            'seat_mode': seat_mode,
+            'status': status,
+            'total_bookings': booking_count,
+            'confirmed_bookings': confirmed_bookings,
+            'tickets_sold': tickets_sold,
+            'total_revenue': total_revenue,
+            'total_capacity': total_capacity,
+            'utilization_rate': round(utilization_rate, 2),
+            'conversion_rate': round(conversion_rate, 2)
+        })
+    
+    # Sort by revenue
+    event_performance.sort(key=lambda x: x['total_revenue'], reverse=True)
+    
+    data = {
+        'events': event_performance,
+        'summary': {
+            'total_events': len(event_performance),
+            'total_revenue': sum(event['total_revenue'] for event in event_performance),
+            'average_utilization': sum(event['utilization_rate'] for event in event_performance) / len(event_performance) if event_performance else 0,
+            'average_conversion': sum(event['conversion_rate'] for event in event_performance) / len(event_performance) if event_performance else 0,
+            'date_range': {
+                'start_date': start_date,
+                'end_date': end_date
+            }
+        }
+    }
+
+    return data
+
+
+FUNNEL_PERCENTILES = {'p50': 0.5, 'p95': 0.95, 'p99': 0.99}
+
+
+def _rate(count, total):
+    return round(count / total * 100, 2) if total else 0
+
+
+def _get_funnel(counts, sketches):
+    percentiles = {}
+    for name, sketch in sketches.items():
+        percentiles[name] = {'count': sketch.count}
+        for label, q in FUNNEL_PERCENTILES.items():
+            value = sketch.quantile(q)
+            percentiles[name][label] = round(value, 1) if value is not None else None
+    return {
+        **counts,
+        'hold_to_booking_rate': _rate(counts['bookings'], counts['holds']),
+        'booking_to_paid_rate': _rate(counts['paid'], counts['bookings']),
+        'paid_to_confirmed_rate': _rate(counts['confirmed'], counts['paid']),
+        'booking_to_confirmed_rate': _rate(counts['confirmed'], counts['bookings']),
+        'latency_seconds': percentiles,
+    }
+
+
+def get_funnel_report(validated_data):
+    """
+    Hold -> booking -> paid -> confirmed stage counts per event, with the
+    p50/p95/p99 conversion latencies merged from the daily sketches
+    """
+    start_date, end_date = get_date_range(validated_data)
+    event_id = validated_data.get('event_id')
+
+    funnel_days = EventFunnelDaily.objects.filter(day__gte=start_date, day__lte=end_date)
+    if event_id:
+        funnel_days = funnel_days.filter(event_id=event_id)
+    if validated_data.get('venue_id'):
+        funnel_days = funnel_days.filter(event_id__venue_id=validated_data['venue_id'])
+
+    rows_by_event = defaultdict(list)
+    for row in funnel_days.values('event_id', *STAGES, 'sketches'):
+        rows_by_event[row.pop('event_id')].append(row)
+
+    event_names = _get_event_names(rows_by_event)
+    events = []
+    for key, rows in rows_by_event.items():
+        event_name, venue_name = event_names.get(str(key), (None, None))
+        events.append({
+            'event_id': str(key),
+            'event_name': event_name,
+            'venue_name': venue_name,
+            **_get_funnel(*merge_funnel_days(rows)),
+        })
+    events.sort(key=lambda event: event['holds'], reverse=True)
+
+    return {
+        'summary': {
+            **_get_funnel(*merge_funnel_days(row for rows in rows_by_event.values() for row in rows)),
+            'date_range': {
+                'start_date': start_date,
+                'end_date': end_date
+            }
+        },
+        'events': events
+    }
+
+
+def _summarize_venue_counts(counts):
+    return {
+        'total_bookings': counts['bookings'],
+        'confirmed_bookings': counts['confirmations'],
+        'cancelled_bookings': counts['cancellations'],
+        'tickets_sold': counts['tickets_sold'] - counts['tickets_cancelled'],
+        'total_revenue': counts['revenue'] - counts['refunds'],
+        'cancellation_rate': _rate(counts['cancellations'], counts['bookings']),
+    }
+
+
+def get_venue_report(validated_data):
+    """
+    Revenue, tickets and cancellations across the events of each venue from
+    the venue rollups, and utilization of the venue's events starting in the
+    date range. Scoped to one venue by venue_id.
+    """
+    start_date, end_date = get_date_range(validated_data)
+    venue_id = validated_data.get('venue_id')
+    group_by = validated_data.get('group_by', 'day')
+
+    venue_rollups = VenueDailyRollup.objects.filter(day__gte=start_date, day__lte=end_date)
+    if venue_id:
+        venue_rollups = venue_rollups.filter(venue_id=venue_id)
+
+    venues = defaultdict(lambda: dict.fromkeys(VENUE_COUNTS, 0))
+    trends = defaultdict(lambda: dict.fromkeys(VENUE_COUNTS, 0))
+    for row in venue_rollups.values('venue_id', 'day', *VENUE_COUNTS):
+        venue, period = venues[row['venue_id']], trends[_get_period(row['day'], group_by)]
+        for name in VENUE_COUNTS:
+            venue[name] += row[name]
+            period[name] += row[name]
+
+    # Utilization of the events starting in the range, over their lifetime sales
+    range_start = timezone.make_aware(datetime.combine(start_date, time.min))
+    range_end = timezone.make_aware(datetime.combine(end_date + timedelta(days=1), time.min))
+    events_query = Events.objects.filter(starts_at__gte=range_start, starts_at__lt=range_end)
+    if venue_id:
+        events_query = events_query.filter(venue_id=venue_id)
+    events = list(events_query.values_list('events_id', 'venue_id', 'seat_mode'))
+    event_ids = events_query.values('events_id')
+    tickets_sold = dict(
+        EventDailyRollup.objects.filter(event_id__in=event_ids).values('event_id').annotate(
+            tickets=Sum('tickets_sold') - Sum('tickets_cancelled')
+        ).values_list('event_id', 'tickets').order_by()
+    )
+    inventory_capacity, seat_capacity = _get_capacity(event_ids)
+
+    utilization = defaultdict(lambda: {'events': 0, 'tickets_sold': 0, 'capacity': 0})
+    for events_id, event_venue_id, seat_mode in events:
+        row = utilization[event_venue_id]
+        row['events'] += 1
+        row['tickets_sold'] += tickets_sold.get(events_id, 0)
+        if seat_mode == Events.SEAT_MODE.RESERVED_SEATING:
+            row['capacity'] += seat_capacity.get(events_id, 0)
+        else:
+            row['capacity'] += inventory_capacity.get(events_id, 0)
+
+    venue_names = {
+        venue: (name, city) for venue, name, city in Venue.objects.filter(
+            venue_id__in=list(venues.keys() | utilization.keys())
+        ).values_list('venue_id', 'name', 'city')
+    }
+
+    venue_rows = []
+    for key in venues.keys() | utilization.keys():
+        name, city = venue_names.get(key, (None, None))
+        capacity = utilization[key]
+        venue_rows.append({
+            'venue_id': str(key),
+            'venue_name': name,
+            'city': city,
+            **_summarize_venue_counts(venues[key]),
+            'events_starting': capacity['events'],
+            'total_capacity': capacity['capacity'],
+            'utilization_rate': _rate(capacity['tickets_sold'], capacity['capacity']),
+        })
+    venue_rows.sort(key=lambda row: row['total_revenue'], reverse=True)
+
+    totals = dict.fromkeys(VENUE_COUNTS, 0)
+    for counts in venues.values():
+        for name in VENUE_COUNTS:
+            totals[name] += counts[name]
+    total_sold = sum(row['tickets_sold'] for row in utilization.values())
+    total_capacity = sum(row['capacity'] for row in utilization.values())
+
+    return {
+        'summary': {
+            **_summarize_venue_counts(totals),
+            'total_venues': len(venue_rows),
+            'total_capacity': total_capacity,
+            'utilization_rate': _rate(total_sold, total_capacity),
+            'date_range': {
+                'start_date': start_date,
+                'end_date': end_date
+            },
+            'group_by': group_by
+        },
+        'venues': venue_rows,
+        'trends': [
+            {'period': period, **_summarize_venue_counts(counts)} for period, counts in sorted(trends.items())
+        ]
+    }
+
+
+REPORT_SECTIONS = {
+    'overview': get_overview_report,
+    'revenue': get_revenue_report,
+    'event_performance': get_event_performance_report,
+    'funnel': get_funnel_report,
+    'venue': get_venue_report,
+}
+
+
+def build_report(validated_data):
+    """The requested dashboard sections keyed by analytics type"""
+    return {
+        analytics_type: REPORT_SECTIONS[analytics_type](validated_data)
+        for analytics_type in validated_data['analytics_type']
+        if analytics_type in REPORT_SECTIONS
+    }
@@ -0,0 +1,159 @@
+"""
+Incremental rollups of the booking fact log.
+
+A watermark records how far the fact log has been consumed. Each run takes
+the facts that occurred between the watermark and `now - lag`, finds the
+(event, day) pairs they touch and recomputes those rollup rows from the
+facts, so a run is idempotent and its cost depends on the activity since
+the last run rather than on the total number of bookings. The lag leaves
+time for transactions that wrote a fact to commit before it is consumed.
+The venue rollups of the recomputed days are then summed from the event
+rollups, and recomputed days are dropped from the analytics segment cache.
+"""
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from analytics.models import AnalyticsWatermark, BookingFact, EventDailyRollup, TicketTypeDailyRollup, VenueDailyRollup
+from analytics.segments import invalidate_segments
+from events.models import Events
+
+EVENT_DAILY_WATERMARK = 'event_daily_rollup'
+
+VENUE_COUNTS = [
+    'bookings', 'confirmations', 'cancellations', 'tickets_sold',
+    'tickets_cancelled', 'revenue', 'refunds'
+]
+
+CREATED = BookingFact.ACTION.BOOKING_CREATED
+CONFIRMED = BookingFact.ACTION.BOOKING_CONFIRMED
+CANCELLED = BookingFact.ACTION.BOOKING_CANCELLED
+
+
+def _sum(field, action):
+    return Sum(field, filter=Q(action=action), default=0)
+
+
+def _count_bookings(action):
+    # Facts are per ticket type, so count each booking once
+    return Count('booking_id', filter=Q(action=action), distinct=True)
+
+
+def _recompute_event_days(event_ids, days):
+    """Recompute the event and ticket type rollups for the given events and days"""
+    # The occurred_at bounds limit the scan to the monthly partitions of those days
+    facts = BookingFact.objects.filter(
+        event_id__in=event_ids,
+        occurred_at__gte=timezone.make_aware(datetime.combine(min(days), time.min)),
+        occurred_at__lt=timezone.make_aware(datetime.combine(max(days) + timedelta(days=1), time.min))
+    ).annotate(
+        day=TruncDate('occurred_at')
+    ).filter(day__in=days)
+
+    event_rows = facts.values('event_id', 'day').annotate(
+        bookings=_count_bookings(CREATED),
+        confirmations=_count_bookings(CONFIRMED),
+        cancellations=_count_bookings(CANCELLED),
+        tickets_sold=_sum('tickets', CONFIRMED),
+        tickets_cancelled=_sum('tickets', CANCELLED),
+        revenue=_sum('amount_cents', CONFIRMED),
+        refunds=_sum('amount_cents', CANCELLED),
+    ).order_by()
+
+    EventDailyRollup.objects.bulk_create(
+        [EventDailyRollup(event_id_id=row.pop('event_id'), **row) for row in event_rows],
+        update_conflicts=True,
+        unique_fields=['event_id', 'day'],
+        update_fields=[
+            'bookings', 'confirmations', 'cancellations', 'tickets_sold',
+            'tickets_cancelled', 'revenue', 'refunds'
+        ]
+    )
+
+    ticket_type_rows = facts.filter(ticket_type_id__isnull=False).values(
+        'event_id', 'ticket_type_id', 'day'
+    ).annotate(
+        tickets_sold=_sum('tickets', CONFIRMED),
+        tickets_cancelled=_sum('tickets', CANCELLED),
+        revenue=_sum('amount_cents', CONFIRMED),
+        refunds=_sum('amount_cents', CANCELLED),
+    ).order_by()
+
+    TicketTypeDailyRollup.objects.bulk_create(
+        [
+            TicketTypeDailyRollup(
+                event_id_id=row.pop('event_id'),
+                ticket_type_id_id=row.pop('ticket_type_id'),
+                **row
+            )
+            for row in ticket_type_rows
+        ],
+        update_conflicts=True,
+        unique_fields=['ticket_type_id', 'day'],
+        update_fields=['tickets_sold', 'tickets_cancelled', 'revenue', 'refunds']
+    )
+
+
+def get_venue_rollup_rows(event_rollups):
+    """EventDailyRollup rows summed per venue and day, as VenueDailyRollup field dicts"""
+    return event_rollups.values('event_id__venue_id', 'day').annotate(
+        events=Count('event_id'),
+        **{name: Sum(name) for name in VENUE_COUNTS}
+    ).order_by()
+
+
+def _recompute_venue_days(event_ids, days):
+    """Recompute the venue rollups of the venues of the given events on the given days"""
+    venue_ids = Events.objects.filter(events_id__in=event_ids).values('venue_id')
+    rows = get_venue_rollup_rows(
+        EventDailyRollup.objects.filter(event_id__venue_id__in=venue_ids, day__in=days)
+    )
+    VenueDailyRollup.objects.bulk_create(
+        [VenueDailyRollup(venue_id_id=row.pop('event_id__venue_id'), **row) for row in rows],
+        update_conflicts=True,
+        unique_fields=['venue_id', 'day'],
+        update_fields=['events', *VENUE_COUNTS]
+    )
+
+
+def run_event_daily_rollup(lag_seconds=None, batch_size=None):
+    """
+    Consume the facts between the watermark and now - lag into the daily rollups.
+    Returns the (event_id, day) pairs that were recomputed.
+    """
+    lag_seconds = settings.ANALYTICS_ROLLUP_LAG_SECONDS if lag_seconds is None else lag_seconds
+    batch_size = batch_size or settings.ANALYTICS_ROLLUP_BATCH_SIZE
+
+    with transaction.atomic():
+        # The row lock keeps concurrent runs from consuming the same window
+        watermark, _ = AnalyticsWatermark.objects.select_for_update().get_or_create(
+            name=EVENT_DAILY_WATERMARK,
+            defaults={'value': datetime(1970, 1, 1, tzinfo=dt_timezone.utc)}
+        )
+        cutoff = timezone.now() - timedelta(seconds=lag_seconds)
+        if cutoff <= watermark.value:
+            return []
+
+        touched = list(
+            BookingFact.objects.filter(
+                occurred_at__gt=watermark.value,
+                occurred_at__lte=cutoff
+            ).annotate(
+                day=TruncDate('occurred_at')
+            ).values_list('event_id', 'day').distinct().order_by('day', 'event_id')
+        )
+
+        for start in range(0, len(touched), batch_size):
+            batch = touched[start:start + batch_size]
+            event_ids, days = {event_id for event_id, _ in batch}, {day for _, day in batch}
+            _recompute_event_days(event_ids, days)
+            _recompute_venue_days(event_ids, days)
+
+        watermark.value = cutoff
+        watermark.save(update_fields=['value', 'updated_at'])
+
+    # The recomputed days are cached as analytics segments
+    invalidate_segments(touched)
+    return touched
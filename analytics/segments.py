@@ -0,0 +1,132 @@
+"""
+Date-segmented cache of the daily rollups.
+
+A segment holds one day of rollups for one event, or for all events: the
+per event and per ticket type sums the overview and revenue sections are
+built from. Any date range is assembled from its day segments, read with a
+single multi-get, so overlapping ranges share their days and a refresh
+only recomputes the days that are missing. Segments store ids rather than
+names so renames never go stale.
+
+Closed days are cached for ANALYTICS_SEGMENT_CLOSED_TTL and today for
+ANALYTICS_SEGMENT_OPEN_TTL. Days are only written by the rollup job, which
+invalidates the segments of every day it recomputes.
+"""
+from collections import defaultdict
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Sum
+from django.utils import timezone
+from EventX.cache_utils import get_cache_key
+from analytics.models import EventDailyRollup, TicketTypeDailyRollup
+
+SEGMENT_PREFIX = 'analytics_segment'
+ALL_EVENTS = 'all'
+
+# [bookings, confirmations, cancellations, revenue, refunds] per event
+EVENT_COUNTS = ('bookings', 'confirmations', 'cancellations', 'revenue', 'refunds')
+
+
+def get_segment_cache_key(event_id, day):
+    return get_cache_key(SEGMENT_PREFIX, event_id or ALL_EVENTS, day.isoformat())
+
+
+def _empty_segment():
+    return {'events': {}, 'ticket_types': {}}
+
+
+def build_segments(days, event_id=None):
+    """
+    Compute the segments of the given days from the rollups in two grouped
+    queries. Returns {day: segment}.
+    """
+    segments = {day: _empty_segment() for day in days}
+
+    event_rollups = EventDailyRollup.objects.filter(day__in=days)
+    ticket_type_rollups = TicketTypeDailyRollup.objects.filter(day__in=days)
+    if event_id:
+        event_rollups = event_rollups.filter(event_id=event_id)
+        ticket_type_rollups = ticket_type_rollups.filter(event_id=event_id)
+
+    for row in event_rollups.values_list('day', 'event_id', *EVENT_COUNTS):
+        day, rollup_event_id, counts = row[0], row[1], row[2:]
+        segments[day]['events'][str(rollup_event_id)] = list(counts)
+
+    ticket_type_rows = ticket_type_rollups.values('day', 'ticket_type_id').annotate(
+        revenue=Sum('revenue') - Sum('refunds'),
+        quantity=Sum('tickets_sold') - Sum('tickets_cancelled')
+    ).values_list('day', 'ticket_type_id', 'revenue', 'quantity').order_by()
+    for day, ticket_type_id, revenue, quantity in ticket_type_rows:
+        segments[day]['ticket_types'][str(ticket_type_id)] = [revenue, quantity]
+
+    return segments
+
+
+def get_segments(start_date, end_date, event_id=None):
+    """
+    The day segments of a date range, oldest first, from the cache where
+    possible. Days after today have no rollups and are never cached.
+    Returns [(day, segment)].
+    """
+    today = timezone.localdate()
+    days = [start_date + timedelta(days=offset) for offset in range((end_date - start_date).days + 1)]
+    keys = {get_segment_cache_key(event_id, day): day for day in days if day <= today}
+
+    try:
+        cached = cache.get_many(list(keys))
+    except Exception as e:
+        print(f"Cache read error: {e}")
+        cached = {}
+    print(f"[Analytics] {len(cached)}/{len(keys)} day segments cached")
+
+    segments = {keys[key]: segment for key, segment in cached.items()}
+    missing = [day for key, day in keys.items() if key not in cached]
+    if missing:
+        built = build_segments(missing, event_id)
+        segments.update(built)
+        if getattr(settings, 'ENABLE_CACHING', True):
+            closed = {get_segment_cache_key(event_id, day): segment for day, segment in built.items() if day < today}
+            try:
+                if closed:
+                    cache.set_many(closed, settings.ANALYTICS_SEGMENT_CLOSED_TTL)
+                if today in built:
+                    cache.set(get_segment_cache_key(event_id, today), built[today], settings.ANALYTICS_SEGMENT_OPEN_TTL)
+            except Exception as e:
+                print(f"Cache write error: {e}")
+
+    return [(day, segments.get(day) or _empty_segment()) for day in days]
+
+
+def merge_event_counts(segments):
+    """Sum the per event counts of several segments: {event_id: {count: value}}"""
+    merged = defaultdict(lambda: dict.fromkeys(EVENT_COUNTS, 0))
+    for _, segment in segments:
+        for event_id, counts in segment['events'].items():
+            for name, value in zip(EVENT_COUNTS, counts):
+                merged[event_id][name] += value
+    return merged
+
+
+def merge_ticket_type_counts(segments):
+    """Sum the per ticket type net revenue and quantity: {ticket_type_id: [revenue, quantity]}"""
+    merged = defaultdict(lambda: [0, 0])
+    for _, segment in segments:
+        for ticket_type_id, (revenue, quantity) in segment['ticket_types'].items():
+            merged[ticket_type_id][0] += revenue
+            merged[ticket_type_id][1] += quantity
+    return merged
+
+
+def invalidate_segments(event_days):
+    """Drop the segments of the given (event_id, day) pairs and of their days across all events"""
+    keys = set()
+    for event_id, day in event_days:
+        keys.add(get_segment_cache_key(event_id, day))
+        keys.add(get_segment_cache_key(None, day))
+    if not keys:
+        return
+    try:
+        cache.delete_many(list(keys))
+    except Exception as e:
+        print(f"Cache delete error: {e}")
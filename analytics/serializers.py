@@ -1,6 +1,8 @@
 from enum import Enum
+from django.conf import settings
 from rest_framework import serializers
 from EventX.utils import validate_enum_str
+from analytics.columnar import DIMENSIONS, METRICS, STATUSES
 
 
 class AnalyticsSerializer(serializers.Serializer):
@@ -10,6 +12,8 @@ class AnalyticsSerializer(serializers.Serializer):
         OVERVIEW = "overview"
         REVENUE = "revenue"
         EVENT_PERFORMANCE = "event_performance"
+        FUNNEL = "funnel"
+        VENUE = "venue"
 
     analytics_type = serializers.ListField(child=serializers.CharField())
     start_date = serializers.DateField(required=False)
@@ -24,3 +28,49 @@ class AnalyticsSerializer(serializers.Serializer):
 
     def validate_analytics_type(self, value):
         return [validate_enum_str(item, self.ANALYTICS_TYPE) for item in value]
+
+
+class RealtimeSalesSerializer(serializers.Serializer):
+    event_id = serializers.UUIDField()
+    minutes = serializers.IntegerField(min_value=1, default=5)
+
+    def validate_minutes(self, value):
+        if value > settings.SALES_COUNTER_RETENTION_MINUTES:
+            raise serializers.ValidationError(
+                f"Only the last {settings.SALES_COUNTER_RETENTION_MINUTES} minutes are kept"
+            )
+        return value
+
+
+class AnalyticsQuerySerializer(serializers.Serializer):
+    """Ad-hoc query over the columnar booking item snapshot"""
+    group_by = serializers.ListField(
+        child=serializers.ChoiceField(choices=DIMENSIONS),
+        required=False,
+        default=list,
+        max_length=3
+    )
+    metrics = serializers.ListField(
+        child=serializers.ChoiceField(choices=METRICS),
+        required=False,
+        default=lambda: ['bookings', 'tickets', 'amount_cents'],
+        min_length=1
+    )
+    start_date = serializers.DateField(required=False)
+    end_date = serializers.DateField(required=False)
+    event_id = serializers.UUIDField(required=False)
+    venue_id = serializers.UUIDField(required=False)
+    ticket_type_id = serializers.UUIDField(required=False)
+    status = serializers.ListField(child=serializers.ChoiceField(choices=STATUSES), required=False)
+    order_by = serializers.ChoiceField(choices=METRICS, required=False)
+    limit = serializers.IntegerField(min_value=1, max_value=1000, default=100)
+
+    def validate(self, attrs):
+        if len(set(attrs['group_by'])) != len(attrs['group_by']):
+            raise serializers.ValidationError("group_by dimensions must be unique")
+        attrs['metrics'] = list(dict.fromkeys(attrs['metrics']))
+        if attrs.get('order_by') and attrs['order_by'] not in attrs['metrics']:
+            raise serializers.ValidationError("order_by must be one of the requested metrics")
+        if attrs.get('start_date') and attrs.get('end_date') and attrs['start_date'] > attrs['end_date']:
+            raise serializers.ValidationError("start_date must be before end_date")
+        return attrs
@@ -0,0 +1,85 @@
+"""
+Mergeable quantile sketch for latency percentiles.
+
+A log-bucketed sketch in the style of DDSketch: a positive value lands in
+bucket ceil(log(value) / log(gamma)), so every quantile it returns is
+within RELATIVE_ACCURACY of a true value of the same rank. Bucket counts
+add up, so the sketches of several days or events merge exactly, and a
+sketch stays a few hundred buckets whatever the number of values. Values
+at or below MIN_VALUE, e.g. instant conversions, share the zero bucket.
+"""
+import math
+
+RELATIVE_ACCURACY = 0.01
+MIN_VALUE = 1e-3
+MAX_BUCKETS = 2048
+
+_GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+_LOG_GAMMA = math.log(_GAMMA)
+
+
+class QuantileSketch:
+    """Streaming quantiles of non-negative values, serializable to JSON"""
+
+    def __init__(self, buckets=None, zero_count=0):
+        self.buckets = buckets or {}
+        self.zero_count = zero_count
+
+    @property
+    def count(self):
+        return self.zero_count + sum(self.buckets.values())
+
+    def add(self, value, count=1):
+        if value <= MIN_VALUE:
+            self.zero_count += count
+            return
+        key = math.ceil(math.log(value) / _LOG_GAMMA)
+        self.buckets[key] = self.buckets.get(key, 0) + count
+        if len(self.buckets) > MAX_BUCKETS:
+            self._collapse()
+
+    def merge(self, other):
+        self.zero_count += other.zero_count
+        for key, count in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + count
+        if len(self.buckets) > MAX_BUCKETS:
+            self._collapse()
+        return self
+
+    def _collapse(self):
+        # Fold the lowest buckets together, keeping the upper quantiles accurate
+        keys = sorted(self.buckets)
+        folded = keys[:len(keys) - MAX_BUCKETS + 1]
+        total = sum(self.buckets.pop(key) for key in folded)
+        self.buckets[folded[-1]] = self.buckets.get(folded[-1], 0) + total
+
+    def quantile(self, q):
+        """Value at quantile q in [0, 1], None when the sketch is empty"""
+        count = self.count
+        if not count:
+            return None
+        rank = q * (count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if rank < seen:
+                # Midpoint of the bucket (gamma^(key-1), gamma^key] in relative terms
+                return 2 * _GAMMA ** key / (_GAMMA + 1)
+        return 2 * _GAMMA ** max(self.buckets) / (_GAMMA + 1)
+
+    def to_dict(self):
+        return {
+            'zero': self.zero_count,
+            'buckets': {str(key): count for key, count in self.buckets.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if not data:
+            return cls()
+        return cls(
+            buckets={int(key): count for key, count in data.get('buckets', {}).items()},
+            zero_count=data.get('zero', 0)
+        )
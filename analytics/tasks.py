@@ -0,0 +1,9 @@
+from celery import shared_task
+from django.conf import settings
+from analytics.jobs import run_report_job
+
+
+@shared_task(time_limit=settings.ANALYTICS_REPORT_JOB_TIMEOUT)
+def run_analytics_report_job(job_id):
+    """Compute an AnalyticsReportJob queued by analytics.jobs.submit_report_job"""
+    run_report_job(job_id)
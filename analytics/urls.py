@@ -1,7 +1,16 @@
 from django.urls import path
-from analytics.views import AdminAnalyticsView
+from analytics.views import (
+    AdminAnalyticsView, AnalyticsQueryView, AnalyticsReportDownloadView, AnalyticsReportJobView, DatabasePoolView,
+    RealtimeSalesView
+)
 
 urlpatterns = [
     # Unified analytics endpoint with enum support
     path('', AdminAnalyticsView.as_view(), name='unified-analytics'),
+    path('jobs/', AnalyticsReportJobView.as_view(), name='analytics-report-jobs'),
+    path('jobs/<uuid:job_id>/', AnalyticsReportJobView.as_view(), name='analytics-report-job'),
+    path('jobs/<uuid:job_id>/download/', AnalyticsReportDownloadView.as_view(), name='analytics-report-download'),
+    path('realtime/', RealtimeSalesView.as_view(), name='analytics-realtime-sales'),
+    path('query/', AnalyticsQueryView.as_view(), name='analytics-query'),
+    path('db-pool/', DatabasePoolView.as_view(), name='analytics-db-pool'),
 ]
@@ -1,25 +1,27 @@
-from django.db.models import Sum, Count, Avg, Q
-from django.db.models.functions import TruncDate, TruncWeek, TruncMonth
-from django.utils import timezone
-from datetime import timedelta
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from rest_framework import status
+from EventX.db_pool import get_pool_metrics
 from EventX.helper import BaseAPIClass
-from EventX.cache_utils import cache_api_response
-from analytics.serializers import AnalyticsSerializer
-from events.models import Events
-from bookings.models import Booking, BookingItem
-from inventory.models import EventInventory
+from analytics.columnar import ColumnarStoreMissing, run_query
+from analytics.counters import get_sales_counters
+from analytics.jobs import serialize_report_job, submit_report_job
+from analytics.models import AnalyticsReportJob
+from analytics.reports import build_report
+from analytics.serializers import AnalyticsQuerySerializer, AnalyticsSerializer, RealtimeSalesSerializer
 from accounts.models import User
 
 
 class AdminAnalyticsView(BaseAPIClass):
     """Main analytics view for admin dashboard"""
     serializer_class = AnalyticsSerializer
+    use_replica = True
 
-    @cache_api_response('unified_analytics', timeout=300)  # 5 minutes cache
     def get(self, request):
         """
         Get analytics data based on analytics_type enum
-        Supported types: overview, revenue, event_performance
+        Supported types: overview, revenue, event_performance, funnel, venue
+        Not cached as a whole: overview and revenue reuse cached day segments
         """
         try:
             user = request.validated_user
@@ -32,284 +34,205 @@ class AdminAnalyticsView(BaseAPIClass):
             
             serializer = self.serializer_class(data=request.GET)
             if serializer.is_valid():
-                validated_data = serializer.validated_data
-                analytics_type = validated_data['analytics_type']
-                
-                if self.serializer_class.ANALYTICS_TYPE.OVERVIEW in analytics_type:
-                    self.data['overview'] = self._get_overview_analytics(validated_data)
-                if self.serializer_class.ANALYTICS_TYPE.REVENUE in analytics_type:
-                    self.data['revenue'] = self._get_revenue_analytics(validated_data)
-                if self.serializer_class.ANALYTICS_TYPE.EVENT_PERFORMANCE in analytics_type:
-                    self.data['event_performance'] = self._get_event_performance_analytics(validated_data)
+                self.data = build_report(serializer.validated_data)
                 
                 if not self.data:
                     self.message = "Invalid analytics type."
                     self.error_occurred(e=None, custom_code=5002)
                     return self.get_response()
+                
+                self.message = "Analytics retrieved successfully"
             else:
                 self.custom_code = 5003
-                self._serializer_errors(serializer.errors)
-                return self.get_response()
+                self.serializer_errors(serializer.errors)
                 
         except Exception as e:
             self.message = "Failed to retrieve analytics data"
             self.error_occurred(e, custom_code=5004)
-            return self.get_response()
-
-    def _get_overview_analytics(self, validated_data):
-        """Get overview analytics"""
-        start_date = validated_data.get('start_date')
-        end_date = validated_data.get('end_date')
-        event_id = validated_data.get('event_id')
-        
-        # Set default date range if not provided
-        if not start_date:
-            start_date = timezone.now().date() - timedelta(days=30)
-        if not end_date:
-            end_date = timezone.now().date()
-        
-        # Build base queries
-        bookings_query = Booking.objects.select_related('events_id', 'events_id__venue_id')
-        events_query = Events.objects.select_related('venue_id')
-        
-        if start_date and end_date:
-            bookings_query = bookings_query.filter(
-                created_at__date__range=[start_date, end_date]
-            )
-        
-        if event_id:
-            bookings_query = bookings_query.filter(events_id=event_id)
-            events_query = events_query.filter(events_id=event_id)
-        
-        # Calculate overview metrics
-        booking_stats = bookings_query.aggregate(
-            total_bookings=Count('booking_id'),
-            confirmed_bookings=Count('booking_id', filter=Q(status=Booking.BOOKING_STATUS.CONFIRMED)),
-            cancelled_bookings=Count('booking_id', filter=Q(status=Booking.BOOKING_STATUS.CANCELLED)),
-            total_revenue=Sum('total_price_cents', filter=Q(status=Booking.BOOKING_STATUS.CONFIRMED)),
-            avg_booking_value=Avg('total_price_cents', filter=Q(status=Booking.BOOKING_STATUS.CONFIRMED))
-        )
-        
-        total_bookings = booking_stats['total_bookings']
-        confirmed_bookings = booking_stats['confirmed_bookings']
-        cancelled_bookings = booking_stats['cancelled_bookings']
-        total_revenue = booking_stats['total_revenue'] or 0
-        avg_booking_value = booking_stats['avg_booking_value'] or 0
-        
-        # Get event statistics
-        event_stats = events_query.aggregate(
-            total_events=Count('events_id'),
-            active_events=Count('events_id', filter=Q(status=Events.EVENT_STATUS.PUBLISHED))
-        )
-        
-        total_events = event_stats['total_events']
-        active_events = event_stats['active_events']
         
-        # Get top performing events
-        top_events = bookings_query.filter(
-            status=Booking.BOOKING_STATUS.CONFIRMED
-        ).values(
-            'events_id__event_name',
-            'events_id__venue_id__name'
-        ).annotate(
-            booking_count=Count('booking_id'),
-            total_revenue=Sum('total_price_cents')
-        ).order_by('-total_revenue')[:5]
-        
-        # Get recent bookings
-        recent_bookings = bookings_query.select_related(
-            'events_id', 'events_id__venue_id', 'user'
-        ).order_by('-created_at')[:10]
-        
-        # Calculate rates
-        conversion_rate = (confirmed_bookings / total_bookings * 100) if total_bookings > 0 else 0
-        cancellation_rate = (cancelled_bookings / total_bookings * 100) if total_bookings > 0 else 0
-        
-        data = {
-            'summary': {
-                'total_bookings': total_bookings,
-                'confirmed_bookings': confirmed_bookings,
-                'cancelled_bookings': cancelled_bookings,
-                'total_revenue': total_revenue,
-                'avg_booking_value': round(avg_booking_value, 2),
-                'conversion_rate': round(conversion_rate, 2),
-                'cancellation_rate': round(cancellation_rate, 2),
-                'total_events': total_events,
-                'active_events': active_events,
-                'date_range': {
-                    'start_date': start_date,
-                    'end_date': end_date
-                }
-            },
-            'top_events': list(top_events),
-            'recent_bookings': [
-                {
-                    'booking_id': str(booking.booking_id),
-                    'event_name': booking.events_id.event_name,
-                    'venue_name': booking.events_id.venue_id.name,
-                    'user_email': booking.user.email,
-                    'total_amount': booking.total_price_cents,
-                    'status': booking.status,
-                    'created_at': booking.created_at
-                }
-                for booking in recent_bookings
-            ]
-        }
+        return self.get_response()
 
-        return data
 
-    def _get_revenue_analytics(self, validated_data):
-        """Get revenue analytics"""
-        start_date = validated_data.get('start_date')
-        end_date = validated_data.get('end_date')
-        event_id = validated_data.get('event_id')
-        group_by = validated_data.get('group_by', 'day')
-        
-        # Set default date range
-        if not start_date:
-            start_date = timezone.now().date() - timedelta(days=30)
-        if not end_date:
-            end_date = timezone.now().date()
-        
-        # Build query
-        bookings_query = Booking.objects.filter(
-            created_at__date__range=[start_date, end_date],
-            status=Booking.BOOKING_STATUS.CONFIRMED
-        )
-        
-        if event_id:
-            bookings_query = bookings_query.filter(events_id=event_id)
-        
-        # Calculate total revenue
-        total_revenue = bookings_query.aggregate(
-            total=Sum('total_price_cents')
-        )['total'] or 0
-        
-        # Revenue by event
-        revenue_by_event = bookings_query.values(
-            'events_id__event_name'
-        ).annotate(
-            revenue=Sum('total_price_cents'),
-            booking_count=Count('booking_id')
-        ).order_by('-revenue')
+class AnalyticsReportJobView(BaseAPIClass):
+    """
+    Asynchronous analytics reports for wide date ranges. POST queues a job,
+    or joins the identical one already queued; GET polls it.
+    """
+    serializer_class = AnalyticsSerializer
+
+    def post(self, request):
+        try:
+            user = request.validated_user
+            if user.user_type != User.USER_TYPE.ADMIN:
+                self.message = "Admin access required"
+                self.error_occurred(e=None, custom_code=5011)
+                return self.get_response()
+            
+            serializer = self.serializer_class(data=request.data)
+            if serializer.is_valid():
+                job, created = submit_report_job(serializer.validated_data, user)
+                self.data = serialize_report_job(job, include_result=True)
+                self.data['created'] = created
+                if job.status != AnalyticsReportJob.JOB_STATUS.COMPLETED:
+                    self.code = status.HTTP_202_ACCEPTED
+                self.message = "Analytics report queued" if created else "Analytics report already requested"
+            else:
+                self.custom_code = 5012
+                self.serializer_errors(serializer.errors)
         
-        # Revenue by ticket type
-        revenue_by_ticket_type = BookingItem.objects.filter(
-            booking_id__in=bookings_query
-        ).values(
-            'ticket_type_id__ticket_type_name'
-        ).annotate(
-            revenue=Sum('total_price'),
-            quantity=Sum('quantity')
-        ).order_by('-revenue')
+        except Exception as e:
+            self.message = "Failed to queue analytics report"
+            self.error_occurred(e, custom_code=5013)
         
-        # Revenue trends by time period
-        if group_by == 'day':
-            trunc_func = TruncDate('created_at')
-        elif group_by == 'week':
-            trunc_func = TruncWeek('created_at')
-        elif group_by == 'month':
-            trunc_func = TruncMonth('created_at')
-        else:
-            trunc_func = TruncDate('created_at')
+        return self.get_response()
+
+    def get(self, request, job_id):
+        try:
+            user = request.validated_user
+            if user.user_type != User.USER_TYPE.ADMIN:
+                self.message = "Admin access required"
+                self.error_occurred(e=None, custom_code=5021)
+                return self.get_response()
+            
+            job = AnalyticsReportJob.objects.filter(report_job_id=job_id).first()
+            if job is None:
+                self.message = "Report job not found"
+                self.error_occurred(e=None, custom_code=5022)
+                return self.get_response()
+            
+            self.data = serialize_report_job(job, include_result=True)
+            self.message = "Report job fetched successfully"
         
-        revenue_trends = bookings_query.annotate(
-            period=trunc_func
-        ).values('period').annotate(
-            revenue=Sum('total_price_cents'),
-            booking_count=Count('booking_id')
-        ).order_by('period')
+        except Exception as e:
+            self.message = "Failed to fetch report job"
+            self.error_occurred(e, custom_code=5023)
         
-        data = {
-            'summary': {
-                'total_revenue': total_revenue,
-                'total_bookings': bookings_query.count(),
-                'average_booking_value': total_revenue / bookings_query.count() if bookings_query.count() > 0 else 0,
-                'date_range': {
-                    'start_date': start_date,
-                    'end_date': end_date
-                },
-                'group_by': group_by
-            },
-            'revenue_by_event': list(revenue_by_event),
-            'revenue_by_ticket_type': list(revenue_by_ticket_type),
-            'revenue_trends': list(revenue_trends)
-        }
+        return self.get_response()
+
 
-        return data
+class AnalyticsReportDownloadView(BaseAPIClass):
+    """Download a completed report as a JSON file, encoded as it is streamed"""
 
-    def _get_event_performance_analytics(self, validated_data):
-        """Get event performance analytics"""
-        start_date = validated_data.get('start_date')
-        end_date = validated_data.get('end_date')
-        event_id = validated_data.get('event_id')
+    def get(self, request, job_id):
+        try:
+            user = request.validated_user
+            if user.user_type != User.USER_TYPE.ADMIN:
+                self.message = "Admin access required"
+                self.error_occurred(e=None, custom_code=5031)
+                return self.get_response()
+            
+            job = AnalyticsReportJob.objects.filter(report_job_id=job_id).first()
+            if job is None:
+                self.message = "Report job not found"
+                self.error_occurred(e=None, custom_code=5032)
+                return self.get_response()
+            
+            if job.status != AnalyticsReportJob.JOB_STATUS.COMPLETED:
+                self.message = "Report is not ready"
+                self.error_occurred(e=None, custom_code=5033, **serialize_report_job(job))
+                self.code = status.HTTP_409_CONFLICT
+                return self.get_response()
+            
+            response = StreamingHttpResponse(
+                DjangoJSONEncoder().iterencode(job.result),
+                content_type='application/json'
+            )
+            response['Content-Disposition'] = f'attachment; filename="analytics-report-{job.report_job_id}.json"'
+            return response
         
-        # Set default date range
-        if not start_date:
-            start_date = timezone.now().date() - timedelta(days=30)
-        if not end_date:
-            end_date = timezone.now().date()
+        except Exception as e:
+            self.message = "Failed to download report"
+            self.error_occurred(e, custom_code=5034)
         
-        # Get event performance data
-        events_query = Events.objects.filter(
-            event_date__date__range=[start_date, end_date]
-        ).select_related('venue_id')
+        return self.get_response()
+
+
+class RealtimeSalesView(BaseAPIClass):
+    """
+    Live per-minute sales of an event from the Redis counters, for on-sales.
+    Not cached: a read is a single pipelined Redis round-trip.
+    """
+    serializer_class = RealtimeSalesSerializer
+
+    def get(self, request):
+        try:
+            user = request.validated_user
+            if user.user_type != User.USER_TYPE.ADMIN:
+                self.message = "Admin access required"
+                self.error_occurred(e=None, custom_code=5041)
+                return self.get_response()
+            
+            serializer = self.serializer_class(data=request.GET)
+            if serializer.is_valid():
+                self.data = get_sales_counters(
+                    serializer.validated_data['event_id'],
+                    serializer.validated_data['minutes']
+                )
+                self.message = "Realtime sales retrieved successfully"
+            else:
+                self.custom_code = 5042
+                self.serializer_errors(serializer.errors)
         
-        if event_id:
-            events_query = events_query.filter(events_id=event_id)
+        except Exception as e:
+            self.message = "Failed to retrieve realtime sales"
+            self.error_occurred(e, custom_code=5043)
         
-        event_performance = []
-        for event in events_query:
-            bookings = Booking.objects.filter(events_id=event)
-            booking_count = bookings.count()
-            confirmed_bookings = bookings.filter(status=Booking.BOOKING_STATUS.CONFIRMED).count()
-            total_revenue = bookings.filter(status=Booking.BOOKING_STATUS.CONFIRMED).aggregate(
-                total=Sum('total_price_cents')
-            )['total'] or 0
-            
-            # Get capacity utilization
-            total_capacity = 0
-            if event.seat_mode == Events.SEAT_MODE.GENERAL_ADMISSION:
-                inventories = EventInventory.objects.filter(event_id=event)
-                total_capacity = sum(inv.initial_qty for inv in inventories)
-            elif event.seat_mode == Events.SEAT_MODE.RESERVED_SEATING:
-                total_capacity = event.seats.count()
-            
-            utilization_rate = (confirmed_bookings / total_capacity * 100) if total_capacity > 0 else 0
-            
-            # Calculate conversion rate for this event
-            conversion_rate = (confirmed_bookings / booking_count * 100) if booking_count > 0 else 0
+        return self.get_response()
+
+
+class AnalyticsQueryView(BaseAPIClass):
+    """
+    Ad-hoc slicing of the booking items, e.g. revenue by venue and weekday,
+    answered from the memory-mapped columnar snapshot without database queries.
+    """
+    serializer_class = AnalyticsQuerySerializer
+
+    def get(self, request):
+        try:
+            user = request.validated_user
+            if user.user_type != User.USER_TYPE.ADMIN:
+                self.message = "Admin access required"
+                self.error_occurred(e=None, custom_code=5051)
+                return self.get_response()
             
-            event_performance.append({
-                'event_id': str(event.events_id),
-                'event_name': event.event_name,
-                'event_date': event.event_date,
-                'venue_name': event.venue_id.name,
-                'seat_mode': event.seat_mode,
-                'status': event.status,
-                'total_bookings': booking_count,
-                'confirmed_bookings': confirmed_bookings,
-                'total_revenue': total_revenue,
-                'total_capacity': total_capacity,
-                'utilization_rate': round(utilization_rate, 2),
-                'conversion_rate': round(conversion_rate, 2)
-            })
+            serializer = self.serializer_class(data=request.GET)
+            if serializer.is_valid():
+                self.data = run_query(serializer.validated_data)
+                self.message = "Analytics query completed successfully"
+            else:
+                self.custom_code = 5052
+                self.serializer_errors(serializer.errors)
         
-        # Sort by revenue
-        event_performance.sort(key=lambda x: x['total_revenue'], reverse=True)
+        except ColumnarStoreMissing as e:
+            self.message = str(e)
+            self.error_occurred(e, custom_code=5053)
+            self.code = status.HTTP_503_SERVICE_UNAVAILABLE
+        except Exception as e:
+            self.message = "Failed to run analytics query"
+            self.error_occurred(e, custom_code=5054)
         
-        data = {
-            'events': event_performance,
-            'summary': {
-                'total_events': len(event_performance),
-                'total_revenue': sum(event['total_revenue'] for event in event_performance),
-                'average_utilization': sum(event['utilization_rate'] for event in event_performance) / len(event_performance) if event_performance else 0,
-                'average_conversion': sum(event['conversion_rate'] for event in event_performance) / len(event_performance) if event_performance else 0,
-                'date_range': {
-                    'start_date': start_date,
-                    'end_date': end_date
-                }
-            }
-        }
+        return self.get_response()
+
+
+class DatabasePoolView(BaseAPIClass):
+    """
+    Database connection metrics of the web workers: pool wait time and
+    saturation, or the connects of persistent connections. Not cached.
+    """
+
+    def get(self, request):
+        try:
+            user = request.validated_user
+            if user.user_type != User.USER_TYPE.ADMIN:
+                self.message = "Admin access required"
+                self.error_occurred(e=None, custom_code=5061)
+                return self.get_response()
+
+            self.data = get_pool_metrics()
+            self.message = "Database pool metrics retrieved successfully"
+
+        except Exception as e:
+            self.message = "Failed to retrieve database pool metrics"
+            self.error_occurred(e, custom_code=5062)
 
-        return data
+        return self.get_response()
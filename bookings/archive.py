@@ -0,0 +1,86 @@
+"""
+Archival of the bookings and holds of ended events.
+
+Once an event has been ENDED for ARCHIVE_RETENTION_DAYS its bookings,
+booking items, cancellations, holds and held seats move to the matching
+*_archive tables, one transaction per event. The hot tables then only hold
+current events, so their scans, indexes and vacuums stay small. The archive
+tables keep the same columns without foreign keys.
+"""
+from datetime import timedelta
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+from bookings.models import Booking
+from events.models import Events
+from inventory.models import InventoryHold
+
+# (table, archive table, rows of an event), children before their parents
+ARCHIVED_TABLES = [
+    (
+        'booking_item', 'booking_item_archive',
+        "booking_id_id IN (SELECT booking_id FROM booking WHERE events_id_id = %s)",
+    ),
+    (
+        'cancellation', 'cancellation_archive',
+        "booking_id_id IN (SELECT booking_id FROM booking WHERE events_id_id = %s)",
+    ),
+    ('booking', 'booking_archive', "events_id_id = %s"),
+    (
+        'inventory_hold_seat', 'inventory_hold_seat_archive',
+        "hold_id_id IN (SELECT inventory_hold_id FROM inventory_hold WHERE events_id_id = %s)",
+    ),
+    ('inventory_hold', 'inventory_hold_archive', "events_id_id = %s"),
+]
+
+
+class ArchiveSchemaError(Exception):
+    """Raised when a hot table has columns its archive table lacks"""
+
+
+def get_archive_cutoff():
+    return timezone.now() - timedelta(days=settings.ARCHIVE_RETENTION_DAYS)
+
+
+def get_archivable_event_ids(cutoff=None):
+    """Events ENDED before the cutoff that still have bookings or holds in the hot tables"""
+    cutoff = cutoff or get_archive_cutoff()
+    return list(
+        Events.objects.filter(
+            status=Events.EVENT_STATUS.ENDED,
+            ends_at__lt=cutoff
+        ).filter(
+            Q(Exists(Booking.objects.filter(events_id=OuterRef('pk'))))
+            | Q(Exists(InventoryHold.objects.filter(events_id=OuterRef('pk'))))
+        ).order_by('ends_at').values_list('events_id', flat=True)
+    )
+
+
+def _get_columns(cursor, table):
+    cursor.execute(
+        "SELECT column_name FROM information_schema.columns WHERE table_name = %s ORDER BY ordinal_position",
+        [table]
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+def archive_event(event_id):
+    """Move the bookings and holds of one event to the archive tables. Returns {table: rows moved}."""
+    moved = {}
+    with transaction.atomic(), connection.cursor() as cursor:
+        for table, archive_table, condition in ARCHIVED_TABLES:
+            columns = _get_columns(cursor, table)
+            missing = set(columns) - set(_get_columns(cursor, archive_table))
+            if missing:
+                # A column added to the hot table must be added to its archive first
+                raise ArchiveSchemaError(f"{archive_table} lacks {', '.join(sorted(missing))}")
+
+            column_list = ', '.join(columns)
+            cursor.execute(
+                f"WITH moved AS (DELETE FROM {table} WHERE {condition} RETURNING {column_list}) "
+                f"INSERT INTO {archive_table} ({column_list}) SELECT {column_list} FROM moved",
+                [event_id]
+            )
+            moved[table] = cursor.rowcount
+    return moved
@@ -0,0 +1,167 @@
+"""
+Booking confirmation pipeline.
+
+Paid bookings are confirmed in batches: every batch moves held inventory to
+sold with one UPDATE per (event, ticket type) and flips all of its seats from
+HELD to SOLD in a single statement, so throughput grows with the batch size
+instead of paying one transaction per booking.
+"""
+from collections import defaultdict
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from EventX.db_utils import lock_rows, run_in_transaction
+from analytics.facts import record_booking_facts
+from analytics.models import BookingFact
+from EventX.cache_utils import invalidate_events_cache, invalidate_analytics_cache
+from events.listing import schedule_listing_delta
+from bookings.models import Booking, BookingItem
+from inventory.models import EventInventory, Seat, InventoryHold
+
+
+def _collect_inventory_moves(bookings):
+    """
+    Group the items of the given bookings into GA quantities per
+    (event, ticket type) and a flat list of reserved seat ids
+    """
+    event_by_booking = {booking.booking_id: booking.events_id_id for booking in bookings}
+    quantities = defaultdict(int)
+    seat_ids = []
+
+    items = BookingItem.objects.filter(
+        booking_id__in=list(event_by_booking)
+    ).values_list('booking_id', 'ticket_type_id', 'seat_id', 'quantity')
+
+    for booking_id, ticket_type_id, seat_id, quantity in items:
+        if seat_id:
+            seat_ids.append(seat_id)
+        elif ticket_type_id:
+            quantities[(event_by_booking[booking_id], ticket_type_id)] += quantity
+
+    return quantities, seat_ids
+
+
+def _lock_inventories(quantities, event_id=None):
+    """
+    Lock the EventInventory rows of the (event, ticket type) keys in pk order,
+    the order the booking and hold views lock them in
+    """
+    keys = Q()
+    for event_id_key, ticket_type_id in quantities:
+        keys |= Q(event_id=event_id_key, ticket_type_id=ticket_type_id)
+    return lock_rows(EventInventory.objects.filter(keys), event_id)
+
+
+def release_booking_inventory(booking):
+    """
+    Return the inventory held or sold by a booking and cancel its hold.
+    Must be called inside a transaction.
+    """
+    hold = booking.hold_id
+    if not hold or hold.status in (InventoryHold.HOLD_STATUS.CANCELLED, InventoryHold.HOLD_STATUS.EXPIRED):
+        return
+
+    was_sold = hold.status == InventoryHold.HOLD_STATUS.CONSUMED
+    quantities, seat_ids = _collect_inventory_moves([booking])
+
+    if seat_ids:
+        lock_rows(Seat.objects.filter(seat_id__in=seat_ids), booking.events_id_id)
+        Seat.objects.filter(seat_id__in=seat_ids).update(status=Seat.SEAT_STATUS.AVAILABLE)
+
+    # Seats before inventory, as in the booking and hold views
+    if quantities:
+        _lock_inventories(quantities, booking.events_id_id)
+    for (event_id, ticket_type_id), quantity in quantities.items():
+        inventories = EventInventory.objects.filter(event_id=event_id, ticket_type_id=ticket_type_id)
+        if was_sold:
+            inventories.update(sold_qty=F('sold_qty') - quantity)
+        else:
+            inventories.update(held_qty=F('held_qty') - quantity)
+
+    hold.status = InventoryHold.HOLD_STATUS.CANCELLED
+    hold.save(update_fields=['status'])
+    transaction.on_commit(lambda: invalidate_events_cache(event_id=booking.events_id_id))
+    schedule_listing_delta(booking.events_id_id, len(seat_ids) + sum(quantities.values()))
+
+
+def _confirm_batch(batch_size, now):
+    """Confirm up to batch_size paid bookings inside run_in_transaction"""
+    # skip_locked lets several workers drain the queue side by side
+    bookings = list(
+        Booking.objects.select_for_update(skip_locked=True, of=('self',))
+        .select_related('hold_id')
+        .filter(status=Booking.BOOKING_STATUS.PENDING, paid_at__isnull=False)
+        .order_by('paid_at')[:batch_size]
+    )
+    if not bookings:
+        return bookings, 0, 0
+
+    confirmable = []
+    expired_ids = []
+    for booking in bookings:
+        if booking.hold_id and booking.hold_id.status != InventoryHold.HOLD_STATUS.ACTIVE:
+            # The hold was released before payment landed, nothing left to sell
+            expired_ids.append(booking.booking_id)
+        else:
+            confirmable.append(booking)
+
+    quantities, seat_ids = _collect_inventory_moves(confirmable)
+
+    # Seats, then inventory, each in pk order: the lock order of the booking
+    # and hold views, so a batch cannot deadlock with them or with another batch
+    if seat_ids:
+        lock_rows(Seat.objects.filter(seat_id__in=seat_ids))
+        Seat.objects.filter(
+            seat_id__in=seat_ids,
+            status=Seat.SEAT_STATUS.HELD
+        ).update(status=Seat.SEAT_STATUS.SOLD)
+
+    if quantities:
+        _lock_inventories(quantities)
+    for (event_id, ticket_type_id), quantity in quantities.items():
+        EventInventory.objects.filter(
+            event_id=event_id,
+            ticket_type_id=ticket_type_id
+        ).update(
+            held_qty=F('held_qty') - quantity,
+            sold_qty=F('sold_qty') + quantity
+        )
+
+    hold_ids = [booking.hold_id_id for booking in confirmable if booking.hold_id_id]
+    if hold_ids:
+        InventoryHold.objects.filter(inventory_hold_id__in=hold_ids).update(
+            status=InventoryHold.HOLD_STATUS.CONSUMED
+        )
+
+    if confirmable:
+        Booking.objects.filter(booking_id__in=[booking.booking_id for booking in confirmable]).update(
+            status=Booking.BOOKING_STATUS.CONFIRMED,
+            confirmed_at=now
+        )
+        record_booking_facts(confirmable, BookingFact.ACTION.BOOKING_CONFIRMED, now)
+
+    if expired_ids:
+        Booking.objects.filter(booking_id__in=expired_ids).update(
+            status=Booking.BOOKING_STATUS.EXPIRED
+        )
+
+    return bookings, len(confirmable), len(expired_ids)
+
+
+def confirm_paid_bookings(batch_size=None):
+    """
+    Confirm one batch of paid PENDING bookings.
+
+    Returns a dict with the number of bookings confirmed and expired.
+    """
+    batch_size = batch_size or settings.BOOKING_CONFIRMATION_BATCH_SIZE
+    bookings, confirmed, expired = run_in_transaction(lambda: _confirm_batch(batch_size, timezone.now()))
+
+    # Booking history is cached per user for 30 seconds only, so invalidating
+    # per event keeps the cost of a batch independent of the number of buyers
+    for event_id in {booking.events_id_id for booking in bookings}:
+        invalidate_events_cache(event_id=event_id)
+        invalidate_analytics_cache(event_id=event_id)
+
+    return {'confirmed': confirmed, 'expired': expired}
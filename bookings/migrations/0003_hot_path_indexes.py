@@ -0,0 +1,25 @@
+# Generated by Django 5.2.6 on 2026-10-19 10:55
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction, and does not lock writes
+    atomic = False
+
+    dependencies = [
+        ('bookings', '0002_booking_payment'),
+        ('inventory', '0002_alter_inventoryhold_request_id'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='booking',
+            index=models.Index(fields=['user_id', 'created_at'], name='booking_user_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='booking',
+            index=models.Index(fields=['events_id', 'status', 'created_at'], name='booking_event_status_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.6 on 2026-10-19 10:57
+
+import EventX.ids
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0003_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='booking',
+            name='booking_id',
+            field=models.UUIDField(default=EventX.ids.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='bookingitem',
+            name='booking_item_id',
+            field=models.UUIDField(default=EventX.ids.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+    ]
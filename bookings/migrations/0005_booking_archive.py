@@ -0,0 +1,34 @@
+from django.db import migrations
+
+# Same columns as the hot tables, without foreign keys, filled by bookings.archive
+CREATE_ARCHIVE_TABLES = """
+    CREATE TABLE booking_archive (LIKE booking INCLUDING DEFAULTS INCLUDING CONSTRAINTS);
+    ALTER TABLE booking_archive ADD PRIMARY KEY (booking_id);
+    CREATE INDEX booking_archive_event_idx ON booking_archive (events_id_id);
+    CREATE INDEX booking_archive_user_idx ON booking_archive (user_id_id, created_at);
+
+    CREATE TABLE booking_item_archive (LIKE booking_item INCLUDING DEFAULTS INCLUDING CONSTRAINTS);
+    ALTER TABLE booking_item_archive ADD PRIMARY KEY (booking_item_id);
+    CREATE INDEX booking_item_archive_booking_idx ON booking_item_archive (booking_id_id);
+
+    CREATE TABLE cancellation_archive (LIKE cancellation INCLUDING DEFAULTS INCLUDING CONSTRAINTS);
+    ALTER TABLE cancellation_archive ADD PRIMARY KEY (cancellation_id);
+    CREATE INDEX cancellation_archive_booking_idx ON cancellation_archive (booking_id_id);
+"""
+
+DROP_ARCHIVE_TABLES = """
+    DROP TABLE cancellation_archive;
+    DROP TABLE booking_item_archive;
+    DROP TABLE booking_archive;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0004_uuid7_primary_keys'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_ARCHIVE_TABLES, DROP_ARCHIVE_TABLES),
+    ]
@@ -5,6 +5,7 @@ from django_enumfield import enum
 from accounts.models import User
 from events.models import Events, TicketType
 from inventory.models import Seat, InventoryHold
+from EventX.ids import uuid7
 
 
 class Booking(models.Model):
@@ -16,7 +17,7 @@ class Booking(models.Model):
         EXPIRED = 4
         FAILED = 5
     
-    booking_id = models.UUIDField(primary_key=True, default=uuid4, editable=False)
+    booking_id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     user_id = models.ForeignKey(User, on_delete=models.CASCADE, related_name="bookings")
     events_id = models.ForeignKey(Events, on_delete=models.CASCADE, related_name="bookings")
     status = enum.EnumField(BOOKING_STATUS, default=BOOKING_STATUS.PENDING)
@@ -24,16 +25,27 @@ class Booking(models.Model):
     currency = models.CharField(max_length=3, default="USD")
     hold_id = models.OneToOneField(InventoryHold, on_delete=models.SET_NULL, null=True, blank=True, related_name="booking")
     request_id = models.CharField(max_length=100, unique=True)
+    payment_reference = models.CharField(max_length=100, null=True, blank=True)
+    paid_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     confirmed_at = models.DateTimeField(null=True, blank=True)
     cancelled_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         db_table = "booking"
+        indexes = [
+            models.Index(fields=['user_id', 'created_at'], name='booking_user_created_idx'),
+            models.Index(fields=['events_id', 'status', 'created_at'], name='booking_event_status_idx'),
+            # Funnel stages since the funnel watermark, most bookings are never paid or cancelled
+            models.Index(fields=['created_at'], name='booking_created_idx'),
+            models.Index(fields=['paid_at'], name='booking_paid_idx', condition=models.Q(paid_at__isnull=False)),
+            models.Index(fields=['confirmed_at'], name='booking_confirmed_idx', condition=models.Q(confirmed_at__isnull=False)),
+            models.Index(fields=['cancelled_at'], name='booking_cancelled_idx', condition=models.Q(cancelled_at__isnull=False)),
+        ]
 
 
 class BookingItem(models.Model):
-    booking_item_id = models.UUIDField(primary_key=True, default=uuid4, editable=False)
+    booking_item_id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     booking_id = models.ForeignKey(Booking, on_delete=models.CASCADE, related_name="items")
     ticket_type_id = models.ForeignKey(TicketType, on_delete=models.SET_NULL, null=True, blank=True)
     seat_id = models.ForeignKey(Seat, on_delete=models.SET_NULL, null=True, blank=True)
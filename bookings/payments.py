@@ -0,0 +1,34 @@
+"""
+Payment gateway integration for bookings
+"""
+from collections import namedtuple
+
+
+PaymentResult = namedtuple('PaymentResult', ['is_paid', 'reference', 'failure_reason'])
+
+
+class StubPaymentGateway:
+    """
+    Local stand-in for a real payment provider.
+
+    The client pays against the stub and posts the outcome back to us; the
+    stub only checks that a successful payment carries one of its references.
+    """
+    REFERENCE_PREFIX = 'stub_'
+
+    def verify(self, booking, payment_status, payment_reference):
+        """
+        Verify a payment result reported for a booking
+        """
+        if payment_status != 'success':
+            return PaymentResult(False, payment_reference, 'Payment declined by gateway')
+
+        if not payment_reference or not payment_reference.startswith(self.REFERENCE_PREFIX):
+            return PaymentResult(False, payment_reference, 'Unknown payment reference')
+
+        return PaymentResult(True, payment_reference, None)
+
+
+def get_payment_gateway():
+    """Return the payment gateway used to verify booking payments"""
+    return StubPaymentGateway()
@@ -1,11 +1,11 @@
 from rest_framework import serializers
+from EventX.utils import decode_cursor
 from bookings.models import Booking, BookingItem
 from events.models import Events, TicketType
 from inventory.models import Seat
 
 
-class CreateBookingSerializer(serializers.Serializer):
-    event_id = serializers.UUIDField()
+class BookingLineSerializer(serializers.Serializer):
     ticket_type_id = serializers.UUIDField()
     quantity = serializers.IntegerField(min_value=1, max_value=10)
     seat_ids = serializers.ListField(
@@ -14,12 +14,45 @@ class CreateBookingSerializer(serializers.Serializer):
         allow_empty=True
     )
 
+
+class CreateBookingSerializer(serializers.Serializer):
+    """
+    Accepts either a single ticket type (ticket_type_id, quantity, seat_ids)
+    or a cart of lines under `items`. Both are normalised to `lines`.
+    """
+    MAX_LINES = 10
+
+    event_id = serializers.UUIDField()
+    ticket_type_id = serializers.UUIDField(required=False)
+    quantity = serializers.IntegerField(min_value=1, max_value=10, required=False)
+    seat_ids = serializers.ListField(
+        child=serializers.UUIDField(),
+        required=False,
+        allow_empty=True
+    )
+    items = BookingLineSerializer(many=True, required=False, allow_empty=False)
+
     def validate(self, data):
         event_id = data.get('event_id')
-        print(event_id)
-        ticket_type_id = data.get('ticket_type_id')
-        quantity = data.get('quantity')
-        seat_ids = data.get('seat_ids', [])
+        lines = data.get('items')
+
+        if lines is None:
+            if not data.get('ticket_type_id') or not data.get('quantity'):
+                raise serializers.ValidationError("Either items or ticket_type_id and quantity are required")
+            lines = [{
+                'ticket_type_id': data['ticket_type_id'],
+                'quantity': data['quantity'],
+                'seat_ids': data.get('seat_ids', [])
+            }]
+        elif data.get('ticket_type_id') or data.get('seat_ids'):
+            raise serializers.ValidationError("Use either items or ticket_type_id, not both")
+
+        if len(lines) > self.MAX_LINES:
+            raise serializers.ValidationError(f"A booking can have at most {self.MAX_LINES} lines")
+
+        ticket_type_ids = [line['ticket_type_id'] for line in lines]
+        if len(set(ticket_type_ids)) != len(ticket_type_ids):
+            raise serializers.ValidationError("Each ticket type can appear only once per booking")
 
         # Validate event exists and is active
         try:
@@ -29,35 +62,48 @@ class CreateBookingSerializer(serializers.Serializer):
         except Events.DoesNotExist:
             raise serializers.ValidationError("Event not found")
 
-        # Validate ticket type exists and belongs to event
-        try:
-            ticket_type = TicketType.objects.get(
-                ticket_type_id=ticket_type_id,
-                events_id=event_id,
-                is_active=True
-            )
-        except TicketType.DoesNotExist:
+        # Validate ticket types exist and belong to event
+        currencies = list(TicketType.objects.filter(
+            ticket_type_id__in=ticket_type_ids,
+            events_id=event_id,
+            is_active=True
+        ).values_list('currency', flat=True))
+        if len(currencies) != len(ticket_type_ids):
             raise serializers.ValidationError("Invalid ticket type for this event")
 
+        # A booking has a single total_price_cents and currency
+        if len(set(currencies)) > 1:
+            raise serializers.ValidationError("All ticket types of a booking must have the same currency")
+
         # Validate seat allocation based on seat mode
         if event.seat_mode == Events.SEAT_MODE.RESERVED_SEATING:
-            if not seat_ids:
-                raise serializers.ValidationError("Seat selection required for reserved seating")
-            if len(seat_ids) != quantity:
-                raise serializers.ValidationError("Number of seats must match quantity")
-            
-            # Validate seats exist and belong to event
+            requested_seats = {}
+            for line in lines:
+                seat_ids = line.get('seat_ids', [])
+                if not seat_ids:
+                    raise serializers.ValidationError("Seat selection required for reserved seating")
+                if len(seat_ids) != line['quantity']:
+                    raise serializers.ValidationError("Number of seats must match quantity")
+                for seat_id in seat_ids:
+                    if seat_id in requested_seats:
+                        raise serializers.ValidationError("A seat can be booked only once")
+                    requested_seats[seat_id] = line['ticket_type_id']
+
+            # Validate seats exist, belong to event and match their line's ticket type
             seats = Seat.objects.filter(
-                seat_id__in=seat_ids,
-                events_id=event_id,
-                ticket_type_id=ticket_type_id
-            )
-            if seats.count() != len(seat_ids):
+                seat_id__in=list(requested_seats),
+                event_id=event_id
+            ).values_list('seat_id', 'ticket_type_id')
+            seat_types = dict(seats)
+            if len(seat_types) != len(requested_seats) or any(
+                seat_types[seat_id] != ticket_type_id for seat_id, ticket_type_id in requested_seats.items()
+            ):
                 raise serializers.ValidationError("Invalid seat selection")
         else:  # General Admission
-            if seat_ids:
+            if any(line.get('seat_ids') for line in lines):
                 raise serializers.ValidationError("Seat selection not allowed for general admission")
 
+        data['lines'] = lines
         return data
 
 
@@ -97,7 +143,40 @@ class BookingSerializer(serializers.ModelSerializer):
 class BookingHistorySerializer(serializers.Serializer):
     page = serializers.IntegerField(min_value=1, default=1)
     rows_per_page = serializers.IntegerField(default=10, min_value=1, max_value=100)
+    pagination = serializers.ChoiceField(choices=['page', 'cursor'], default='page')
+    cursor = serializers.CharField(max_length=500, required=False)
+    count = serializers.ChoiceField(choices=['exact', 'estimated', 'none'], required=False)
+    status = serializers.ChoiceField(
+        choices=Booking.BOOKING_STATUS.values,
+        required=False
+    )
+
+    def validate_cursor(self, value):
+        try:
+            decode_cursor(value)
+        except ValueError as e:
+            raise serializers.ValidationError(str(e))
+        return value
+
+
+class BookingExportSerializer(serializers.Serializer):
+    resource = serializers.ChoiceField(choices=['bookings', 'items'], default='bookings')
+    # Not "format", DRF reserves that query parameter for content negotiation
+    file_format = serializers.ChoiceField(choices=['csv', 'ndjson'], default='csv')
+    event_id = serializers.UUIDField(required=False)
+    start_date = serializers.DateField(required=False)
+    end_date = serializers.DateField(required=False)
     status = serializers.ChoiceField(
         choices=Booking.BOOKING_STATUS.values,
         required=False
     )
+
+    def validate(self, data):
+        if data.get('start_date') and data.get('end_date') and data['start_date'] > data['end_date']:
+            raise serializers.ValidationError("start_date must be on or before end_date")
+        return data
+
+
+class PaymentResultSerializer(serializers.Serializer):
+    payment_status = serializers.ChoiceField(choices=['success', 'failed'])
+    payment_reference = serializers.CharField(max_length=100, required=False, allow_blank=True)
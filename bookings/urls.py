@@ -1,7 +1,9 @@
 from django.urls import path
-from bookings.views import BookingView, BookingDetailView
+from bookings.views import BookingView, BookingDetailView, BookingExportView, BookingPaymentView
 
 urlpatterns = [
     path('', BookingView.as_view(), name='booking-list'),
+    path('export/', BookingExportView.as_view(), name='booking-export'),
     path('<uuid:booking_id>/', BookingDetailView.as_view(), name='booking-detail'),
+    path('<uuid:booking_id>/payment/', BookingPaymentView.as_view(), name='booking-payment'),
 ]
@@ -1,21 +1,41 @@
 import uuid
+from django.conf import settings
 from django.db import transaction
+from django.http import StreamingHttpResponse
 from django.utils import timezone
 from django.db.models import F, Q
+from rest_framework import status
 from EventX.helper import BaseAPIClass
-from EventX.utils import paginate_queryset
-from EventX.cache_utils import cache_api_response, invalidate_bookings_cache, invalidate_analytics_cache
+from EventX.utils import get_total_count, paginate_queryset, paginate_queryset_by_cursor
+from EventX.db_utils import TransactionConflictError, lock_rows, run_in_transaction
+from EventX.cache_utils import cache_api_response, invalidate_bookings_cache, invalidate_analytics_cache, invalidate_events_cache
+from events.listing import schedule_listing_delta
 from bookings.models import Booking, BookingItem, Cancellation
 from bookings.serializers import (
     CreateBookingSerializer, 
     BookingSerializer, 
-    BookingHistorySerializer
+    BookingHistorySerializer,
+    BookingExportSerializer,
+    PaymentResultSerializer
 )
+from bookings.export import EXPORT_CONTENT_TYPES, EXPORT_STREAMS, aiter_stream, get_export_rows
+from analytics.counters import UNIQUE_BUYERS, add_unique_user
+from analytics.facts import record_booking_facts
+from analytics.models import BookingFact
+from bookings.confirmation import release_booking_inventory
+from bookings.payments import get_payment_gateway
 from events.models import Events, TicketType
-from inventory.models import Seat, InventoryHold, EventInventory
+from inventory.models import Seat, InventoryHold, InventoryHoldSeat, EventInventory
 from accounts.models import User
 
 
+def _invalidate_booking_caches(user_id, event_id):
+    """Drop the cached bookings, analytics and availability of a changed booking"""
+    invalidate_bookings_cache(user_id=user_id, event_id=event_id)
+    invalidate_analytics_cache(event_id=event_id)
+    invalidate_events_cache(event_id=event_id)
+
+
 class BookingView(BaseAPIClass):
     model_class = Booking
     create_serializer = CreateBookingSerializer
@@ -32,154 +52,19 @@ class BookingView(BaseAPIClass):
             if serializer.is_valid():
                 validated_data = serializer.validated_data
                 event_id = validated_data['event_id']
-                ticket_type_id = validated_data['ticket_type_id']
-                quantity = validated_data['quantity']
-                seat_ids = validated_data.get('seat_ids', [])
+                lines = validated_data['lines']
+                quantities = {line['ticket_type_id']: line['quantity'] for line in lines}
                 
                 # Generate unique request ID for this booking attempt
                 request_id = str(uuid.uuid4())
                 
-                # Use database transaction with locking to prevent race conditions
-                with transaction.atomic():
-                    # Lock the event and ticket type for updates
-                    event = Events.objects.select_for_update().get(events_id=event_id)
-                    ticket_type = TicketType.objects.select_for_update().get(
-                        ticket_type_id=ticket_type_id
-                    )
-                    
-                    # Check if event is still available for booking
-                    if event.status != Events.EVENT_STATUS.PUBLISHED:
-                        self.message = "Event is no longer available for booking"
-                        self.error_occurred(
-                            e=None, 
-                            custom_code=4101
-                        )
-                        return self.get_response()
-                    
-                    # Check sales window
-                    now = timezone.now()
-                    if event.sales_starts_at and now < event.sales_starts_at:
-                        self.message = "Booking not yet open"
-                        self.error_occurred(
-                            e=None, 
-                            custom_code=4102
-                        )
-                        return self.get_response()
-                    
-                    if event.sales_ends_at and now > event.sales_ends_at:
-                        self.message = "Booking window has closed"
-                        self.error_occurred(
-                            e=None, 
-                            custom_code=4103
-                        )
-                        return self.get_response()
-                    
-                    # Handle seat allocation based on seat mode
-                    if event.seat_mode == Events.SEAT_MODE.RESERVED_SEATING:
-                        # Lock and allocate specific seats
-                        seats = Seat.objects.select_for_update().filter(
-                            seat_id__in=seat_ids,
-                            event_id=event_id,
-                            ticket_type_id=ticket_type_id,
-                            status=Seat.SEAT_STATUS.AVAILABLE
-                        )
-                        
-                        if seats.count() != len(seat_ids):
-                            self.message = "Some seats are no longer available"
-                            self.error_occurred(
-                                e=None, 
-                                custom_code=4104
-                            )
-                            return self.get_response()
-                        
-                        # Create inventory hold for seats
-                        hold = InventoryHold.objects.create(
-                            events_id=event,
-                            user=user,
-                            ticket_type=ticket_type,
-                            quantity=0,  # Reserved seating uses individual seats
-                            status=InventoryHold.HOLD_STATUS.ACTIVE,
-                            expires_at=now + timezone.timedelta(minutes=15),  # 15 min hold
-                            request_id=request_id
-                        )
-                        
-                        # Create hold-seat relationships
-                        for seat in seats:
-                            hold.seats.create(seat_id=seat)
-                            seat.status = Seat.SEAT_STATUS.HELD
-                            seat.save()
-                    
-                    else:  # General Admission
-                        # Check and allocate from inventory
-                        inventory = EventInventory.objects.select_for_update().get(
-                            event_id=event_id,
-                            ticket_type_id=ticket_type_id
-                        )
-                        
-                        available_qty = inventory.initial_qty - inventory.sold_qty - inventory.held_qty
-                        if available_qty < quantity:
-                            self.message = f"Only {available_qty} tickets available"
-                            self.error_occurred(
-                                e=None, 
-                                custom_code=4105
-                            )
-                            return self.get_response()
-                        
-                        # Create inventory hold
-                        hold = InventoryHold.objects.create(
-                            events_id=event,
-                            user=user,
-                            ticket_type=ticket_type,
-                            quantity=quantity,
-                            status=InventoryHold.HOLD_STATUS.ACTIVE,
-                            expires_at=now + timezone.timedelta(minutes=15),  # 15 min hold
-                            request_id=request_id
-                        )
-                        
-                        # Update held quantity
-                        inventory.held_qty = F('held_qty') + quantity
-                        inventory.save()
-                    
-                    # Create booking
-                    total_price = ticket_type.price * quantity
-                    booking = Booking.objects.create(
-                        user_id=user,
-                        events_id=event,
-                        status=Booking.BOOKING_STATUS.PENDING,
-                        total_price_cents=total_price,
-                        currency=ticket_type.currency,
-                        hold_id=hold,
-                        request_id=request_id
-                    )
-                    
-                    # Create booking items
-                    if event.seat_mode == Events.SEAT_MODE.RESERVED_SEATING:
-                        # One item per seat
-                        for seat in seats:
-                            BookingItem.objects.create(
-                                booking_id=booking,
-                                ticket_type_id=ticket_type,
-                                seat_id=seat,
-                                price_cents=ticket_type.price,
-                                quantity=1
-                            )
-                    else:
-                        # Single item with quantity
-                        BookingItem.objects.create(
-                            booking_id=booking,
-                            ticket_type_id=ticket_type,
-                            price_cents=ticket_type.price,
-                            quantity=quantity
-                        )
-                    
-                    # Serialize and return booking data
-                    booking_serializer = BookingSerializer(booking)
-                    self.data = booking_serializer.data
-                    self.message = "Booking created successfully. Please complete payment within 15 minutes."
-                    
-                    # Invalidate caches
-                    invalidate_bookings_cache(user_id=user.user_id, event_id=event_id)
-                    invalidate_analytics_cache(event_id=event_id)
+                # Lock rows in a deterministic order and retry on deadlocks
+                run_in_transaction(
+                    lambda: self._create_booking(user, event_id, lines, quantities, request_id),
+                    event_id=event_id
+                )
+                if self.success:
+                    add_unique_user(UNIQUE_BUYERS, event_id, user.user_id)
                     
             else:
                 self.custom_code = 4106
@@ -194,12 +79,205 @@ class BookingView(BaseAPIClass):
         except EventInventory.DoesNotExist:
             self.message = "Event inventory not found"
             self.error_occurred(e=None, custom_code=4109)
+        except TransactionConflictError as e:
+            self.message = "Tickets are in high demand, please retry"
+            self.error_occurred(e, custom_code=4113)
+            self.code = status.HTTP_409_CONFLICT
         except Exception as e:
             self.message = "Booking creation failed"
             self.error_occurred(e, custom_code=4110)
         
         return self.get_response()
 
+    def _create_booking(self, user, event_id, lines, quantities, request_id):
+        """
+        Hold inventory and create the booking. Runs inside run_in_transaction
+        and may be replayed after a deadlock or lock timeout.
+        """
+        # Lock the event and the ticket types in primary key order
+        events = lock_rows(Events.objects.filter(events_id=event_id), event_id)
+        if not events:
+            raise Events.DoesNotExist()
+        event = events[0]
+        ticket_types = {
+            ticket_type.ticket_type_id: ticket_type
+            for ticket_type in lock_rows(
+                TicketType.objects.filter(ticket_type_id__in=list(quantities)), event_id
+            )
+        }
+        if len(ticket_types) != len(quantities):
+            raise TicketType.DoesNotExist()
+        
+        # Re-checked under the lock, the currencies could change after validation
+        if len({ticket_type.currency for ticket_type in ticket_types.values()}) > 1:
+            self.message = "All ticket types of a booking must have the same currency"
+            self.error_occurred(
+                e=None, 
+                custom_code=4114
+            )
+            return
+        
+        # Check if event is still available for booking
+        if event.status != Events.EVENT_STATUS.PUBLISHED:
+            self.message = "Event is no longer available for booking"
+            self.error_occurred(
+                e=None, 
+                custom_code=4101
+            )
+            return
+        
+        # Check sales window
+        now = timezone.now()
+        if event.sales_starts_at and now < event.sales_starts_at:
+            self.message = "Booking not yet open"
+            self.error_occurred(
+                e=None, 
+                custom_code=4102
+            )
+            return
+        
+        if event.sales_ends_at and now > event.sales_ends_at:
+            self.message = "Booking window has closed"
+            self.error_occurred(
+                e=None, 
+                custom_code=4103
+            )
+            return
+        
+        # A single-line booking keeps its ticket type on the hold
+        hold_ticket_type = next(iter(ticket_types.values())) if len(ticket_types) == 1 else None
+        
+        # Handle seat allocation based on seat mode
+        if event.seat_mode == Events.SEAT_MODE.RESERVED_SEATING:
+            # Lock and allocate specific seats
+            line_by_seat = {
+                seat_id: line['ticket_type_id']
+                for line in lines for seat_id in line['seat_ids']
+            }
+            seats = lock_rows(Seat.objects.filter(
+                seat_id__in=list(line_by_seat),
+                event_id=event_id,
+                status=Seat.SEAT_STATUS.AVAILABLE
+            ), event_id)
+            
+            if len(seats) != len(line_by_seat) or any(
+                seat.ticket_type_id_id != line_by_seat[seat.seat_id] for seat in seats
+            ):
+                self.message = "Some seats are no longer available"
+                self.error_occurred(
+                    e=None, 
+                    custom_code=4104
+                )
+                return
+            
+            # Create inventory hold for seats
+            hold = InventoryHold.objects.create(
+                events_id=event,
+                user=user,
+                ticket_type=hold_ticket_type,
+                quantity=0,  # Reserved seating uses individual seats
+                status=InventoryHold.HOLD_STATUS.ACTIVE,
+                expires_at=now + timezone.timedelta(minutes=15),  # 15 min hold
+                request_id=request_id
+            )
+            
+            # Create hold-seat relationships and mark the seats held
+            InventoryHoldSeat.objects.bulk_create([
+                InventoryHoldSeat(hold_id=hold, seat_id=seat) for seat in seats
+            ])
+            Seat.objects.filter(seat_id__in=[seat.seat_id for seat in seats]).update(
+                status=Seat.SEAT_STATUS.HELD
+            )
+        
+        else:  # General Admission
+            # Check and allocate from inventory
+            inventories = lock_rows(EventInventory.objects.filter(
+                event_id=event_id,
+                ticket_type_id__in=list(quantities)
+            ), event_id)
+            if len(inventories) != len(quantities):
+                raise EventInventory.DoesNotExist()
+            
+            for inventory in inventories:
+                quantity = quantities[inventory.ticket_type_id_id]
+                available_qty = inventory.initial_qty - inventory.sold_qty - inventory.held_qty
+                if available_qty < quantity:
+                    ticket_type_name = ticket_types[inventory.ticket_type_id_id].ticket_type_name
+                    self.message = f"Only {available_qty} {ticket_type_name} tickets available"
+                    self.error_occurred(
+                        e=None, 
+                        custom_code=4105
+                    )
+                    return
+            
+            # Create inventory hold
+            hold = InventoryHold.objects.create(
+                events_id=event,
+                user=user,
+                ticket_type=hold_ticket_type,
+                quantity=sum(quantities.values()),
+                status=InventoryHold.HOLD_STATUS.ACTIVE,
+                expires_at=now + timezone.timedelta(minutes=15),  # 15 min hold
+                request_id=request_id
+            )
+            
+            # Update held quantity
+            for inventory in inventories:
+                EventInventory.objects.filter(event_inventory_id=inventory.event_inventory_id).update(
+                    held_qty=F('held_qty') + quantities[inventory.ticket_type_id_id]
+                )
+        
+        # Create booking
+        total_price = sum(
+            ticket_types[ticket_type_id].price * quantity
+            for ticket_type_id, quantity in quantities.items()
+        )
+        booking = Booking.objects.create(
+            user_id=user,
+            events_id=event,
+            status=Booking.BOOKING_STATUS.PENDING,
+            total_price_cents=total_price,
+            currency=ticket_types[lines[0]['ticket_type_id']].currency,
+            hold_id=hold,
+            request_id=request_id
+        )
+        
+        # Create booking items
+        if event.seat_mode == Events.SEAT_MODE.RESERVED_SEATING:
+            # One item per seat
+            booking_items = [
+                BookingItem(
+                    booking_id=booking,
+                    ticket_type_id=ticket_types[seat.ticket_type_id_id],
+                    seat_id=seat,
+                    price_cents=ticket_types[seat.ticket_type_id_id].price,
+                    quantity=1
+                )
+                for seat in seats
+            ]
+        else:
+            # One item per line with quantity
+            booking_items = [
+                BookingItem(
+                    booking_id=booking,
+                    ticket_type_id=ticket_types[ticket_type_id],
+                    price_cents=ticket_types[ticket_type_id].price,
+                    quantity=quantity
+                )
+                for ticket_type_id, quantity in quantities.items()
+            ]
+        BookingItem.objects.bulk_create(booking_items)
+        record_booking_facts([booking], BookingFact.ACTION.BOOKING_CREATED, booking.created_at)
+        
+        # Serialize and return booking data
+        booking_serializer = BookingSerializer(booking)
+        self.data = booking_serializer.data
+        self.message = "Booking created successfully. Please complete payment within 15 minutes."
+        
+        # Invalidate caches once committed, or a concurrent read could cache the old state again
+        transaction.on_commit(lambda: _invalidate_booking_caches(user.user_id, event_id))
+        schedule_listing_delta(event_id, -sum(item.quantity for item in booking_items))
+
     @cache_api_response('bookings_history', timeout=30, vary_on_user=True)  # 30 seconds cache, vary by user
     def get(self, request):
         """
@@ -214,34 +292,48 @@ class BookingView(BaseAPIClass):
                 page = validated_data.get('page', 1)
                 rows_per_page = validated_data.get('rows_per_page', 10)
                 status_filter = validated_data.get('status')
+                cursor = validated_data.get('cursor')
+                count_mode = validated_data.get('count')
                 
                 # Build query with select_related
-                queryset = self.model_class.objects.filter(user_id=user).order_by('-created_at').select_related('events_id', 'events_id__venue_id')
+                queryset = self.model_class.objects.filter(user_id=user).order_by('-created_at').select_related('events_id', 'events_id__venue_id').prefetch_related('items__ticket_type_id', 'items__seat_id')
                 
                 if status_filter:
                     queryset = queryset.filter(status=status_filter)
                 
                 # Paginate results
-                paginated_data = paginate_queryset(queryset, page, rows_per_page)
+                if validated_data['pagination'] == 'cursor':
+                    total_count = get_total_count(queryset, count_mode or 'none')
+                    bookings, next_cursor = paginate_queryset_by_cursor(
+                        queryset, ('-created_at', '-pk'), cursor, rows_per_page
+                    )
+                    pagination = {
+                        'next_cursor': next_cursor,
+                        'total_count': total_count,
+                        'has_next': next_cursor is not None
+                    }
+                else:
+                    bookings, total_count = paginate_queryset(queryset, page, rows_per_page)
+                    pagination = {
+                        'current_page': bookings.number,
+                        'total_pages': bookings.paginator.num_pages,
+                        'total_count': total_count,
+                        'has_next': bookings.has_next(),
+                        'has_previous': bookings.has_previous()
+                    }
                 
                 # Serialize bookings
-                bookings_serializer = BookingSerializer(paginated_data['results'], many=True)
+                bookings_serializer = BookingSerializer(bookings, many=True)
                 
                 self.data = {
                     'bookings': bookings_serializer.data,
-                    'pagination': {
-                        'current_page': page,
-                        'total_pages': paginated_data['total_pages'],
-                        'total_count': paginated_data['total_count'],
-                        'has_next': paginated_data['has_next'],
-                        'has_previous': paginated_data['has_previous']
-                    }
+                    'pagination': pagination
                 }
                 self.message = "Booking history retrieved successfully"
                 
             else:
                 self.custom_code = 4111
-                self._serializer_errors(serializer.errors)
+                self.serializer_errors(serializer.errors)
                 
         except Exception as e:
             self.message = "Failed to retrieve booking history"
@@ -260,70 +352,193 @@ class BookingDetailView(BaseAPIClass):
         try:
             user = request.validated_user
             
-            with transaction.atomic():
-                # Get booking with lock
-                booking = self.model_class.objects.select_for_update().get(
-                    booking_id=booking_id,
-                    user_id=user
-                )
+            run_in_transaction(lambda: self._cancel_booking(user, booking_id))
                 
-                # Check if booking can be cancelled
-                if booking.status == Booking.BOOKING_STATUS.CANCELLED:
-                    self.message = "Booking is already cancelled"
-                    self.error_occurred(
-                        e=None, 
-                        custom_code=4121
-                    )
-                    return self.get_response()
+        except self.model_class.DoesNotExist:
+            self.message = "Booking not found"
+            self.error_occurred(e=None, custom_code=4123)
+        except TransactionConflictError as e:
+            self.message = "Booking is being updated, please retry"
+            self.error_occurred(e, custom_code=4125)
+            self.code = status.HTTP_409_CONFLICT
+        except Exception as e:
+            self.message = "Booking cancellation failed"
+            self.error_occurred(e, custom_code=4124)
+        
+        return self.get_response()
+
+    def _cancel_booking(self, user, booking_id):
+        """
+        Cancel the booking and release its inventory inside run_in_transaction
+        """
+        # Get booking with lock
+        bookings = lock_rows(self.model_class.objects.select_related('hold_id').filter(
+            booking_id=booking_id,
+            user_id=user
+        ))
+        if not bookings:
+            raise self.model_class.DoesNotExist()
+        booking = bookings[0]
+        
+        # Check if booking can be cancelled
+        if booking.status == Booking.BOOKING_STATUS.CANCELLED:
+            self.message = "Booking is already cancelled"
+            self.error_occurred(
+                e=None, 
+                custom_code=4121
+            )
+            return
+        
+        if booking.status == Booking.BOOKING_STATUS.EXPIRED:
+            self.message = "Booking has expired"
+            self.error_occurred(
+                e=None, 
+                custom_code=4122
+            )
+            return
+        
+        # Update booking status
+        was_confirmed = booking.status == Booking.BOOKING_STATUS.CONFIRMED
+        booking.status = Booking.BOOKING_STATUS.CANCELLED
+        booking.cancelled_at = timezone.now()
+        booking.save()
+        
+        # Only a confirmed booking was paid for, so only its cancellation is a refund
+        record_booking_facts([booking], BookingFact.ACTION.BOOKING_CANCELLED, booking.cancelled_at, refund=was_confirmed)
+        
+        # Release held or sold inventory
+        release_booking_inventory(booking)
+        
+        # Create cancellation record
+        Cancellation.objects.create(
+            booking_id=booking,
+            reason="User requested cancellation"
+        )
+        
+        self.message = "Booking cancelled successfully"
+
+
+class BookingExportView(BaseAPIClass):
+    """
+    Admin export of bookings or booking items as CSV or NDJSON, streamed from
+    a server-side cursor instead of paging through the JSON endpoints
+    """
+    serializer_class = BookingExportSerializer
+    use_replica = True
+
+    def get(self, request):
+        try:
+            user = request.validated_user
+            if user.user_type != User.USER_TYPE.ADMIN:
+                self.message = "Admin access required"
+                self.error_occurred(e=None, custom_code=4141)
+                return self.get_response()
+            
+            serializer = self.serializer_class(data=request.GET)
+            if not serializer.is_valid():
+                self.custom_code = 4142
+                self.serializer_errors(serializer.errors)
+                return self.get_response()
+            
+            validated_data = serializer.validated_data
+            export_format = validated_data['file_format']
+            columns, rows = get_export_rows(validated_data['resource'], validated_data)
+            stream = EXPORT_STREAMS[export_format](columns, rows)
+            if settings.SERVE_ASGI:
+                stream = aiter_stream(stream)
+            
+            response = StreamingHttpResponse(
+                stream,
+                content_type=EXPORT_CONTENT_TYPES[export_format]
+            )
+            response['Content-Disposition'] = f'attachment; filename="{validated_data["resource"]}.{export_format}"'
+            return response
+        
+        except Exception as e:
+            self.message = "Failed to export bookings"
+            self.error_occurred(e, custom_code=4143)
+        
+        return self.get_response()
+
+
+class BookingPaymentView(BaseAPIClass):
+    model_class = Booking
+    payment_serializer = PaymentResultSerializer
+
+    def post(self, request, booking_id):
+        """
+        Record the payment result for a pending booking.
+        Paid bookings are confirmed asynchronously by the confirm_bookings worker.
+        """
+        try:
+            user = request.validated_user
+            serializer = self.payment_serializer(data=request.data)
+            
+            if serializer.is_valid():
+                payment_status = serializer.validated_data['payment_status']
+                payment_reference = serializer.validated_data.get('payment_reference')
                 
-                if booking.status == Booking.BOOKING_STATUS.EXPIRED:
-                    self.message = "Booking has expired"
-                    self.error_occurred(
-                        e=None, 
-                        custom_code=4122
+                with transaction.atomic():
+                    booking = self.model_class.objects.select_for_update(of=('self',)).select_related('hold_id').get(
+                        booking_id=booking_id,
+                        user_id=user
                     )
-                    return self.get_response()
-                
-                # Update booking status
-                booking.status = Booking.BOOKING_STATUS.CANCELLED
-                booking.cancelled_at = timezone.now()
-                booking.save()
-                
-                # Release inventory hold
-                if booking.hold_id:
+                    
+                    if booking.status != Booking.BOOKING_STATUS.PENDING:
+                        self.message = "Booking is not awaiting payment"
+                        self.error_occurred(e=None, custom_code=4131)
+                        return self.get_response()
+                    
+                    if booking.paid_at:
+                        self.message = "Payment already received for this booking"
+                        self.error_occurred(e=None, custom_code=4132)
+                        return self.get_response()
+                    
+                    now = timezone.now()
                     hold = booking.hold_id
-                    hold.status = InventoryHold.HOLD_STATUS.CANCELLED
-                    hold.save()
+                    if hold and (hold.status != InventoryHold.HOLD_STATUS.ACTIVE or hold.expires_at < now):
+                        release_booking_inventory(booking)
+                        booking.status = Booking.BOOKING_STATUS.EXPIRED
+                        booking.save(update_fields=['status'])
+                        transaction.on_commit(lambda: _invalidate_booking_caches(user.user_id, booking.events_id_id))
+                        self.message = "Booking hold has expired"
+                        self.error_occurred(e=None, custom_code=4133)
+                        return self.get_response()
+                    
+                    result = get_payment_gateway().verify(booking, payment_status, payment_reference)
                     
-                    # Release seats or inventory
-                    if hold.seats.exists():
-                        # Release reserved seats
-                        for hold_seat in hold.seats.all():
-                            seat = hold_seat.seat_id
-                            seat.status = Seat.SEAT_STATUS.AVAILABLE
-                            seat.save()
+                    if result.is_paid:
+                        booking.paid_at = now
+                        booking.payment_reference = result.reference
+                        booking.save(update_fields=['paid_at', 'payment_reference'])
+                        self.message = "Payment received. Your booking will be confirmed shortly."
                     else:
-                        # Release general admission inventory
-                        inventory = EventInventory.objects.get(
-                            event_id=hold.events_id,
-                            ticket_type_id=hold.ticket_type
-                        )
-                        inventory.held_qty = F('held_qty') - hold.quantity
-                        inventory.save()
+                        release_booking_inventory(booking)
+                        booking.status = Booking.BOOKING_STATUS.FAILED
+                        booking.payment_reference = result.reference
+                        booking.save(update_fields=['status', 'payment_reference'])
+                        transaction.on_commit(lambda: _invalidate_booking_caches(user.user_id, booking.events_id_id))
+                        self.message = result.failure_reason
+                        self.error_occurred(e=None, custom_code=4134)
+                    
+                    self.data = {
+                        'booking_id': str(booking.booking_id),
+                        'status': booking.status,
+                        'paid_at': booking.paid_at,
+                        'payment_reference': booking.payment_reference
+                    }
                 
-                # Create cancellation record
-                Cancellation.objects.create(
-                    booking_id=booking,
-                    reason="User requested cancellation"
-                )
+                invalidate_bookings_cache(user_id=user.user_id, event_id=booking.events_id_id)
                 
-                self.message = "Booking cancelled successfully"
+            else:
+                self.custom_code = 4135
+                self.serializer_errors(serializer.errors)
                 
         except self.model_class.DoesNotExist:
             self.message = "Booking not found"
-            self.error_occurred(e=None, custom_code=4123)
+            self.error_occurred(e=None, custom_code=4136)
         except Exception as e:
-            self.message = "Booking cancellation failed"
-            self.error_occurred(e, custom_code=4124)
+            self.message = "Failed to record payment"
+            self.error_occurred(e, custom_code=4137)
         
         return self.get_response()
@@ -0,0 +1,52 @@
+"""
+Async events list, served in place of EventView's list under ASGI
+(SERVE_ASGI). Same listing queries, cache entries and response body;
+creating and updating events stay on EventView.
+"""
+from EventX.utils import aget_total_count, apaginate_queryset, apaginate_queryset_by_cursor
+from EventX.cache_utils import async_cache_api_response
+from EventX.helper import AsyncBaseAPIClass
+from events.listing import get_listing_data, get_listing_rows
+from events.serializers import FetchEventsSerializer
+from events.views import EventView
+
+
+class AsyncEventListView(AsyncBaseAPIClass):
+    """EventView.list_events on the async ORM and Redis client"""
+    fetch_serializer = FetchEventsSerializer
+    sync_view_class = EventView  # POST and PATCH
+    use_replica = True
+
+    async def get(self, request):
+        return await self.list_events(request)
+
+    @async_cache_api_response('events_list', timeout=180)  # 3 minutes cache
+    async def list_events(self, request):
+        try:
+            serializer = self.fetch_serializer(data=request.GET)
+            if serializer.is_valid():
+                validated_data = serializer.validated_data
+                page = validated_data.get('page', 1)
+                rows_per_page = validated_data.get('rows_per_page', 10)
+                events_objs, ordering, selected = get_listing_rows(validated_data)
+
+                # Paginate the queryset
+                next_cursor = None
+                if validated_data['pagination'] == 'cursor':
+                    total_count = await aget_total_count(events_objs, validated_data.get('count') or 'none')
+                    events_objs, next_cursor = await apaginate_queryset_by_cursor(
+                        events_objs, ordering, validated_data.get('cursor'), rows_per_page
+                    )
+                else:
+                    events_objs, total_count = await apaginate_queryset(events_objs, page, rows_per_page)
+
+                self.message = "Events fetched successfully"
+                self.data = get_listing_data(events_objs, selected, page, rows_per_page, total_count, next_cursor)
+
+            else:
+                self.custom_code = 3101
+                self.serializer_errors(serializer.errors)
+        except Exception as e:
+            self.custom_code = 3102
+            self.error_occurred(e)
+        return self.get_response()
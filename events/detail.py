@@ -0,0 +1,103 @@
+"""
+Event detail: the event, its venue and the active ticket types with live
+availability, built in two queries and cached until the next write.
+"""
+from django.db.models import Count, F, IntegerField, OuterRef, Prefetch, Subquery
+from django.db.models.functions import Coalesce
+from EventX.cache_utils import get_cache_key, get_cached_data, set_cached_data
+from EventX.db_router import primary_reads
+from events.models import Events, TicketType
+from inventory.models import EventInventory, Seat
+
+EVENT_DETAIL_PREFIX = 'event_detail'
+EVENT_DETAIL_TIMEOUT = 300  # invalidated on every write, the timeout is only a safety net
+
+
+def get_event_detail_cache_key(event_id):
+    return get_cache_key(EVENT_DETAIL_PREFIX, event_id)
+
+
+def _ticket_types_with_availability():
+    """Active ticket types annotated with GA and reserved seating availability"""
+    inventory_available = EventInventory.objects.filter(
+        ticket_type_id=OuterRef('pk')
+    ).annotate(
+        available=F('initial_qty') - F('sold_qty') - F('held_qty')
+    ).values('available')[:1]
+
+    seats_available = Seat.objects.filter(
+        ticket_type_id=OuterRef('pk'),
+        status=Seat.SEAT_STATUS.AVAILABLE
+    ).order_by().values('ticket_type_id').annotate(available=Count('pk')).values('available')
+
+    return TicketType.objects.filter(is_active=True).annotate(
+        inventory_available=Coalesce(Subquery(inventory_available, output_field=IntegerField()), 0),
+        seats_available=Coalesce(Subquery(seats_available, output_field=IntegerField()), 0),
+    ).order_by('display_order', 'price')
+
+
+def build_event_detail(event_id):
+    """
+    Load the event detail from the database: one query for the event and its
+    venue, one for the ticket types with their availability subqueries.
+    Returns None if the event does not exist.
+    """
+    event = Events.objects.select_related('venue_id').prefetch_related(
+        Prefetch('ticket_types', queryset=_ticket_types_with_availability(), to_attr='active_ticket_types')
+    ).filter(events_id=event_id).first()
+    if event is None:
+        return None
+
+    is_reserved = event.seat_mode == Events.SEAT_MODE.RESERVED_SEATING
+    ticket_types = []
+    for ticket_type in event.active_ticket_types:
+        available_qty = ticket_type.seats_available if is_reserved else ticket_type.inventory_available
+        ticket_types.append({
+            'ticket_type_id': ticket_type.ticket_type_id,
+            'ticket_type_name': ticket_type.ticket_type_name,
+            'price': ticket_type.price,
+            'currency': ticket_type.currency,
+            'display_order': ticket_type.display_order,
+            'available_qty': available_qty,
+            'is_available': available_qty > 0,
+        })
+
+    venue = event.venue_id
+    return {
+        'event': {
+            'event_id': event.events_id,
+            'event_name': event.event_name,
+            'starts_at': event.starts_at,
+            'ends_at': event.ends_at,
+            'seat_mode': event.seat_mode,
+            'status': event.status,
+            'sales_starts_at': event.sales_starts_at,
+            'sales_ends_at': event.sales_ends_at,
+        },
+        'venue': {
+            'venue_id': venue.venue_id,
+            'name': venue.name,
+            'address': venue.address,
+            'city': venue.city,
+            'country': venue.country,
+            'capacity_hint': venue.capacity_hint,
+        },
+        'ticket_types': ticket_types,
+        'total_available': sum(ticket_type['available_qty'] for ticket_type in ticket_types),
+    }
+
+
+def get_event_detail(event_id):
+    """Event detail from the cache, falling back to the database"""
+    cache_key = get_event_detail_cache_key(event_id)
+    detail = get_cached_data(cache_key)
+    if detail:
+        return detail
+
+    # Cached until the next write, so a lagging replica must not fill it
+    with primary_reads():
+        detail = build_event_detail(event_id)
+    if detail is not None:
+        set_cached_data(cache_key, detail, EVENT_DETAIL_TIMEOUT)
+    return detail
+
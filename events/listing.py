@@ -0,0 +1,233 @@
+"""
+Maintenance of the event_listing read model.
+
+Every write that changes an event, its venue or its ticket types schedules
+a refresh of the affected listing rows. A refresh recomputes the rows of the
+given events with a handful of grouped queries and upserts them, so the
+events list and search never join inventory. The search vector is only
+rebuilt for rows whose event, venue or city name changed.
+
+Bookings, holds and releases only move capacity, so they schedule a delta
+instead: a single UPDATE of the event's available capacity and badge, with
+no inventory scan. rebuild_event_listing recomputes every row from scratch.
+
+The querysets and response body of the events list are built here too,
+shared by its sync and async views.
+"""
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Case, Count, ExpressionWrapper, F, FloatField, Q, Sum, Value, When
+from django.db.models.functions import Greatest
+from django.db.models.lookups import LessThanOrEqual
+from django.utils import timezone
+from events.models import EventListing, Events, TicketType
+from events.search import build_listing_search_vector, search_events
+from events.serializers import EVENT_LIST_PROJECTION
+from inventory.models import EventInventory, Seat
+
+# Columns rewritten by a refresh, everything but the primary key
+LISTING_FIELDS = [
+    'venue_id', 'venue_name', 'venue_city', 'event_name', 'starts_at', 'ends_at',
+    'seat_mode', 'status', 'sales_starts_at', 'sales_ends_at', 'min_price', 'currency',
+    'total_capacity', 'available_capacity', 'availability_status', 'updated_at',
+]
+
+
+def get_availability_status(total_capacity, available_capacity):
+    """Badge shown on the events list for the given capacity"""
+    if not total_capacity:
+        return EventListing.AVAILABILITY_STATUS.NO_INVENTORY
+    if available_capacity <= 0:
+        return EventListing.AVAILABILITY_STATUS.SOLD_OUT
+    if available_capacity <= total_capacity * settings.EVENT_LISTING_SELLING_FAST_RATIO:
+        return EventListing.AVAILABILITY_STATUS.SELLING_FAST
+    return EventListing.AVAILABILITY_STATUS.AVAILABLE
+
+
+def _get_availability_status_expression(available_capacity):
+    """get_availability_status as an SQL expression over a listing row"""
+    statuses = EventListing.AVAILABILITY_STATUS
+    selling_fast_below = ExpressionWrapper(
+        F('total_capacity') * settings.EVENT_LISTING_SELLING_FAST_RATIO,
+        output_field=FloatField()
+    )
+    return Case(
+        When(total_capacity=0, then=Value(statuses.NO_INVENTORY.value)),
+        When(LessThanOrEqual(available_capacity, 0), then=Value(statuses.SOLD_OUT.value)),
+        When(LessThanOrEqual(available_capacity, selling_fast_below), then=Value(statuses.SELLING_FAST.value)),
+        default=Value(statuses.AVAILABLE.value),
+    )
+
+
+def _get_min_prices(event_ids):
+    prices = {}
+    ticket_types = TicketType.objects.filter(
+        events_id__in=event_ids,
+        is_active=True
+    ).order_by('events_id', 'price').values_list('events_id', 'price', 'currency')
+
+    for event_id, price, currency in ticket_types:
+        prices.setdefault(event_id, (price, currency))
+    return prices
+
+
+def _get_capacities(event_ids):
+    """(total, available) per event for general admission and reserved seating"""
+    inventory = EventInventory.objects.filter(event_id__in=event_ids).values('event_id').annotate(
+        total=Sum('initial_qty'),
+        available=Sum(F('initial_qty') - F('sold_qty') - F('held_qty'))
+    ).values_list('event_id', 'total', 'available')
+
+    seats = Seat.objects.filter(event_id__in=event_ids).exclude(
+        status=Seat.SEAT_STATUS.BLOCKED
+    ).values('event_id').annotate(
+        total=Count('pk'),
+        available=Count('pk', filter=Q(status=Seat.SEAT_STATUS.AVAILABLE))
+    ).values_list('event_id', 'total', 'available')
+
+    general = {event_id: (total, available) for event_id, total, available in inventory}
+    reserved = {event_id: (total, available) for event_id, total, available in seats}
+    return general, reserved
+
+
+def refresh_event_listing(event_ids):
+    """Recompute and upsert the listing rows of the given events"""
+    event_ids = list(set(event_ids))
+    if not event_ids:
+        return
+
+    events = list(Events.objects.filter(events_id__in=event_ids).select_related('venue_id'))
+    prices = _get_min_prices(event_ids)
+    general, reserved = _get_capacities(event_ids)
+
+    listings = []
+    for event in events:
+        capacities = reserved if event.seat_mode == Events.SEAT_MODE.RESERVED_SEATING else general
+        total_capacity, available_capacity = capacities.get(event.events_id, (0, 0))
+        available_capacity = max(available_capacity, 0)
+        min_price, currency = prices.get(event.events_id, (None, ''))
+
+        listings.append(EventListing(
+            events_id=event,
+            venue_id=event.venue_id.venue_id,
+            venue_name=event.venue_id.name,
+            venue_city=event.venue_id.city,
+            event_name=event.event_name,
+            starts_at=event.starts_at,
+            ends_at=event.ends_at,
+            seat_mode=event.seat_mode,
+            status=event.status,
+            sales_starts_at=event.sales_starts_at,
+            sales_ends_at=event.sales_ends_at,
+            min_price=min_price,
+            currency=currency,
+            total_capacity=total_capacity,
+            available_capacity=available_capacity,
+            availability_status=get_availability_status(total_capacity, available_capacity),
+        ))
+
+    # Only new rows and renamed events, venues or cities need a new search vector
+    indexed = {
+        event_id: (event_name, venue_name, venue_city)
+        for event_id, event_name, venue_name, venue_city in EventListing.objects.filter(
+            events_id__in=event_ids,
+            search_vector__isnull=False
+        ).values_list('events_id', 'event_name', 'venue_name', 'venue_city')
+    }
+    reindex_ids = [
+        listing.events_id_id for listing in listings
+        if indexed.get(listing.events_id_id) != (listing.event_name, listing.venue_name, listing.venue_city)
+    ]
+
+    EventListing.objects.bulk_create(
+        listings,
+        update_conflicts=True,
+        unique_fields=['events_id'],
+        update_fields=LISTING_FIELDS
+    )
+
+    if reindex_ids and connection.vendor == 'postgresql':
+        EventListing.objects.filter(events_id__in=reindex_ids).update(search_vector=build_listing_search_vector())
+
+
+def apply_listing_delta(event_id, available_delta):
+    """
+    Move the available capacity of an event's listing row by available_delta
+    and update its badge, in one UPDATE of that row
+    """
+    if not available_delta:
+        return
+    available_capacity = Greatest(F('available_capacity') + available_delta, 0)
+    # Every SET expression reads the row as it was before the UPDATE
+    EventListing.objects.filter(events_id=event_id).update(
+        available_capacity=available_capacity,
+        availability_status=_get_availability_status_expression(available_capacity),
+        updated_at=timezone.now()
+    )
+
+
+def refresh_venue_listing(venue_id):
+    """Recompute the listing rows of every event at a venue"""
+    refresh_event_listing(Events.objects.filter(venue_id=venue_id).values_list('events_id', flat=True))
+
+
+def schedule_listing_refresh(*event_ids):
+    """
+    Refresh the listing rows of the given events once the current transaction
+    commits. A failed refresh only leaves the listing stale until the next
+    write or rebuild_event_listing, so it never fails the request.
+    """
+    def refresh():
+        try:
+            refresh_event_listing(event_ids)
+        except Exception as e:
+            print(f"Event listing refresh error: {e}")
+
+    transaction.on_commit(refresh)
+
+
+def schedule_listing_delta(event_id, available_delta):
+    """
+    Apply a capacity delta to the listing row once the current transaction
+    commits, so the row is not locked for the rest of a booking or hold
+    transaction. Like schedule_listing_refresh it never fails the request.
+    """
+    def apply():
+        try:
+            apply_listing_delta(event_id, available_delta)
+        except Exception as e:
+            print(f"Event listing delta error: {e}")
+
+    transaction.on_commit(apply)
+
+
+def get_listing_rows(validated_data):
+    """
+    Projected event_listing rows of the events list or search for validated
+    FetchEventsSerializer data, not yet paginated.
+    Returns (rows, keyset ordering, selected fields).
+    """
+    # The list and search read the denormalized listing only, never inventory
+    selected = EVENT_LIST_PROJECTION.parse(validated_data.get('fields'))
+    rows = EventListing.objects.order_by('starts_at')
+
+    search = validated_data.get('search', '')
+    if search:
+        rows = search_events(rows, search)
+
+    ordering = ('starts_at', 'pk')
+    if 'rank' in rows.query.annotations:
+        ordering = ('-rank',) + ordering
+    rows = EVENT_LIST_PROJECTION.values(rows, selected, *(field.lstrip('-') for field in ordering))
+    return rows, ordering, selected
+
+
+def get_listing_data(rows, selected, page, rows_per_page, total_count, next_cursor):
+    """Response body of a page of the events list"""
+    return {
+        "events": EVENT_LIST_PROJECTION.serialize(rows, selected),
+        "page": page,
+        "rows_per_page": rows_per_page,
+        "total_count": total_count,
+        "next_cursor": next_cursor
+    }
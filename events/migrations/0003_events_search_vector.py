@@ -0,0 +1,41 @@
+# Generated by Django 5.2.6 on 2026-10-19 10:26
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    Events = apps.get_model('events', 'Events')
+    Venue = apps.get_model('events', 'Venue')
+    venue = Venue.objects.filter(venue_id=OuterRef('venue_id'))
+    Events.objects.update(search_vector=(
+        SearchVector('event_name', weight='A', config='simple')
+        + SearchVector(Subquery(venue.values('name')[:1]), weight='B', config='simple')
+        + SearchVector(Subquery(venue.values('city')[:1]), weight='B', config='simple')
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0002_events_updated_at_tickettype_created_at_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='events',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='events',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='events_search_vector_idx'),
+        ),
+        migrations.RunPython(backfill_search_vector, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,128 @@
+# Generated by Django 5.2.6 on 2026-10-19 10:34
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+import django.db.models.deletion
+import django_enumfield.db.fields
+import events.models
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations, models
+from django.db.models import Count, F, Q, Sum
+
+
+def backfill_event_listing(apps, schema_editor):
+    Events = apps.get_model('events', 'Events')
+    TicketType = apps.get_model('events', 'TicketType')
+    EventListing = apps.get_model('events', 'EventListing')
+    EventInventory = apps.get_model('inventory', 'EventInventory')
+    Seat = apps.get_model('inventory', 'Seat')
+
+    prices = {}
+    for event_id, price, currency in TicketType.objects.filter(is_active=True).order_by(
+        'events_id', 'price'
+    ).values_list('events_id', 'price', 'currency'):
+        prices.setdefault(event_id, (price, currency))
+
+    general = {
+        event_id: (total, available) for event_id, total, available in
+        EventInventory.objects.values('event_id').annotate(
+            total=Sum('initial_qty'),
+            available=Sum(F('initial_qty') - F('sold_qty') - F('held_qty'))
+        ).values_list('event_id', 'total', 'available')
+    }
+    # Seat statuses: 1 available, 4 blocked
+    reserved = {
+        event_id: (total, available) for event_id, total, available in
+        Seat.objects.exclude(status=4).values('event_id').annotate(
+            total=Count('pk'),
+            available=Count('pk', filter=Q(status=1))
+        ).values_list('event_id', 'total', 'available')
+    }
+
+    listings = []
+    for event in Events.objects.select_related('venue_id').iterator(chunk_size=2000):
+        capacities = reserved if event.seat_mode == 2 else general
+        total, available = capacities.get(event.events_id, (0, 0))
+        available = max(available, 0)
+        if not total:
+            availability_status = 4
+        elif available == 0:
+            availability_status = 3
+        elif available <= total * 0.1:
+            availability_status = 2
+        else:
+            availability_status = 1
+        min_price, currency = prices.get(event.events_id, (None, ''))
+        listings.append(EventListing(
+            events_id=event, venue_id=event.venue_id.venue_id, venue_name=event.venue_id.name,
+            venue_city=event.venue_id.city, event_name=event.event_name, starts_at=event.starts_at,
+            ends_at=event.ends_at, seat_mode=event.seat_mode, status=event.status,
+            sales_starts_at=event.sales_starts_at, sales_ends_at=event.sales_ends_at,
+            min_price=min_price, currency=currency, total_capacity=total,
+            available_capacity=available, availability_status=availability_status,
+        ))
+        if len(listings) == 2000:
+            EventListing.objects.bulk_create(listings)
+            listings = []
+    EventListing.objects.bulk_create(listings)
+
+    if schema_editor.connection.vendor == 'postgresql':
+        EventListing.objects.update(search_vector=(
+            SearchVector('event_name', weight='A', config='simple')
+            + SearchVector('venue_name', weight='B', config='simple')
+            + SearchVector('venue_city', weight='B', config='simple')
+        ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0003_events_search_vector'),
+        ('inventory', '0002_alter_inventoryhold_request_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventListing',
+            fields=[
+                ('events_id', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='listing', serialize=False, to='events.events')),
+                ('venue_id', models.UUIDField()),
+                ('venue_name', models.CharField(max_length=255)),
+                ('venue_city', models.CharField(blank=True, max_length=100)),
+                ('event_name', models.CharField(max_length=255)),
+                ('starts_at', models.DateTimeField()),
+                ('ends_at', models.DateTimeField()),
+                ('seat_mode', django_enumfield.db.fields.EnumField(default=1, enum=events.models.Events.SEAT_MODE)),
+                ('status', django_enumfield.db.fields.EnumField(default=2, enum=events.models.Events.EVENT_STATUS)),
+                ('sales_starts_at', models.DateTimeField(blank=True, null=True)),
+                ('sales_ends_at', models.DateTimeField(blank=True, null=True)),
+                ('min_price', models.PositiveIntegerField(blank=True, null=True)),
+                ('currency', models.CharField(blank=True, max_length=5)),
+                ('total_capacity', models.PositiveIntegerField(default=0)),
+                ('available_capacity', models.PositiveIntegerField(default=0)),
+                ('availability_status', django_enumfield.db.fields.EnumField(default=4, enum=events.models.EventListing.AVAILABILITY_STATUS)),
+                ('search_vector', django.contrib.postgres.search.SearchVectorField(editable=False, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'event_listing',
+            },
+        ),
+        migrations.RemoveIndex(
+            model_name='events',
+            name='events_search_vector_idx',
+        ),
+        migrations.RemoveField(
+            model_name='events',
+            name='search_vector',
+        ),
+        migrations.AddIndex(
+            model_name='eventlisting',
+            index=models.Index(fields=['starts_at', 'events_id'], name='event_listing_starts_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='eventlisting',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='event_listing_search_idx'),
+        ),
+        migrations.RunPython(backfill_event_listing, migrations.RunPython.noop),
+    ]
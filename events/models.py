@@ -1,5 +1,7 @@
 from uuid import uuid4
 from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django_enumfield import enum
 
 class Venue(models.Model):
@@ -66,3 +68,46 @@ class TicketType(models.Model):
 
     def __str__(self):
         return f"{self.ticket_type_name} - {self.events_id.event_name}"
+
+
+class EventListing(models.Model):
+    """
+    Denormalized read model behind the events list and search.
+    One row per event, kept up to date by events.listing on every event,
+    venue, inventory and booking write.
+    """
+
+    class AVAILABILITY_STATUS(enum.Enum):
+        AVAILABLE = 1
+        SELLING_FAST = 2
+        SOLD_OUT = 3
+        NO_INVENTORY = 4
+
+    events_id = models.OneToOneField(Events, on_delete=models.CASCADE, primary_key=True, related_name="listing")
+    venue_id = models.UUIDField()
+    venue_name = models.CharField(max_length=255)
+    venue_city = models.CharField(max_length=100, blank=True)
+    event_name = models.CharField(max_length=255)
+    starts_at = models.DateTimeField()
+    ends_at = models.DateTimeField()
+    seat_mode = enum.EnumField(Events.SEAT_MODE, default=Events.SEAT_MODE.GENERAL_ADMISSION)
+    status = enum.EnumField(Events.EVENT_STATUS, default=Events.EVENT_STATUS.PUBLISHED)
+    sales_starts_at = models.DateTimeField(null=True, blank=True)
+    sales_ends_at = models.DateTimeField(null=True, blank=True)
+    min_price = models.PositiveIntegerField(null=True, blank=True)
+    currency = models.CharField(max_length=5, blank=True)
+    total_capacity = models.PositiveIntegerField(default=0)
+    available_capacity = models.PositiveIntegerField(default=0)
+    availability_status = enum.EnumField(AVAILABILITY_STATUS, default=AVAILABILITY_STATUS.NO_INVENTORY)
+    search_vector = SearchVectorField(null=True, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "event_listing"
+        indexes = [
+            models.Index(fields=['starts_at', 'events_id'], name='event_listing_starts_at_idx'),
+            GinIndex(fields=['search_vector'], name='event_listing_search_idx'),
+        ]
+
+    def __str__(self):
+        return f"Listing of {self.event_name}"
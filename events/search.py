@@ -0,0 +1,54 @@
+"""
+Full-text search over the event listing.
+
+Listing rows carry a tsvector built from the event name (weight A) and the
+venue name and city (weight B), indexed with GIN and ranked with ts_rank.
+"""
+import re
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connection
+from django.db.models import F, FloatField, Q
+from django.db.models.functions import Cast
+
+# Event, venue and city names are not prose, so skip stemming and stop words
+SEARCH_CONFIG = 'simple'
+
+
+def build_listing_search_vector():
+    """Expression computing the search vector of an event_listing row"""
+    return (
+        SearchVector('event_name', weight='A', config=SEARCH_CONFIG)
+        + SearchVector('venue_name', weight='B', config=SEARCH_CONFIG)
+        + SearchVector('venue_city', weight='B', config=SEARCH_CONFIG)
+    )
+
+
+def build_prefix_query(search):
+    """
+    Turn free text into a tsquery matching every word as a prefix,
+    e.g. "cold pla" -> "cold:* & pla:*"
+    """
+    words = re.findall(r'\w+', search.lower())
+    if not words:
+        return None
+    return SearchQuery(' & '.join(f'{word}:*' for word in words), search_type='raw', config=SEARCH_CONFIG)
+
+
+def search_events(queryset, search):
+    """Filter an event listing queryset by search text, best matches first"""
+    if connection.vendor != 'postgresql':
+        return queryset.filter(
+            Q(event_name__icontains=search)
+            | Q(venue_city__icontains=search)
+            | Q(venue_name__icontains=search)
+        )
+
+    query = build_prefix_query(search)
+    if query is None:
+        return queryset.none()
+
+    # ts_rank returns real; as double precision the value round-trips exactly
+    # through a pagination cursor and seeking on it stays stable
+    return queryset.filter(search_vector=query).annotate(
+        rank=Cast(SearchRank(F('search_vector'), query), FloatField())
+    ).order_by('-rank', 'starts_at')
@@ -1,7 +1,30 @@
 from rest_framework import serializers
 
-from EventX.utils import validate_enum_str
-from events.models import Events
+from EventX.projection_utils import Projection, validate_fields_param
+from EventX.utils import decode_cursor, validate_enum_str
+from events.models import EventListing, Events
+
+
+# Public fields of the events list, all read from the event_listing table
+EVENT_LIST_PROJECTION = Projection({
+    'venue_id': 'venue_id',
+    'event_name': 'event_name',
+    'starts_at': 'starts_at',
+    'ends_at': 'ends_at',
+    'seat_mode': 'seat_mode',
+    'status': 'status',
+    'sales_starts_at': 'sales_starts_at',
+    'sales_ends_at': 'sales_ends_at',
+    'event_id': 'events_id',
+    'venue.name': 'venue_name',
+    'venue.city': 'venue_city',
+    'min_price': 'min_price',
+    'currency': 'currency',
+    'total_capacity': 'total_capacity',
+    'available_capacity': 'available_capacity',
+    'availability_status': 'availability_status',
+    'availability_status_display': ('availability_status', EventListing.AVAILABILITY_STATUS.label),
+}, required=('pk', 'starts_at'))
 
 
 class SearchBaseSerializer(serializers.Serializer):
@@ -10,9 +33,22 @@ class SearchBaseSerializer(serializers.Serializer):
 class PaginationBaseSerializer(SearchBaseSerializer):
     page = serializers.IntegerField(min_value=1, default=1)
     rows_per_page = serializers.IntegerField(default=10, min_value=10)
+    pagination = serializers.ChoiceField(choices=['page', 'cursor'], default='page')
+    cursor = serializers.CharField(max_length=500, required=False)
+    count = serializers.ChoiceField(choices=['exact', 'estimated', 'none'], required=False)
+
+    def validate_cursor(self, value):
+        try:
+            decode_cursor(value)
+        except ValueError as e:
+            raise serializers.ValidationError(str(e))
+        return value
 
 class FetchEventsSerializer(PaginationBaseSerializer):
-    pass
+    fields = serializers.CharField(max_length=500, required=False)
+
+    def validate_fields(self, value):
+        return validate_fields_param(EVENT_LIST_PROJECTION, value)
 
 class PostEventBaseSerializer(serializers.Serializer):
     event_name = serializers.CharField(max_length=255)
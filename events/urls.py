@@ -1,9 +1,11 @@
+from django.conf import settings
 from django.urls import path
+from events.async_views import AsyncEventListView
 from events.views import EventView, VenueView
 
 urlpatterns = [
-    # Unified event endpoints
-    path('', EventView.as_view(), name='event-list'),
+    # Unified event endpoints, the list is async under ASGI
+    path('', (AsyncEventListView if settings.SERVE_ASGI else EventView).as_view(), name='event-list'),
     path('<uuid:event_id>/', EventView.as_view(), name='event-detail'),
     path('venue/', VenueView.as_view(), name='venue-list'),
 ]
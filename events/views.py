@@ -1,12 +1,13 @@
 
-from django.forms import model_to_dict
-from EventX.utils import paginate_queryset
+from django.utils import timezone
+from EventX.utils import get_total_count, paginate_queryset, paginate_queryset_by_cursor
 from EventX.cache_utils import cache_api_response, invalidate_events_cache
 from events.models import Events, Venue
 from EventX.helper import BaseAPIClass
 from events.serializers import FetchEventsSerializer, PatchVenueSerializer, PostEventSerializer, PatchEventSerializer, PostVenueSerializer
+from events.detail import get_event_detail
+from events.listing import get_listing_data, get_listing_rows, refresh_venue_listing, schedule_listing_refresh
 from accounts.models import User
-from django.db.models import Q
 
 
 class EventView(BaseAPIClass):
@@ -14,49 +15,38 @@ class EventView(BaseAPIClass):
     fetch_serializer = FetchEventsSerializer
     post_serializer = PostEventSerializer
     patch_serializer = PatchEventSerializer
+    use_replica = True  # GET reads go to the read replica, see EventX/db_router.py
 
     def get_event_by_id(self, event_id):
         return self.model_class.objects.get(events_id=event_id)
 
+    def get(self, request, event_id=None):
+        if event_id:
+            return self.get_event_detail(request, event_id)
+        return self.list_events(request)
+
     @cache_api_response('events_list', timeout=180)  # 3 minutes cache
-    def get(self, request):
+    def list_events(self, request):
         try:
             serializer = self.fetch_serializer(data=request.query_params)
             if serializer.is_valid():
-                search = serializer.validated_data.get('search', '')
-                page = serializer.validated_data.get('page', 1)
-                rows_per_page = serializer.validated_data.get('rows_per_page', 10)
-
-                cond = Q()
-
-                if search:
-                    cond |= Q(event_name__icontains=search)
-                    cond |= Q(venue__city__icontains=search)
-                    cond |= Q(venue__name__icontains=search)
+                validated_data = serializer.validated_data
+                page = validated_data.get('page', 1)
+                rows_per_page = validated_data.get('rows_per_page', 10)
+                events_objs, ordering, selected = get_listing_rows(validated_data)
 
-                # Build query with select_related
-                events_objs = self.model_class.objects.filter(cond).select_related('venue_id')
-               
                 # Paginate the queryset
-                events_objs, total_count = paginate_queryset(events_objs, page, rows_per_page)
-                
-                # Convert model instances to dictionaries for JSON serialization
-                events_data = []
-                for event in events_objs:
-                    event_dict["event_id"] = event.events_id
-                    event_dict = model_to_dict(event)
-                    # Add related venue data
-                    if event.venue_id:
-                        event_dict['venue'] = model_to_dict(event.venue_id)
-                    events_data.append(event_dict)
-                
+                next_cursor = None
+                if validated_data['pagination'] == 'cursor':
+                    total_count = get_total_count(events_objs, validated_data.get('count') or 'none')
+                    events_objs, next_cursor = paginate_queryset_by_cursor(
+                        events_objs, ordering, validated_data.get('cursor'), rows_per_page
+                    )
+                else:
+                    events_objs, total_count = paginate_queryset(events_objs, page, rows_per_page)
+
                 self.message = "Events fetched successfully"
-                self.data = {
-                    "events": events_data,
-                    "page": page,
-                    "rows_per_page": rows_per_page,
-                    "total_count": total_count
-                }
+                self.data = get_listing_data(events_objs, selected, page, rows_per_page, total_count, next_cursor)
 
             else:
                 self.custom_code = 3101
@@ -66,6 +56,34 @@ class EventView(BaseAPIClass):
             self.error_occurred(e)
         return self.get_response()
 
+    def get_event_detail(self, request, event_id):
+        """
+        Event, venue and active ticket types with live availability.
+        Served from a cache that every event, inventory and booking write invalidates.
+        """
+        try:
+            user = request.validated_user
+            detail = get_event_detail(event_id)
+            
+            if detail is None:
+                self.message = "Event not found"
+                self.error_occurred(e=None, custom_code=3151)
+                return self.get_response()
+            
+            # Only admins can see events that are not published
+            is_admin = user and user.user_type == User.USER_TYPE.ADMIN
+            if not is_admin and detail['event']['status'] != Events.EVENT_STATUS.PUBLISHED:
+                self.message = "Event not found"
+                self.error_occurred(e=None, custom_code=3152)
+                return self.get_response()
+            
+            self.data = detail
+            self.message = "Event fetched successfully"
+        except Exception as e:
+            self.custom_code = 3153
+            self.error_occurred(e)
+        return self.get_response()
+
     def post(self, request):
         try:
             # Get validated user from middleware
@@ -115,7 +133,8 @@ class EventView(BaseAPIClass):
                     sales_ends_at=sales_ends_at
                 )
                 
-                # Invalidate events cache
+                # Keep the event listing and events cache in sync
+                schedule_listing_refresh(event.events_id)
                 invalidate_events_cache(event_id=event.events_id, venue_id=venue.venue_id)
                 
                 self.data = {
@@ -151,16 +170,15 @@ class EventView(BaseAPIClass):
                     self.error_occurred(e=None, custom_code=3104)
                     return self.get_response()
                 
-                event_id = serializer.validated_data['event_id']
+                event_id = serializer.validated_data.pop('event_id')
                 
-                # get the event
-                event = self.get_event_by_id(event_id)
-
                 # update the event
-                event.update(**serializer.validated_data)
+                self.model_class.objects.filter(events_id=event_id).update(updated_at=timezone.now(), **serializer.validated_data)
+                event = self.get_event_by_id(event_id)
                 
-                # Invalidate events cache
-                invalidate_events_cache(event_id=event.events_id, venue_id=event.venue_id.venue_id)
+                # Keep the event listing and events cache in sync
+                schedule_listing_refresh(event.events_id)
+                invalidate_events_cache(event_id=event.events_id, venue_id=event.venue_id_id)
                 
                 self.data = {
                     "event_id": str(event.events_id),
@@ -245,9 +263,13 @@ class VenueView(BaseAPIClass):
             user = request.validated_user
             serializer = self.patch_serializer(data=request.data)
             if serializer.is_valid():
-                venue_id = serializer.validated_data['venue_id']
+                venue_id = serializer.validated_data.pop('venue_id')
+                self.model_class.objects.filter(venue_id=venue_id).update(updated_at=timezone.now(), **serializer.validated_data)
                 venue = self.get_venue_by_id(venue_id)
-                venue.update(**serializer.validated_data)
+                
+                # Venue name and city are denormalized into every listing row at the venue
+                refresh_venue_listing(venue_id)
+                invalidate_events_cache(venue_id=venue_id)
                 
                 self.data = {
                     "venue_id": str(venue.venue_id),
@@ -1,15 +1,20 @@
 import multiprocessing
 import os
 
+# SERVE_ASGI=true serves EventX.asgi with uvicorn workers, which keep slow
+# clients and Redis/DB waits off the worker threads, see EventX/settings.py
+serve_asgi = os.getenv('SERVE_ASGI', 'False').lower() == 'true'
+wsgi_app = "EventX.asgi:application" if serve_asgi else "EventX.wsgi:application"
+
 # Server socket
 bind = "0.0.0.0:8000"
 backlog = 2048
 
 # Worker processes
 workers = multiprocessing.cpu_count() * 2 + 1
-worker_class = "gthread"
+worker_class = "uvicorn_worker.UvicornWorker" if serve_asgi else "gthread"
 worker_connections = 1000
-threads = 2
+threads = 2  # gthread only
 max_requests = 1000
 max_requests_jitter = 50
 
@@ -26,6 +31,14 @@ access_log_format = '%(h)s %(l)s %(u)s %(t)s "%(r)s" %(s)s %(b)s "%(f)s" "%(a)s"
 # Process naming
 proc_name = "eventx_gunicorn"
 
+# Server hooks
+def when_ready(server):
+    # The app is preloaded, so the Django settings are available here
+    from EventX.db_pool import check_connection_budget
+    warning = check_connection_budget(server.cfg.workers, server.cfg.threads, asgi=serve_asgi)
+    if warning:
+        server.log.warning(warning)
+
 # Server mechanics
 preload_app = True
 daemon = False
@@ -0,0 +1,90 @@
+"""
+Async availability view, served in place of EventAvailabilityView under
+ASGI (SERVE_ASGI). Same queries, cache entries and response body.
+"""
+from EventX.helper import AsyncBaseAPIClass
+from EventX.cache_utils import async_cache_api_response
+from analytics.counters import UNIQUE_VIEWERS, aadd_unique_user
+from inventory.availability import (
+    get_active_holds,
+    get_availability_data,
+    get_available_seats,
+    get_event_inventories,
+    group_available_seats,
+)
+from inventory.serializers import EventAvailabilitySerializer, SeatAvailabilityQuerySerializer, SEAT_AVAILABILITY_PROJECTION
+from events.models import Events
+from accounts.models import User
+
+
+class AsyncEventAvailabilityView(AsyncBaseAPIClass):
+    """EventAvailabilityView on the async ORM and Redis client"""
+    use_replica = True
+
+    async def get(self, request, event_id):
+        """
+        Get availability information for an event, counting the viewer
+        whether or not the response comes from the cache
+        """
+        response = await self.get_availability(request, event_id)
+        user = request.validated_user
+        if user and response.data.get('success'):
+            await aadd_unique_user(UNIQUE_VIEWERS, event_id, user.user_id)
+        return response
+
+    @async_cache_api_response('event_availability', timeout=30)  # 30 seconds cache
+    async def get_availability(self, request, event_id):
+        """
+        Get availability information for an event
+        """
+        try:
+            user = request.validated_user
+            is_admin = user and user.user_type == User.USER_TYPE.ADMIN
+            
+            serializer = SeatAvailabilityQuerySerializer(data=request.GET)
+            if not serializer.is_valid():
+                self.message = "Invalid query parameters"
+                self.serializer_errors(serializer.errors)
+                return self.get_response()
+            selected = SEAT_AVAILABILITY_PROJECTION.parse(serializer.validated_data.get('fields'))
+            
+            # Get event
+            try:
+                event = await Events.objects.select_related('venue_id').aget(events_id=event_id)
+            except Events.DoesNotExist:
+                self.message = "Event not found"
+                self.error_occurred(e=None, custom_code=7001)
+                return self.get_response()
+            
+            # Check if event is published (only for non-admin users)
+            if not is_admin and event.status != Events.EVENT_STATUS.PUBLISHED:
+                self.message = "Event is not available for booking"
+                self.error_occurred(e=None, custom_code=7002)
+                return self.get_response()
+            
+            # Get availability data
+            if event.seat_mode == Events.SEAT_MODE.GENERAL_ADMISSION:
+                inventories = [inventory async for inventory in get_event_inventories(event_id)]
+                ticket_types = EventAvailabilitySerializer(inventories, many=True).data
+                total_available = sum(item['available_qty'] for item in ticket_types)
+            else:
+                seats = [seat async for seat in get_available_seats(event_id, selected)]
+                ticket_types, total_available = group_available_seats(seats, selected)
+            
+            response_data = get_availability_data(event, total_available, ticket_types)
+            
+            # Add admin-specific data if user is admin
+            if is_admin:
+                response_data['admin_data'] = {
+                    'status': event.status,
+                    'total_holds': await get_active_holds(event_id).acount()
+                }
+            
+            self.data = response_data
+            self.message = "Event availability retrieved successfully"
+            
+        except Exception as e:
+            self.message = "Failed to retrieve event availability"
+            self.error_occurred(e, custom_code=7003)
+        
+        return self.get_response()
@@ -0,0 +1,174 @@
+"""
+Per-event availability summaries for many events at once.
+
+Summaries are cached per event and read with a single multi-get, so a warm
+request for 20 events costs one Redis round-trip. Misses are computed
+together from one grouped aggregate over EventInventory and one over Seat.
+
+The querysets and response body of the single event availability are
+built here too, shared by its sync and async views.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, F, Q
+from EventX.cache_utils import get_cache_key
+from events.models import Events
+from inventory.models import EventInventory, InventoryHold, Seat
+from inventory.serializers import SEAT_AVAILABILITY_PROJECTION
+
+AVAILABILITY_SUMMARY_PREFIX = 'availability_summary'
+AVAILABILITY_SUMMARY_TIMEOUT = 30  # matches EventAvailabilityView, writes also invalidate it
+
+
+def get_availability_summary_cache_key(event_id):
+    return get_cache_key(AVAILABILITY_SUMMARY_PREFIX, event_id)
+
+
+def build_availability_summaries(event_ids):
+    """
+    Compute the availability summaries of the given events in three queries:
+    the events, the GA inventory rows and the grouped seat counts.
+    Returns {event_id (str): summary}; unknown events are left out.
+    """
+    summaries = {}
+    for event_id, seat_mode, status in Events.objects.filter(
+        events_id__in=event_ids
+    ).values_list('events_id', 'seat_mode', 'status'):
+        summaries[str(event_id)] = {
+            'event_id': str(event_id),
+            'seat_mode': seat_mode,
+            'status': status,
+            'total_available': 0,
+            'ticket_types': [],
+        }
+
+    inventories = EventInventory.objects.filter(
+        event_id__in=event_ids,
+        event_id__seat_mode=Events.SEAT_MODE.GENERAL_ADMISSION
+    ).values_list(
+        'event_id', 'ticket_type_id', 'ticket_type_id__ticket_type_name', 'ticket_type_id__price'
+    ).annotate(
+        available=F('initial_qty') - F('sold_qty') - F('held_qty')
+    ).order_by('event_id', 'ticket_type_id__display_order')
+
+    seats = Seat.objects.filter(
+        event_id__in=event_ids,
+        event_id__seat_mode=Events.SEAT_MODE.RESERVED_SEATING,
+        ticket_type_id__isnull=False
+    ).values(
+        'event_id', 'ticket_type_id', 'ticket_type_id__ticket_type_name', 'ticket_type_id__price',
+        'ticket_type_id__display_order'
+    ).annotate(
+        available=Count('pk', filter=Q(status=Seat.SEAT_STATUS.AVAILABLE))
+    ).values_list(
+        'event_id', 'ticket_type_id', 'ticket_type_id__ticket_type_name', 'ticket_type_id__price', 'available'
+    ).order_by('event_id', 'ticket_type_id__display_order')
+
+    for rows in (inventories, seats):
+        for event_id, ticket_type_id, ticket_type_name, price, available in rows:
+            summary = summaries[str(event_id)]
+            available = max(available, 0)
+            summary['ticket_types'].append({
+                'ticket_type_id': str(ticket_type_id),
+                'ticket_type_name': ticket_type_name,
+                'ticket_type_price': price,
+                'available_qty': available,
+            })
+            summary['total_available'] += available
+
+    return summaries
+
+
+def get_availability_summaries(event_ids):
+    """
+    Availability summaries of the given events, from the cache where possible.
+    Returns {event_id (str): summary}; unknown events are left out.
+    """
+    keys = {get_availability_summary_cache_key(event_id): str(event_id) for event_id in event_ids}
+    try:
+        cached = cache.get_many(list(keys))
+    except Exception as e:
+        print(f"Cache read error: {e}")
+        cached = {}
+    print(f"[Availability] {len(cached)}/{len(keys)} cached")
+
+    summaries = {keys[key]: summary for key, summary in cached.items()}
+    missing = [event_id for key, event_id in keys.items() if key not in cached]
+    if missing:
+        built = build_availability_summaries(missing)
+        summaries.update(built)
+        if built and getattr(settings, 'ENABLE_CACHING', True):
+            try:
+                cache.set_many(
+                    {get_availability_summary_cache_key(event_id): summary for event_id, summary in built.items()},
+                    AVAILABILITY_SUMMARY_TIMEOUT
+                )
+            except Exception as e:
+                print(f"Cache write error: {e}")
+
+    return summaries
+
+
+def get_event_inventories(event_id):
+    """GA inventory of an event with its ticket types"""
+    return EventInventory.objects.filter(
+        event_id=event_id
+    ).select_related('ticket_type_id')
+
+
+def get_available_seats(event_id, selected):
+    """Available seats of an event as plain rows, only the requested columns"""
+    return SEAT_AVAILABILITY_PROJECTION.values(
+        Seat.objects.filter(event_id=event_id, status=Seat.SEAT_STATUS.AVAILABLE),
+        selected
+    ).order_by('section', 'row_label', 'seat_number')
+
+
+def get_active_holds(event_id):
+    return InventoryHold.objects.filter(
+        events_id=event_id,
+        status=InventoryHold.HOLD_STATUS.ACTIVE
+    )
+
+
+def group_available_seats(seats, selected):
+    """Group available seat rows by ticket type. Returns (ticket types, total available)."""
+    total_available = 0
+    
+    # Group by ticket type
+    ticket_types = {}
+    for seat in seats:
+        ticket_type_id = seat['ticket_type_id']
+        if ticket_type_id not in ticket_types:
+            ticket_types[ticket_type_id] = {
+                'ticket_type_id': ticket_type_id,
+                'ticket_type_name': seat['ticket_type_id__ticket_type_name'],
+                'ticket_type_price': seat['ticket_type_id__price'],
+                'available_seats': 0,
+                'seats': []
+            }
+        ticket_types[ticket_type_id]['available_seats'] += 1
+        ticket_types[ticket_type_id]['seats'].append(seat)
+        total_available += 1
+    
+    for ticket_type in ticket_types.values():
+        ticket_type['seats'] = SEAT_AVAILABILITY_PROJECTION.serialize(ticket_type['seats'], selected)
+    
+    return list(ticket_types.values()), total_available
+
+
+def get_availability_data(event, total_available, ticket_types):
+    """Response body of the availability of one event"""
+    return {
+        'event': {
+            'event_id': str(event.events_id),
+            'event_name': event.event_name,
+            'event_date': event.starts_at,
+            'venue_name': event.venue_id.name,
+            'seat_mode': event.seat_mode
+        },
+        'availability': {
+            'total_available': total_available,
+            'ticket_types': ticket_types
+        }
+    }
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.6 on 2026-10-19 10:55
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction, and does not lock writes
+    atomic = False
+
+    dependencies = [
+        ('inventory', '0002_alter_inventoryhold_request_id'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='inventoryhold',
+            index=models.Index(condition=models.Q(('status', 1)), fields=['events_id'], name='hold_event_active_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='inventoryhold',
+            index=models.Index(condition=models.Q(('status', 1)), fields=['expires_at'], name='hold_active_expires_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='seat',
+            index=models.Index(condition=models.Q(('status', 1)), fields=['event_id', 'section', 'row_label', 'seat_number'], name='seat_event_available_idx'),
+        ),
+    ]
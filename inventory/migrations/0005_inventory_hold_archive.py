@@ -0,0 +1,28 @@
+from django.db import migrations
+
+# Same columns as the hot tables, without foreign keys, filled by bookings.archive
+CREATE_ARCHIVE_TABLES = """
+    CREATE TABLE inventory_hold_archive (LIKE inventory_hold INCLUDING DEFAULTS INCLUDING CONSTRAINTS);
+    ALTER TABLE inventory_hold_archive ADD PRIMARY KEY (inventory_hold_id);
+    CREATE INDEX inventory_hold_archive_event_idx ON inventory_hold_archive (events_id_id);
+
+    CREATE TABLE inventory_hold_seat_archive (LIKE inventory_hold_seat INCLUDING DEFAULTS INCLUDING CONSTRAINTS);
+    ALTER TABLE inventory_hold_seat_archive ADD PRIMARY KEY (inventory_hold_seat_id);
+    CREATE INDEX inventory_hold_seat_archive_hold_idx ON inventory_hold_seat_archive (hold_id_id);
+"""
+
+DROP_ARCHIVE_TABLES = """
+    DROP TABLE inventory_hold_seat_archive;
+    DROP TABLE inventory_hold_archive;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0004_uuid7_primary_keys'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_ARCHIVE_TABLES, DROP_ARCHIVE_TABLES),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.6 on 2026-10-19 11:10
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction, and does not lock writes
+    atomic = False
+
+    dependencies = [
+        ('inventory', '0005_inventory_hold_archive'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='inventoryhold',
+            index=models.Index(fields=['created_at'], name='hold_created_idx'),
+        ),
+    ]
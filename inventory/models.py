@@ -3,6 +3,7 @@ from django.db import models
 from events.models import Events, TicketType
 from accounts.models import User
 from django_enumfield import enum
+from EventX.ids import uuid7
 
 
 class EventInventory(models.Model):
@@ -38,6 +39,14 @@ class Seat(models.Model):
     class Meta:
         db_table = "seat"
         unique_together = ("event_id", "section", "row_label", "seat_number")
+        indexes = [
+            # Available seats of an event in seat map order, status 1 is SEAT_STATUS.AVAILABLE
+            models.Index(
+                fields=['event_id', 'section', 'row_label', 'seat_number'],
+                name='seat_event_available_idx',
+                condition=models.Q(status=1)
+            ),
+        ]
 
 
 class InventoryHold(models.Model):
@@ -48,7 +57,7 @@ class InventoryHold(models.Model):
         EXPIRED = 3
         CANCELLED = 4
 
-    inventory_hold_id = models.UUIDField(primary_key=True, default=uuid4, editable=False)
+    inventory_hold_id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     events_id = models.ForeignKey(Events, on_delete=models.CASCADE, related_name="holds")
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="holds")
     ticket_type = models.ForeignKey(TicketType, on_delete=models.SET_NULL, null=True, blank=True)
@@ -60,10 +69,17 @@ class InventoryHold(models.Model):
 
     class Meta:
         db_table = "inventory_hold"
+        indexes = [
+            # Only active holds are counted and expired, status 1 is HOLD_STATUS.ACTIVE
+            models.Index(fields=['events_id'], name='hold_event_active_idx', condition=models.Q(status=1)),
+            models.Index(fields=['expires_at'], name='hold_active_expires_idx', condition=models.Q(status=1)),
+            # New holds since the funnel watermark
+            models.Index(fields=['created_at'], name='hold_created_idx'),
+        ]
 
 
 class InventoryHoldSeat(models.Model):
-    inventory_hold_seat_id = models.UUIDField(primary_key=True, default=uuid4, editable=False)
+    inventory_hold_seat_id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     hold_id = models.ForeignKey(InventoryHold, on_delete=models.CASCADE, related_name="seats")
     seat_id = models.ForeignKey(Seat, on_delete=models.RESTRICT, related_name="hold_seats")
 
@@ -2,10 +2,38 @@
 Serializers for inventory management
 """
 from rest_framework import serializers
+from EventX.projection_utils import Projection, validate_fields_param
+from EventX.utils import decode_cursor
 from inventory.models import EventInventory, Seat, InventoryHold
 from events.models import Events, TicketType
 
 
+# Projections mirroring SeatSerializer and SeatAvailabilitySerializer for the seat listings
+SEAT_PROJECTION = Projection({
+    'seat_id': 'seat_id',
+    'section': 'section',
+    'row_label': 'row_label',
+    'seat_number': 'seat_number',
+    'ticket_type_id': 'ticket_type_id',
+    'ticket_type_name': 'ticket_type_id__ticket_type_name',
+    'status': 'status',
+    'status_display': ('status', Seat.SEAT_STATUS.label),
+}, required=('pk',))
+
+SEAT_AVAILABILITY_PROJECTION = Projection({
+    'seat_id': 'seat_id',
+    'section': 'section',
+    'row_label': 'row_label',
+    'seat_number': 'seat_number',
+    'ticket_type_id': 'ticket_type_id',
+    'ticket_type_name': 'ticket_type_id__ticket_type_name',
+    'ticket_type_price': 'ticket_type_id__price',
+    'status': 'status',
+    'status_display': ('status', Seat.SEAT_STATUS.label),
+    'is_available': ('status', lambda value: value == Seat.SEAT_STATUS.AVAILABLE),
+}, required=('ticket_type_id', 'ticket_type_id__ticket_type_name', 'ticket_type_id__price'))
+
+
 class SeatUpdateSerializer(serializers.Serializer):
     """Serializer for updating seat status"""
     status = serializers.ChoiceField(
@@ -58,9 +86,9 @@ class InventoryHoldSerializer(serializers.ModelSerializer):
     """Serializer for inventory holds"""
     user_email = serializers.CharField(source='user.email', read_only=True)
     event_name = serializers.CharField(source='events_id.event_name', read_only=True)
-    ticket_type_name = serializers.CharField(source='ticket_type.name', read_only=True)
+    ticket_type_name = serializers.CharField(source='ticket_type.ticket_type_name', read_only=True, default=None)
     status_display = serializers.CharField(source='get_status_display', read_only=True)
-    seats = SeatSerializer(source='hold_seats', many=True, read_only=True)
+    seats = serializers.SerializerMethodField()
     time_remaining = serializers.SerializerMethodField()
     
     class Meta:
@@ -71,6 +99,9 @@ class InventoryHoldSerializer(serializers.ModelSerializer):
             'request_id', 'created_at', 'seats'
         ]
     
+    def get_seats(self, obj):
+        return SeatSerializer([hold_seat.seat_id for hold_seat in obj.seats.all()], many=True).data
+    
     def get_time_remaining(self, obj):
         from django.utils import timezone
         if obj.status == InventoryHold.HOLD_STATUS.ACTIVE:
@@ -119,6 +150,27 @@ class SeatAvailabilitySerializer(serializers.ModelSerializer):
         return obj.status == Seat.SEAT_STATUS.AVAILABLE
 
 
+class BatchAvailabilitySerializer(serializers.Serializer):
+    """Serializer for the batch availability query"""
+    MAX_EVENTS = 50
+    
+    event_ids = serializers.CharField(max_length=2000)
+    
+    def validate_event_ids(self, value):
+        event_ids = []
+        for part in value.split(','):
+            part = part.strip()
+            if not part:
+                continue
+            event_ids.append(serializers.UUIDField().to_internal_value(part))
+        
+        if not event_ids:
+            raise serializers.ValidationError("At least one event id is required")
+        if len(event_ids) > self.MAX_EVENTS:
+            raise serializers.ValidationError(f"At most {self.MAX_EVENTS} events per request")
+        return list(dict.fromkeys(event_ids))
+
+
 class HoldCreateSerializer(serializers.Serializer):
     """Serializer for creating inventory holds"""
     event_id = serializers.UUIDField()
@@ -203,3 +255,37 @@ class HoldCreateSerializer(serializers.Serializer):
         return data
 
 
+class AdminListingSerializer(serializers.Serializer):
+    """Serializer for cursor-paginated admin listings"""
+    rows_per_page = serializers.IntegerField(default=50, min_value=1, max_value=500)
+    cursor = serializers.CharField(max_length=500, required=False)
+    count = serializers.ChoiceField(choices=['exact', 'estimated', 'none'], default='exact')
+    
+    def validate_cursor(self, value):
+        try:
+            decode_cursor(value)
+        except ValueError as e:
+            raise serializers.ValidationError(str(e))
+        return value
+
+
+class AdminSeatListSerializer(AdminListingSerializer):
+    """Serializer for the admin seat listing"""
+    fields = serializers.CharField(max_length=500, required=False)
+    
+    def validate_fields(self, value):
+        return validate_fields_param(SEAT_PROJECTION, value)
+
+
+class SeatAvailabilityQuerySerializer(serializers.Serializer):
+    """Serializer for event availability query parameters"""
+    fields = serializers.CharField(max_length=500, required=False)
+    
+    def validate_fields(self, value):
+        return validate_fields_param(SEAT_AVAILABILITY_PROJECTION, value)
+
+
+class AdminHoldListSerializer(AdminListingSerializer):
+    """Serializer for filtering the admin hold listing"""
+    event_id = serializers.UUIDField(required=False)
+    status = serializers.ChoiceField(choices=['active', 'expired', 'all'], default='active')
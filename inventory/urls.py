@@ -1,7 +1,9 @@
 """
 URL patterns for inventory management
 """
+from django.conf import settings
 from django.urls import path
+from inventory.async_views import AsyncEventAvailabilityView
 from inventory.views import (
     AdminInventoryManagementView,
     AdminSeatManagementView,
@@ -9,6 +11,7 @@ from inventory.views import (
     AdminHoldManagementView
 )
 from inventory.user_views import (
+    BatchAvailabilityView,
     EventAvailabilityView,
     UserHoldCreateView,
     UserHoldListView
@@ -16,7 +19,12 @@ from inventory.user_views import (
 
 urlpatterns = [
     # Unified inventory management (admin + user)
-    path('events/<uuid:event_id>/availability/', EventAvailabilityView.as_view(), name='event-availability'),
+    path('events/availability/', BatchAvailabilityView.as_view(), name='batch-availability'),
+    path(
+        'events/<uuid:event_id>/availability/',
+        (AsyncEventAvailabilityView if settings.SERVE_ASGI else EventAvailabilityView).as_view(),
+        name='event-availability'
+    ),
     path('admin/events/<uuid:event_id>/inventory/', AdminInventoryManagementView.as_view(), name='admin-inventory-management'),
     
     # Seat management
@@ -1,16 +1,30 @@
 """
 User-facing inventory management views
 """
-from django.db import transaction
+from django.db.models import F
 from django.forms import model_to_dict
 from django.utils import timezone
+from rest_framework import status
 from EventX.helper import BaseAPIClass
+from EventX.db_utils import TransactionConflictError, lock_rows, run_in_transaction
 from EventX.cache_utils import cache_api_response, invalidate_events_cache, invalidate_bookings_cache
+from analytics.counters import UNIQUE_VIEWERS, add_unique_user, incr_sales_counters
+from events.listing import schedule_listing_delta
+from inventory.availability import (
+    get_active_holds,
+    get_availability_data,
+    get_availability_summaries,
+    get_available_seats,
+    get_event_inventories,
+    group_available_seats,
+)
 from inventory.models import EventInventory, Seat, InventoryHold, InventoryHoldSeat
 from inventory.serializers import (
     EventAvailabilitySerializer,
-    SeatAvailabilitySerializer,
+    BatchAvailabilitySerializer,
     HoldCreateSerializer,
+    SeatAvailabilityQuerySerializer,
+    SEAT_AVAILABILITY_PROJECTION,
 )
 from events.models import Events
 from accounts.models import User
@@ -19,9 +33,21 @@ import uuid
 
 class EventAvailabilityView(BaseAPIClass):
     """Unified view for checking event availability (admin + user)"""
+    use_replica = True
 
-    @cache_api_response('event_availability', timeout=30)  # 30 seconds cache
     def get(self, request, event_id):
+        """
+        Get availability information for an event, counting the viewer
+        whether or not the response comes from the cache
+        """
+        response = self.get_availability(request, event_id)
+        user = request.validated_user
+        if user and response.data.get('success'):
+            add_unique_user(UNIQUE_VIEWERS, event_id, user.user_id)
+        return response
+
+    @cache_api_response('event_availability', timeout=30)  # 30 seconds cache
+    def get_availability(self, request, event_id):
         """
         Get availability information for an event
         """
@@ -29,9 +55,16 @@ class EventAvailabilityView(BaseAPIClass):
             user = request.validated_user
             is_admin = user and user.user_type == User.USER_TYPE.ADMIN
             
+            serializer = SeatAvailabilityQuerySerializer(data=request.GET)
+            if not serializer.is_valid():
+                self.message = "Invalid query parameters"
+                self.serializer_errors(serializer.errors)
+                return self.get_response()
+            selected = SEAT_AVAILABILITY_PROJECTION.parse(serializer.validated_data.get('fields'))
+            
             # Get event
             try:
-                event = Events.objects.get(events_id=event_id)
+                event = Events.objects.select_related('venue_id').get(events_id=event_id)
             except Events.DoesNotExist:
                 self.message = "Event not found"
                 self.error_occurred(e=None, custom_code=7001)
@@ -46,89 +79,22 @@ class EventAvailabilityView(BaseAPIClass):
             # Get availability data
             if event.seat_mode == Events.SEAT_MODE.GENERAL_ADMISSION:
                 # General admission - get inventory
-                inventories = EventInventory.objects.filter(
-                    event_id=event_id
-                ).select_related('ticket_type_id')
-                
-                ticket_types = EventAvailabilitySerializer(inventories, many=True).data
+                ticket_types = EventAvailabilitySerializer(get_event_inventories(event_id), many=True).data
                 total_available = sum(item['available_qty'] for item in ticket_types)
-                
-                response_data = {
-                    'event': {
-                        'event_id': str(event.events_id),
-                        'event_name': event.event_name,
-                        'event_date': event.event_date,
-                        'venue_name': event.venue_id.name,
-                        'seat_mode': event.seat_mode
-                    },
-                    'availability': {
-                        'total_available': total_available,
-                        'ticket_types': ticket_types
-                    }
-                }
-                
-                # Add admin-specific data if user is admin
-                if is_admin:
-                    response_data['admin_data'] = {
-                        'status': event.status,
-                        'total_holds': InventoryHold.objects.filter(
-                            events_id=event_id,
-                            status=InventoryHold.HOLD_STATUS.ACTIVE
-                        ).count()
-                    }
-                
-                self.data = response_data
-                
-            elif event.seat_mode == Events.SEAT_MODE.RESERVED_SEATING:
-                # Reserved seating - get seats
-                seats = Seat.objects.filter(
-                    event_id=event_id,
-                    status=Seat.SEAT_STATUS.AVAILABLE
-                ).select_related('ticket_type_id')
-                
-                seats_data = SeatAvailabilitySerializer(seats, many=True).data
-                total_available = len(seats_data)
-                
-                # Group by ticket type
-                ticket_types = {}
-                for seat in seats_data:
-                    ticket_type_id = seat['ticket_type_id']
-                    if ticket_type_id not in ticket_types:
-                        ticket_types[ticket_type_id] = {
-                            'ticket_type_id': ticket_type_id,
-                            'ticket_type_name': seat['ticket_type_name'],
-                            'ticket_type_price': seat['ticket_type_price'],
-                            'available_seats': 0,
-                            'seats': []
-                        }
-                    ticket_types[ticket_type_id]['available_seats'] += 1
-                    ticket_types[ticket_type_id]['seats'].append(seat)
-                
-                response_data = {
-                    'event': {
-                        'event_id': str(event.events_id),
-                        'event_name': event.event_name,
-                        'event_date': event.event_date,
-                        'venue_name': event.venue_id.name,
-                        'seat_mode': event.seat_mode
-                    },
-                    'availability': {
-                        'total_available': total_available,
-                        'ticket_types': list(ticket_types.values())
-                    }
+            else:
+                # Reserved seating - get seats as plain rows, only the requested columns
+                ticket_types, total_available = group_available_seats(get_available_seats(event_id, selected), selected)
+            
+            response_data = get_availability_data(event, total_available, ticket_types)
+            
+            # Add admin-specific data if user is admin
+            if is_admin:
+                response_data['admin_data'] = {
+                    'status': event.status,
+                    'total_holds': get_active_holds(event_id).count()
                 }
-                
-                # Add admin-specific data if user is admin
-                if is_admin:
-                    response_data['admin_data'] = {
-                        'status': event.status,
-                        'total_holds': InventoryHold.objects.filter(
-                            events_id=event_id,
-                            status=InventoryHold.HOLD_STATUS.ACTIVE
-                        ).count()
-                    }
-                
-                self.data = response_data
+            
+            self.data = response_data
             
             self.message = "Event availability retrieved successfully"
             
@@ -139,6 +105,47 @@ class EventAvailabilityView(BaseAPIClass):
         return self.get_response()
 
 
+class BatchAvailabilityView(BaseAPIClass):
+    """Availability of many events in one request"""
+    use_replica = True
+
+    def get(self, request):
+        """
+        Get per-ticket-type availability for a comma separated list of event ids
+        """
+        try:
+            user = request.validated_user
+            is_admin = user and user.user_type == User.USER_TYPE.ADMIN
+            
+            serializer = BatchAvailabilitySerializer(data=request.GET)
+            if not serializer.is_valid():
+                self.custom_code = 7021
+                self.serializer_errors(serializer.errors)
+                return self.get_response()
+            
+            event_ids = [str(event_id) for event_id in serializer.validated_data['event_ids']]
+            summaries = get_availability_summaries(event_ids)
+            
+            # Unpublished events are reported as not found to non-admins
+            events = {}
+            for event_id in event_ids:
+                summary = summaries.get(event_id)
+                if summary and (is_admin or summary['status'] == Events.EVENT_STATUS.PUBLISHED):
+                    events[event_id] = summary
+            
+            self.data = {
+                'events': events,
+                'not_found': [event_id for event_id in event_ids if event_id not in events]
+            }
+            self.message = "Event availability retrieved successfully"
+            
+        except Exception as e:
+            self.message = "Failed to retrieve event availability"
+            self.error_occurred(e, custom_code=7022)
+        
+        return self.get_response()
+
+
 class UserHoldCreateView(BaseAPIClass):
     """User view for creating inventory holds"""
 
@@ -168,46 +175,19 @@ class UserHoldCreateView(BaseAPIClass):
                 # Generate unique request ID
                 request_id = uuid.uuid4()
                 
-                with transaction.atomic():
-                    # Create hold
-                    hold = InventoryHold.objects.create(
-                        events_id=event,
-                        user=user,
-                        ticket_type_id=ticket_type_id,
-                        quantity=quantity,
-                        expires_at=timezone.now() + timezone.timedelta(minutes=10),
-                        request_id=request_id
-                    )
-                    
-                    if event.seat_mode == Events.SEAT_MODE.RESERVED_SEATING and seat_ids:
-                        # Reserve specific seats
-                        seats = Seat.objects.filter(
-                            seat_id__in=seat_ids,
-                            status=Seat.SEAT_STATUS.AVAILABLE
-                        ).select_for_update()
-                        
-                        for seat in seats:
-                            seat.status = Seat.SEAT_STATUS.HELD
-                            seat.save()
-                            
-                            # Create hold-seat relationship
-                            InventoryHoldSeat.objects.create(
-                                hold_id=hold,
-                                seat_id=seat
-                            )
-                    
-                    elif event.seat_mode == Events.SEAT_MODE.GENERAL_ADMISSION:
-                        # Update inventory hold quantity
-                        inventory = EventInventory.objects.get(
-                            event_id=event_id,
-                            ticket_type_id=ticket_type_id
-                        )
-                        inventory.held_qty += quantity
-                        inventory.save()
+                # Lock seats or inventory in a deterministic order and retry on deadlocks
+                hold = run_in_transaction(
+                    lambda: self._create_hold(user, event, ticket_type_id, quantity, seat_ids, request_id),
+                    event_id=event_id
+                )
+                if not hold:
+                    return self.get_response()
                 
                 # Invalidate cache
+                schedule_listing_delta(event_id, -(len(seat_ids) or quantity))
                 invalidate_events_cache(event_id=event_id)
                 invalidate_bookings_cache(user_id=user.user_id, event_id=event_id)
+                incr_sales_counters([(event_id, ticket_type_id, {'holds': len(seat_ids) or quantity})])
                 
                 self.data = {
                     'hold_id': str(hold.inventory_hold_id),
@@ -221,14 +201,83 @@ class UserHoldCreateView(BaseAPIClass):
                 
             else:
                 self.custom_code = 7009
-                self._serializer_errors(serializer.errors)
+                self.serializer_errors(serializer.errors)
                 
+        except TransactionConflictError as e:
+            self.message = "Tickets are in high demand, please retry"
+            self.error_occurred(e, custom_code=7011)
+            self.code = status.HTTP_409_CONFLICT
         except Exception as e:
             self.message = "Failed to create hold"
             self.error_occurred(e, custom_code=7010)
         
         return self.get_response()
 
+    def _create_hold(self, user, event, ticket_type_id, quantity, seat_ids, request_id):
+        """
+        Lock the requested seats or inventory and create the hold.
+        Returns None when the inventory is no longer available.
+        """
+        if event.seat_mode == Events.SEAT_MODE.RESERVED_SEATING and seat_ids:
+            # Reserve specific seats
+            seats = lock_rows(Seat.objects.filter(
+                seat_id__in=seat_ids,
+                event_id=event.events_id,
+                status=Seat.SEAT_STATUS.AVAILABLE
+            ), event.events_id)
+            
+            if len(seats) != len(seat_ids):
+                self.message = "Some selected seats are not available"
+                self.error_occurred(e=None, custom_code=7012)
+                return None
+            
+            hold = InventoryHold.objects.create(
+                events_id=event,
+                user=user,
+                ticket_type_id=ticket_type_id,
+                quantity=quantity,
+                expires_at=timezone.now() + timezone.timedelta(minutes=10),
+                request_id=request_id
+            )
+            
+            # Create hold-seat relationships and mark the seats held
+            InventoryHoldSeat.objects.bulk_create([
+                InventoryHoldSeat(hold_id=hold, seat_id=seat) for seat in seats
+            ])
+            Seat.objects.filter(seat_id__in=[seat.seat_id for seat in seats]).update(
+                status=Seat.SEAT_STATUS.HELD
+            )
+            return hold
+        
+        if event.seat_mode == Events.SEAT_MODE.GENERAL_ADMISSION:
+            # Update inventory hold quantity
+            inventories = lock_rows(EventInventory.objects.filter(
+                event_id=event.events_id,
+                ticket_type_id=ticket_type_id
+            ), event.events_id)
+            if not inventories:
+                raise EventInventory.DoesNotExist()
+            
+            inventory = inventories[0]
+            available_qty = inventory.initial_qty - inventory.sold_qty - inventory.held_qty
+            if available_qty < quantity:
+                self.message = f"Only {available_qty} tickets available, requested {quantity}"
+                self.error_occurred(e=None, custom_code=7013)
+                return None
+            
+            EventInventory.objects.filter(event_inventory_id=inventory.event_inventory_id).update(
+                held_qty=F('held_qty') + quantity
+            )
+        
+        return InventoryHold.objects.create(
+            events_id=event,
+            user=user,
+            ticket_type_id=ticket_type_id,
+            quantity=quantity,
+            expires_at=timezone.now() + timezone.timedelta(minutes=10),
+            request_id=request_id
+        )
+
 
 class UserHoldListView(BaseAPIClass):
     """User view for listing their holds"""
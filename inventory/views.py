@@ -1,17 +1,21 @@
 """
 Admin inventory management views
 """
-from django.forms import model_to_dict
 from django.utils import timezone
 from django.db.models import Count
 from EventX.helper import BaseAPIClass
 from EventX.cache_utils import cache_api_response, invalidate_events_cache
+from events.listing import schedule_listing_refresh
+from EventX.utils import get_total_count, paginate_queryset_by_cursor
 from inventory.models import EventInventory, Seat, InventoryHold
 from inventory.serializers import (
     EventInventoryStatusSerializer,
     SeatUpdateSerializer,
     SeatSerializer,
     InventoryHoldSerializer,
+    AdminSeatListSerializer,
+    AdminHoldListSerializer,
+    SEAT_PROJECTION,
 )
 from events.models import Events
 from accounts.models import User
@@ -101,9 +105,23 @@ class AdminSeatManagementView(BaseAPIClass):
                 self.error_occurred(e=None, custom_code=6014)
                 return self.get_response()
             
-            # Get seats
-            seats = Seat.objects.filter(event_id=event_id).select_related('ticket_type_id')
-            seat_serializer = SeatSerializer(seats, many=True)
+            serializer = AdminSeatListSerializer(data=request.GET)
+            if not serializer.is_valid():
+                self.message = "Invalid query parameters"
+                self.serializer_errors(serializer.errors)
+                return self.get_response()
+            
+            # Get seats, one keyset page at a time in seat map order
+            ordering = ('section', 'row_label', 'seat_number', 'pk')
+            selected = SEAT_PROJECTION.parse(serializer.validated_data.get('fields'))
+            seats = SEAT_PROJECTION.values(Seat.objects.filter(event_id=event_id), selected, *ordering)
+            total_seats = get_total_count(seats, serializer.validated_data['count'])
+            seats, next_cursor = paginate_queryset_by_cursor(
+                seats,
+                ordering,
+                serializer.validated_data.get('cursor'),
+                serializer.validated_data['rows_per_page']
+            )
             
             self.data = {
                 'event': {
@@ -111,8 +129,9 @@ class AdminSeatManagementView(BaseAPIClass):
                     'event_name': event.event_name,
                     'seat_mode': event.seat_mode
                 },
-                'seats': seat_serializer.data,
-                'total_seats': seats.count()
+                'seats': SEAT_PROJECTION.serialize(seats, selected),
+                'total_seats': total_seats,
+                'next_cursor': next_cursor
             }
             self.message = "Seats retrieved successfully"
             
@@ -159,6 +178,7 @@ class AdminSeatDetailView(BaseAPIClass):
                 seat.save()
                 
                 # Invalidate cache
+                schedule_listing_refresh(seat.event_id.events_id)
                 invalidate_events_cache(event_id=seat.event_id.events_id)
                 
                 self.data = SeatSerializer(seat).data
@@ -192,14 +212,20 @@ class AdminHoldManagementView(BaseAPIClass):
                 self.error_occurred(e=None, custom_code=6028)
                 return self.get_response()
             
+            serializer = AdminHoldListSerializer(data=request.GET)
+            if not serializer.is_valid():
+                self.message = "Invalid query parameters"
+                self.serializer_errors(serializer.errors)
+                return self.get_response()
+            
             # Get query parameters
-            event_id = request.GET.get('event_id')
-            status = request.GET.get('status', 'active')
+            event_id = serializer.validated_data.get('event_id')
+            status = serializer.validated_data['status']
             
             # Build query
             holds_query = InventoryHold.objects.select_related(
                 'user', 'events_id', 'ticket_type'
-            ).prefetch_related('hold_seats__seat_id')
+            ).prefetch_related('seats__seat_id__ticket_type_id')
             
             if event_id:
                 holds_query = holds_query.filter(events_id=event_id)
@@ -212,12 +238,18 @@ class AdminHoldManagementView(BaseAPIClass):
                     expires_at__lt=timezone.now()
                 )
             
-            holds = model_to_dict(holds_query.order_by('-created_at'))
+            total_holds = get_total_count(holds_query, serializer.validated_data['count'])
+            holds, next_cursor = paginate_queryset_by_cursor(
+                holds_query,
+                ('-created_at', '-pk'),
+                serializer.validated_data.get('cursor'),
+                serializer.validated_data['rows_per_page']
+            )
             
             self.data = {
-                'holds': holds,
-                'total_holds': holds.count(),
-                'active_holds': holds.filter(status=InventoryHold.HOLD_STATUS.ACTIVE).count()
+                'holds': self.hold_serializer(holds, many=True).data,
+                'total_holds': total_holds,
+                'next_cursor': next_cursor
             }
             self.message = "Holds retrieved successfully"
 